@@ -2,72 +2,176 @@
 
 from __future__ import annotations
 
+import json
 import os
 import yaml
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
-from types import SimpleNamespace
-from dataclasses import dataclass
-
-
-@dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+from dataclasses import dataclass, field
+
+try:
+    # LibYAML-backed loader; falls back to the pure-Python one if unavailable
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+
+_PROJECT_ROOT = Path(__file__).resolve().parents[1]
+_DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_config.yaml")
+_DOTENV_LOADED = False
+
+# Read-only defaults shared by every Config that omits these sections
+_DEFAULT_GLOBAL_SETTINGS = MappingProxyType({
+    'timeout': 30,
+    'retry_attempts': 3,
+    'retry_delay': 1.0,
+    'max_concurrency': 4,
+    'analysis_batch_size': 4,
+    'batch_api_min_test_cases': 50,
+    'batch_api_poll_seconds': 30,
+    'strict_validation': False,
+    'log_level': 'INFO'
+})
+_EMPTY = MappingProxyType({})
+_DEFAULT_SYSTEM = MappingProxyType({
+    'test_cases_dir': 'test_cases',
+    'schema_path': 'schema/test_case.schema.json',
+    'reports_dir': 'reports',
+    'cache_dir': '.cache',
+    'sample_change_requests_dir': 'sample_change_requests',
+    'default_retriever': 'hybrid',
+    'top_k': MappingProxyType({'new_feature': 5, 'feature_update': 10, 'bug_fix': 8}),
+    'database': MappingProxyType({}),
+    'reports': MappingProxyType({})
+})
+
+
+@dataclass(frozen=True, slots=True)
 class Config:
-    """Simplified configuration container."""
+    """Simplified, read-only configuration container (shared via the load cache)."""
     default_provider: str
-    providers: Dict[str, Dict[str, Any]]
-    global_settings: Dict[str, Any]
-    system: Dict[str, Any]
+    providers: Mapping[str, Dict[str, Any]]
+    global_settings: Mapping[str, Any]
+    system: Mapping[str, Any]
+    # Frequently read system sub-sections, materialized once
+    _top_k: Mapping[str, int] = field(init=False, repr=False, compare=False)
+    _database: Mapping[str, Any] = field(init=False, repr=False, compare=False)
+    _reports: Mapping[str, Any] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Frozen dataclass: bypass __setattr__ for the derived fields
+        object.__setattr__(self, '_top_k', self.system.get('top_k') or _EMPTY)
+        object.__setattr__(self, '_database', self.system.get('database') or _EMPTY)
+        object.__setattr__(self, '_reports', self.system.get('reports') or _EMPTY)
+
+
+def _read_config_data(config_path: Path) -> Dict[str, Any]:
+    """Read raw config data, preferring a JSON sidecar that matches the YAML mtime."""
+    mtime_ns = config_path.stat().st_mtime_ns
+    cache_path = config_path.with_name(config_path.name + '.cache.json')
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = json.load(f)
+        if cached.get('mtime_ns') == mtime_ns:
+            return cached['data']
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    # One contiguous read; LibYAML scans the bytes without Python-level chunking
+    data = yaml.load(config_path.read_bytes(), Loader=_YamlLoader)
+
+    try:
+        cache_path.write_text(json.dumps({'mtime_ns': mtime_ns, 'data': data}), encoding='utf-8')
+    except (OSError, TypeError, ValueError):
+        pass  # Sidecar is optional (read-only checkout or non-JSON YAML values)
+    return data
 
 
 def load_config(config_path: Optional[Path] = None) -> Config:
     """Load configuration from YAML file."""
-    # Load .env automatically if present
-    try:
-        from dotenv import load_dotenv
-        # Prefer project root .env
-        project_root = Path(__file__).resolve().parents[1]
-        env_path = project_root / '.env'
-        if env_path.exists():
-            load_dotenv(env_path)
-        else:
-            # Fallback: load from current working directory
-            load_dotenv()
-    except Exception:
-        # dotenv is optional; ignore if not installed
-        pass
+    global _DOTENV_LOADED
+    # Load .env automatically if present (once per process)
+    if not _DOTENV_LOADED:
+        try:
+            from dotenv import load_dotenv
+            # Prefer project root .env
+            env_path = _PROJECT_ROOT / '.env'
+            if env_path.exists():
+                load_dotenv(env_path)
+            else:
+                # Fallback: load from current working directory
+                load_dotenv()
+        except Exception:
+            # dotenv is optional; ignore if not installed
+            pass
+        _DOTENV_LOADED = True
     if config_path is None:
-        config_path = Path(__file__).parent / "llm_config.yaml"
+        config_path = _DEFAULT_CONFIG_PATH
     
-    if not config_path.exists():
+    # abspath is a plain string join; resolve() would stat every component
+    config_path = os.path.abspath(config_path)
+    if not os.path.exists(config_path):
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
     
-    with open(config_path, 'r', encoding='utf-8') as f:
-        data = yaml.safe_load(f)
+    return _load_config_cached(Path(config_path))
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only deep copy of parsed config data: mappings become proxies, lists tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@lru_cache(maxsize=None)
+def _load_config_cached(config_path: Path) -> Config:
+    """Parse a resolved config path once per process."""
+    data = _read_config_data(config_path)
     
-    # Apply defaults and return configuration
+    # Apply defaults and return configuration; frozen all the way down, since the
+    # instance is shared by every caller in the process
     return Config(
         default_provider=data.get('default_provider', 'mock'),
-        providers=data.get('providers', {}),
-        global_settings=data.get('global', {
-            'timeout': 30,
-            'retry_attempts': 3,
-            'retry_delay': 1.0,
-            'log_level': 'INFO'
-        }),
-        system=data.get('system', {
-            'test_cases_dir': 'test_cases',
-            'schema_path': 'schema/test_case.schema.json',
-            'reports_dir': 'reports',
-            'cache_dir': '.cache',
-            'sample_change_requests_dir': 'sample_change_requests',
-            'default_retriever': 'hybrid',
-            'top_k': {'new_feature': 5, 'feature_update': 10, 'bug_fix': 8},
-            'database': {},
-            'reports': {}
-        })
+        providers=_freeze(data.get('providers', {})),
+        global_settings=_freeze(data.get('global', _DEFAULT_GLOBAL_SETTINGS)),
+        system=_freeze(data.get('system', _DEFAULT_SYSTEM))
     )
 
 
+def _wrap_value(value: Any) -> Any:
+    """Wrap nested mappings (and mappings inside sequences) in attribute views."""
+    if isinstance(value, Mapping):
+        return _NamespaceView(value)
+    if isinstance(value, (list, tuple)):
+        return [_wrap_value(item) for item in value]
+    return value
+
+
+class _NamespaceView:
+    """Read-only attribute access over a config dict, wrapping nested values lazily."""
+    __slots__ = ('_data',)
+
+    def __init__(self, data: Mapping[str, Any]):
+        self._data = data
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return _wrap_value(self._data[name])
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def items(self):
+        """Iterate over (key, value) pairs like a mapping."""
+        return ((key, _wrap_value(value)) for key, value in self._data.items())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._data!r})"
+
+
 def get_llm_config(config: Config, provider_name: Optional[str] = None) -> Dict[str, Any]:
     """Get LLM configuration for a specific provider.
     
@@ -86,17 +190,7 @@ def get_llm_config(config: Config, provider_name: Optional[str] = None) -> Dict[
     if provider not in config.providers:
         raise ValueError(f"Unknown LLM provider: {provider}")
     
-    def _to_namespace(obj: Any) -> Any:
-        """Recursively convert dicts to SimpleNamespace for attribute access."""
-        if isinstance(obj, dict):
-            return SimpleNamespace(**{k: _to_namespace(v) for k, v in obj.items()})
-        if isinstance(obj, list):
-            return [
-                _to_namespace(item) for item in obj
-            ]
-        return obj
-
-    return _to_namespace(config.providers[provider])
+    return _NamespaceView(config.providers[provider])
 
 
 def get_api_key(api_key_env: str) -> str:
@@ -127,7 +221,7 @@ def get_pipeline_top_k(config: Config, pipeline_name: str) -> int:
     Returns:
         Number of top results to retrieve (defaults to 5 if not configured)
     """
-    return config.system.get('top_k', {}).get(pipeline_name, 5)
+    return config._top_k.get(pipeline_name, 5)
 
 
 def get_retriever_config(config: Config, retriever_name: str) -> Dict[str, Any]:
@@ -141,7 +235,7 @@ def get_retriever_config(config: Config, retriever_name: str) -> Dict[str, Any]:
         Dictionary containing retriever configuration (empty dict if not found)
     """
     if retriever_name == "hybrid":
-        return config.system.get('database', {})
+        return config._database
     return {}
 
 
@@ -154,4 +248,4 @@ def get_report_config(config: Config) -> Dict[str, Any]:
     Returns:
         Dictionary containing report configuration
     """
-    return config.system.get('reports', {})
+    return config._reports
@@ -20,4 +20,4 @@ export PYTHONPATH="$PWD"
 
 # Run the CLI (no arguments needed)
 echo "🚀 Running QA Change Request Orchestrator..."
-python src/cli.py
+python src/cli.py "$@"
@@ -1,55 +1,121 @@
+import argparse
+import json
 import logging
 import os
+import re
 import sys
 from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional
 
 # Add project root to Python path for IDE debugging
-project_root = Path(__file__).parent.parent
+project_root = Path(__file__).resolve().parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 from src.parsers.change_request_parser import parse_change_request
-from src.pipelines.new_feature import run_new_feature_pipeline
-from src.pipelines.feature_update import run_feature_update_pipeline
-from src.pipelines.bug_fix import run_bug_fix_pipeline
-from src.reporting.report_writer import write_report
-from src.llm.client import LLMClient
 from config.config_loader import load_config, get_report_config
-from src.database import setup_database_retriever
 
 
-def get_change_request_file() -> Path:
-    """Get change request file from user input."""
+# Matches the former *.md, *.txt, *change*, *request* globs in one pass
+_SAMPLE_RE = re.compile(r'\.(?:md|txt)$|change|request')
+
+
+class _FilenameFields(dict):
+    """Filename template fields; unknown placeholders are left as-is."""
+
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+
+def _read_title_preview(file_path: Path) -> str:
+    """Build a menu title from the first line of a sample file."""
+    # Only the first line is needed, so read a single small chunk
+    with open(file_path, 'rb') as f:
+        head = f.read(256)
+    first_line = head.split(b'\n', 1)[0].decode('utf-8', errors='ignore').strip()
+    if first_line.startswith('#'):
+        return first_line[1:].strip()
+    return first_line[:50] + "..." if len(first_line) > 50 else first_line
+
+
+def _resolve_system_paths(config, root: Path) -> SimpleNamespace:
+    """Resolve configured system paths relative to the (already resolved) project root."""
+    system = config.system
+    root_str = os.fspath(root)
+    # Join as strings and wrap in Path once per entry
+    join = os.path.join
+    return SimpleNamespace(
+        test_cases_dir=Path(join(root_str, system['test_cases_dir'])),
+        schema_path=Path(join(root_str, system['schema_path'])),
+        report_out=Path(join(root_str, system['reports_dir'])),
+        cache_dir=Path(join(root_str, system['cache_dir'])),
+        sample_dir=Path(join(root_str, system['sample_change_requests_dir'])),
+    )
+
+
+def _load_title_cache(cache_path: Optional[Path]) -> dict:
+    """Load cached sample-file titles (empty if missing or unreadable)."""
+    if cache_path is None:
+        return {}
+    try:
+        data = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_title_cache(cache_path: Path, titles: dict) -> None:
+    """Persist sample-file titles; the cache is optional so failures are ignored."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(titles), encoding="utf-8")
+    except OSError:
+        pass
+
+
+def get_change_request_file(sample_dir: Path, cache_dir: Optional[Path] = None) -> Path:
+    """Get change request file from user input.
+    
+    Args:
+        sample_dir: Directory containing sample change request files
+        cache_dir: Optional cache directory used to persist sample title previews
+    """
     print("🤖 AI-based QA Change Request Orchestrator")
     print("=" * 50)
     print()
     
-    # Load configuration to get sample directory
-    config = load_config(None)
-    # Resolve sample directory relative to project root so it works from any CWD
-    sample_dir = (project_root / config.system['sample_change_requests_dir']).resolve()
     sample_files = []
     if sample_dir.exists():
-        patterns = ["*.md", "*.txt", "*change*", "*request*"]
-        for pattern in patterns:
-            sample_files.extend(sample_dir.glob(pattern))
-        sample_files = sorted(list(set(sample_files)))
+        # Single directory pass instead of one glob per pattern
+        with os.scandir(sample_dir) as entries:
+            sample_files = sorted(
+                Path(entry.path) for entry in entries
+                if _SAMPLE_RE.search(entry.name) and entry.is_file()
+            )
     
     if sample_files:
-        print("📄 Available sample files:")
+        # Title previews are cached across runs, keyed by file mtime and size
+        title_cache_path = cache_dir / "sample_titles.json" if cache_dir else None
+        title_cache = _load_title_cache(title_cache_path)
+        fresh_cache = {}
+        menu = ["📄 Available sample files:"]
         for i, file_path in enumerate(sample_files, 1):
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    first_line = f.readline().strip()
-                    if first_line.startswith('#'):
-                        title = first_line[1:].strip()
-                    else:
-                        title = first_line[:50] + "..." if len(first_line) > 50 else first_line
+                st = file_path.stat()
+                cached = title_cache.get(file_path.name)
+                if cached and cached.get("mtime_ns") == st.st_mtime_ns and cached.get("size") == st.st_size:
+                    title = cached["title"]
+                else:
+                    title = _read_title_preview(file_path)
+                fresh_cache[file_path.name] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "title": title}
             except Exception:
                 title = file_path.name
-            print(f"  {i}. {file_path.name} - {title}")
-        
-        print()
+            menu.append(f"  {i}. {file_path.name} - {title}")
+        menu.append("")
+        print("\n".join(menu))
+        if title_cache_path and fresh_cache != title_cache:
+            _save_title_cache(title_cache_path, fresh_cache)
         while True:
             try:
                 choice = input("Select a sample file (1-{}) or enter custom path: ".format(len(sample_files))).strip()
@@ -86,8 +152,25 @@ def get_change_request_file() -> Path:
                 print("Please check the path and try again.")
 
 
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """Parse command-line flags."""
+    parser = argparse.ArgumentParser(description="QA Change Request Orchestrator")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the LLM instead of reusing cached responses and results from earlier runs"
+    )
+    parser.add_argument(
+        "--batch-mode",
+        action="store_true",
+        help="Send large feature update runs through the provider's Batch API (lower cost, may take hours)"
+    )
+    return parser.parse_args(argv)
+
+
 def main() -> None:
     """Main entry point for the QA Change Request Orchestrator CLI application."""
+    args = _parse_args()
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     
     # Load configuration and setup first
@@ -95,14 +178,20 @@ def main() -> None:
     config = load_config(None)
     provider_name = os.getenv("LLM_PROVIDER") or config.default_provider
     # Resolve all important paths relative to project root to avoid cwd issues
-    test_cases_dir = (project_root / config.system['test_cases_dir']).resolve()
-    schema_path = (project_root / config.system['schema_path']).resolve()
-    report_out = (project_root / config.system['reports_dir']).resolve()
-    cache_dir = (project_root / config.system['cache_dir']).resolve()
+    paths = _resolve_system_paths(config, project_root)
+    test_cases_dir = paths.test_cases_dir
+    schema_path = paths.schema_path
+    report_out = paths.report_out
+    cache_dir = paths.cache_dir
     
     # Initialize LLM client
     print("🧠 Initializing AI provider...")
-    llm_client = LLMClient(config, provider_name)
+    from src.llm.client import LLMClient
+    llm_cache = None
+    if not args.no_cache:
+        from src.llm.response_cache import LLMResponseCache
+        llm_cache = LLMResponseCache(cache_dir / "llm_responses.db")
+    llm_client = LLMClient(config, provider_name, cache=llm_cache)
     print(f"✅ Using: {llm_client.current_provider} ({llm_client.current_model})")
     
     if not llm_client.is_available():
@@ -111,15 +200,18 @@ def main() -> None:
     print()
     
     # Build or load database retriever
+    from src.database import setup_database_retriever
     retriever = setup_database_retriever(config, test_cases_dir, cache_dir)
     
     # Get change request file
-    change_request_path = get_change_request_file()
+    change_request_path = get_change_request_file(paths.sample_dir, paths.cache_dir)
+    # Read the file once; downstream consumers take the bytes instead of reopening it
+    change_request_raw = change_request_path.read_bytes()
     print()
     
     # Parse change request
     print("📋 Parsing change request...")
-    change = parse_change_request(change_request_path)
+    change = parse_change_request(change_request_path, raw=change_request_raw)
     print(f"✅ Change type: {change.change_type}")
     print(f"✅ Title: {change.title}")
     print()
@@ -130,70 +222,76 @@ def main() -> None:
     
     if change.change_type == "new_feature":
         print("📝 Generating new test cases...")
+        from src.pipelines.new_feature import run_new_feature_pipeline
         result = run_new_feature_pipeline(change, test_cases_dir, schema_path, retriever, llm_client, config)
     elif change.change_type == "feature_update":
         print("🔄 Updating existing test cases...")
-        result = run_feature_update_pipeline(change, test_cases_dir, schema_path, retriever, llm_client, config)
+        from src.pipelines.feature_update import run_feature_update_pipeline
+        run_cache_dir = None if args.no_cache else cache_dir / "pipeline_runs"
+        result = run_feature_update_pipeline(change, test_cases_dir, schema_path, retriever, llm_client, config,
+                                             run_cache_dir=run_cache_dir, batch_mode=args.batch_mode)
     elif change.change_type == "bug_fix":
         print("🐛 Analyzing bug fix requirements...")
+        from src.pipelines.bug_fix import run_bug_fix_pipeline
         result = run_bug_fix_pipeline(change, test_cases_dir, schema_path, retriever, llm_client, config)
     else:
         print(f"❌ Unknown change type: {change.change_type}")
         sys.exit(1)
     
+    # Pipelines are done with the LLM; release provider connection pools
+    llm_client.close()
+    
     print("-" * 40)
     print("✅ Processing complete!")
     print()
     
     # Write report
     print("📊 Generating report...")
+    from src.reporting.report_writer import write_report
     report_out.mkdir(exist_ok=True)
     report_config = get_report_config(config)
     filename_template = report_config.get('filename_template', '{change_type}_{change_request_stem}_report.md')
     # Append simple timestamp (YYYYMMDD_HHMMSS) to report filename
     from datetime import datetime
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    report_filename = filename_template.format(
+    report_filename = filename_template.format_map(_FilenameFields(
         change_type=change.change_type,
         change_request_stem=change_request_path.stem,
         timestamp=ts
-    )
+    ))
     write_report(result.report, report_out, report_filename)
     report_path = report_out / report_filename
     print(f"✅ Report written to: {report_path}")
     print()
     
-    # Show summary
-    print("📋 Summary")
-    print("=" * 20)
-    print(f"Change Type: {change.change_type}")
-    print(f"Title: {change.title}")
-    print(f"AI Provider: {llm_client.current_provider} ({llm_client.current_model})")
-    print(f"Search Method: database (filtering + semantic ranking)")
-    print(f"Relevant TCs Retrieved: {getattr(result, 'related_count', 0)}")
-
-
+    # Show summary (collected and written in one go)
+    lines = [
+        "📋 Summary",
+        "=" * 20,
+        f"Change Type: {change.change_type}",
+        f"Title: {change.title}",
+        f"AI Provider: {llm_client.current_provider} ({llm_client.current_model})",
+        "Search Method: database (filtering + semantic ranking)",
+        f"Relevant TCs Retrieved: {getattr(result, 'related_count', 0)}",
+    ]
+    
+    if getattr(result, 'replayed', False):
+        lines.append("Replayed: results of an earlier identical run; no test cases were analyzed or modified now")
     
     if result.created:
-        print(f"Created in: {test_cases_dir}")
-        print(f"Created Files: {len(result.created)}")
-        for path in result.created:
-            try:
-                print(f"  - {path.name}")
-            except Exception:
-                print(f"  - {path}")
+        lines.append(f"Created in: {test_cases_dir}")
+        lines.append(f"Created Files: {len(result.created)}")
+        lines.extend(f"  - {getattr(path, 'name', path)}" for path in result.created)
     
     if result.updated:
-        print(f"Updated Files: {len(result.updated)}")
-        for path in result.updated:
-            try:
-                print(f"  - {path.name}")
-            except Exception:
-                print(f"  - {path}")
+        label = "Updated Files (by the earlier run)" if getattr(result, 'replayed', False) else "Updated Files"
+        lines.append(f"{label}: {len(result.updated)}")
+        lines.extend(f"  - {getattr(path, 'name', path)}" for path in result.updated)
     
-    print(f"Report: {report_path}")
-    print()
-    print("🎉 All done! Check the report for details.")
+    lines.append(f"Report: {report_path}")
+    lines.append("")
+    lines.append("🎉 All done! Check the report for details.")
+    print("\n".join(lines))
 
 
 if __name__ == "__main__":
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 
 def load_iw_context(context_path: Path = Path("IW_OVERVIEW.md")) -> Optional[str]:
     """Load Instawork context for LLM prompts."""
-    if not context_path.exists():
+    try:
+        mtime_ns = context_path.stat().st_mtime_ns
+    except OSError:
         return None
+    return _read_iw_context(context_path.resolve(), mtime_ns)
+
+
+@lru_cache(maxsize=None)
+def _read_iw_context(context_path: Path, mtime_ns: int) -> str:
+    """Read the context file once per (path, mtime) so edits invalidate the cache."""
     return context_path.read_text(encoding="utf-8").strip()
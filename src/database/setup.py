@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import os
 from pathlib import Path
 from typing import Optional
 
@@ -33,7 +34,6 @@ def setup_database_retriever(
     db_config = get_retriever_config(config, "hybrid")
     db_filename = db_config.get("db_file", "test_cases.db")
     db_cache_dir = cache_dir / "database"
-    db_cache_dir.mkdir(parents=True, exist_ok=True)
     db_path = db_cache_dir / db_filename
     
     # Create retrieval config from YAML settings (with defaults)
@@ -42,12 +42,20 @@ def setup_database_retriever(
         "semantic_weight": db_config.get("semantic_weight", 0.4),
         "priority_weight": db_config.get("priority_weight", 0.2),
         "max_candidates": db_config.get("max_candidates", 200),
+        "semantic_rerank_candidates": db_config.get("semantic_rerank_candidates", 20),
+        "use_fp16_gpu": db_config.get("use_fp16_gpu", True),
+        "embedding_backend": db_config.get("embedding_backend", "torch"),
+        "onnx_model_file": db_config.get("onnx_model_file", "onnx/model_qint8_avx512_vnni.onnx"),
         "max_results": 10,
         "min_similarity_threshold": db_config.get("min_similarity_threshold", 0.1)
     }
     
-    # Try to load existing database
-    retriever = HybridRetriever.load_from_cache(db_cache_dir, db_path, retrieval_config)
+    # Try to load existing database; only create the cache dir on a cold start
+    if db_cache_dir.exists():
+        retriever = HybridRetriever.load_from_cache(db_cache_dir, db_path, retrieval_config)
+    else:
+        db_cache_dir.mkdir(parents=True, exist_ok=True)
+        retriever = None
     
     if retriever is None:
         if verbose:
@@ -64,10 +72,14 @@ def setup_database_retriever(
             retriever.dump(db_cache_dir)
         except Exception:
             pass  # Cache saving is optional
-    else:
-        # Update config for loaded retriever
+    elif retriever.config != retrieval_config:
+        # Update config for loaded retriever only when the settings changed
         retriever.config = retrieval_config
     
+    # Only now is the config final (embedding backend, fp16); the model loads while the user
+    # picks a change request and query() waits for it
+    retriever.preload_embedding_model()
+    
     if verbose:
         print("✅ Database search system ready")
         print()
@@ -83,8 +95,18 @@ def clear_database_cache(cache_dir: Path) -> None:
     """
     db_cache_dir = cache_dir / "database"
     if db_cache_dir.exists():
-        import shutil
-        shutil.rmtree(db_cache_dir)
+        # The cache is a flat directory (db file, sqlite sidecars, retriever config),
+        # so unlink entries directly instead of a generic recursive walk
+        with os.scandir(db_cache_dir) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False) or entry.is_symlink():
+                    os.unlink(entry.path)
+        try:
+            db_cache_dir.rmdir()
+        except OSError:
+            # Unexpected nested content; fall back to a full removal
+            import shutil
+            shutil.rmtree(db_cache_dir)
         print(f"🗑️  Cleared database cache: {db_cache_dir}")
 
 
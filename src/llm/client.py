@@ -2,22 +2,31 @@
 
 from __future__ import annotations
 
+import asyncio
+import io
 import logging
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 from src.llm.interfaces import LLMProvider, LLMRequest, LLMResponse
+from src.llm.response_cache import LLMResponseCache
 from config.config_loader import Config, get_llm_config
 
+# How long get_available_providers() results are reused
+_AVAILABILITY_TTL_SECONDS = 30.0
+
 
 class LLMClient:
     """Main LLM client that manages different providers."""
     
-    def __init__(self, config: Optional[Config] = None, provider_name: Optional[str] = None):
+    def __init__(self, config: Optional[Config] = None, provider_name: Optional[str] = None,
+                 cache: Optional[LLMResponseCache] = None):
         """Initialize the LLM client.
         
         Args:
             config: Configuration object. If None, loads from default config file.
             provider_name: Specific provider to use. If None, uses default from config.
+            cache: Optional persistent response cache; identical requests are served from it.
         """
         self.logger = logging.getLogger(__name__)
         
@@ -28,18 +37,31 @@ class LLMClient:
         self.config = config
         self.provider_name = provider_name or config.default_provider
         self._provider: Optional[LLMProvider] = None
+        # Provider instances are reused across availability checks and switches
+        self._providers_by_name: Dict[str, LLMProvider] = {}
+        self._avail_cache: Optional[list[str]] = None
+        self._avail_expires = 0.0
+        self.cache = cache
     
     def _get_provider(self) -> LLMProvider:
         """Get or create the LLM provider."""
         if self._provider is None:
-            llm_config = get_llm_config(self.config, self.provider_name)
-            self._provider = self._create_provider(llm_config)
+            self._provider = self._provider_for(self.provider_name)
         
         return self._provider
     
+    def _provider_for(self, provider_name: str) -> LLMProvider:
+        """Return the cached provider instance for a name, creating it once."""
+        provider = self._providers_by_name.get(provider_name)
+        if provider is None:
+            llm_config = get_llm_config(self.config, provider_name)
+            provider = self._create_provider(llm_config)
+            self._providers_by_name[provider_name] = provider
+        return provider
+    
     def _create_provider(self, llm_config: Dict[str, Any]) -> LLMProvider:
         """Create a provider instance based on configuration."""
-        # Support dict or SimpleNamespace
+        # Support dict or attribute-style config view
         provider_type = (
             llm_config['type'] if isinstance(llm_config, dict) else getattr(llm_config, 'type', '')
         ).lower()
@@ -67,6 +89,7 @@ class LLMClient:
         system_message: Optional[str] = None,
         messages: Optional[list] = None,
         extra_params: Optional[Dict[str, Any]] = None,
+        json_output: bool = False,
         **kwargs
     ) -> LLMResponse:
         """Generate a completion using the configured provider.
@@ -78,6 +101,7 @@ class LLMClient:
             system_message: System message for the conversation
             messages: List of message dictionaries
             extra_params: Additional parameters for the provider
+            json_output: Use the provider's JSON output mode, if it has one
             **kwargs: Additional keyword arguments
             
         Returns:
@@ -95,19 +119,245 @@ class LLMClient:
                 temperature=temperature,
                 system_message=system_message,
                 messages=messages,
-                extra_params=extra_params
+                extra_params=extra_params,
+                json_output=json_output
             )
             
+            cache_key = self._cache_key(request)
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    self.logger.info(f"Using cached completion for provider: {self.provider_name}")
+                    return cached
+            
             self.logger.info(f"Generating completion with provider: {self.provider_name}")
             response = provider.complete(request)
             
             self.logger.info(f"Generated {len(response.text)} characters")
+            if cache_key is not None:
+                self.cache.set(cache_key, response)
             return response
             
         except Exception as e:
             self.logger.error(f"LLM completion failed: {e}")
             raise
     
+    def complete_stream(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        system_message: Optional[str] = None,
+        extra_params: Optional[Dict[str, Any]] = None
+    ) -> Iterator[str]:
+        """Stream a completion from the configured provider.
+        
+        Args:
+            prompt: The input prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            system_message: System message for the conversation
+            extra_params: Additional parameters for the provider
+            
+        Returns:
+            Iterator over text chunks; closing it early stops generation
+        """
+        provider = self._get_provider()
+        if not provider.is_available():
+            raise RuntimeError(f"Provider {self.provider_name} is not available")
+        
+        request = LLMRequest(
+            prompt=prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system_message=system_message,
+            extra_params=extra_params
+        )
+        return provider.complete_stream(request)
+    
+    def complete_many(
+        self,
+        prompts: List[str],
+        concurrency: int = 8,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        system_message: Optional[str] = None,
+        extra_params: Optional[Dict[str, Any]] = None,
+        return_exceptions: bool = False,
+        stop_when: Optional[Callable[[str], bool]] = None,
+        json_output: bool = False
+    ) -> List[LLMResponse]:
+        """Generate completions for several prompts concurrently.
+        
+        Args:
+            prompts: Input prompts
+            concurrency: Maximum number of requests in flight
+            max_tokens: Maximum tokens to generate per prompt
+            temperature: Sampling temperature
+            system_message: System message applied to every prompt
+            extra_params: Additional parameters for the provider
+            return_exceptions: Return a failed request's exception in its slot
+                instead of raising it
+            stop_when: If given, responses are streamed and each one is cut off
+                as soon as this returns True for the text received so far
+            json_output: Use the provider's JSON output mode, if it has one
+            
+        Returns:
+            LLMResponse objects in the same order as ``prompts``
+        """
+        provider = self._get_provider()
+        if not provider.is_available():
+            raise RuntimeError(f"Provider {self.provider_name} is not available")
+        
+        requests = [
+            LLMRequest(
+                prompt=prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system_message=system_message,
+                extra_params=extra_params,
+                json_output=json_output
+            )
+            for prompt in prompts
+        ]
+        
+        self.logger.info(f"Generating {len(requests)} completions with provider: {self.provider_name}")
+        return asyncio.run(self._acomplete_many(provider, requests, concurrency, return_exceptions, stop_when))
+    
+    def complete_batch(
+        self,
+        prompts: List[str],
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        system_message: Optional[str] = None,
+        extra_params: Optional[Dict[str, Any]] = None,
+        poll_interval: float = 30.0,
+        concurrency: int = 8,
+        json_output: bool = False
+    ) -> List[LLMResponse | Exception]:
+        """Generate completions through the provider's offline batch API.
+        
+        Batch jobs are billed at a discount but may take hours, so this suits runs
+        nobody is waiting on. Cached prompts are answered locally and only the rest
+        are submitted. Providers without a batch API run the prompts through
+        ``complete_many`` instead.
+        
+        Args:
+            prompts: Input prompts
+            max_tokens: Maximum tokens to generate per prompt
+            temperature: Sampling temperature
+            system_message: System message applied to every prompt
+            extra_params: Additional parameters for the provider
+            poll_interval: Seconds between batch job status checks
+            concurrency: Requests in flight when falling back to ``complete_many``
+            json_output: Use the provider's JSON output mode, if it has one
+        
+        Returns:
+            LLMResponse objects in the same order as ``prompts``; failed requests
+            hold their exception instead
+        """
+        provider = self._get_provider()
+        if not provider.supports_batch:
+            return self.complete_many(prompts, concurrency=concurrency, max_tokens=max_tokens,
+                                      temperature=temperature, system_message=system_message,
+                                      extra_params=extra_params, return_exceptions=True,
+                                      json_output=json_output)
+        if not provider.is_available():
+            raise RuntimeError(f"Provider {self.provider_name} is not available")
+        
+        results: List[Optional[LLMResponse | Exception]] = [None] * len(prompts)
+        pending = []
+        for index, prompt in enumerate(prompts):
+            request = LLMRequest(
+                prompt=prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system_message=system_message,
+                extra_params=extra_params,
+                json_output=json_output
+            )
+            cache_key = self._cache_key(request)
+            cached = self.cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.append((index, request, cache_key))
+        
+        if pending:
+            self.logger.info(f"Submitting a batch of {len(pending)} completions to provider: {self.provider_name}")
+            responses = provider.complete_batch([request for _, request, _ in pending], poll_interval)
+            for (index, _, cache_key), response in zip(pending, responses):
+                results[index] = response
+                if cache_key is not None and not isinstance(response, Exception):
+                    self.cache.set(cache_key, response)
+        return results
+
+    async def _acomplete_many(
+        self,
+        provider: LLMProvider,
+        requests: List[LLMRequest],
+        concurrency: int,
+        return_exceptions: bool = False,
+        stop_when: Optional[Callable[[str], bool]] = None
+    ) -> List[LLMResponse]:
+        """Run provider requests with a bounded number in flight."""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def run(request: LLMRequest) -> LLMResponse:
+            cache_key = self._cache_key(request)
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            
+            async with semaphore:
+                if stop_when is None:
+                    response = await provider.acomplete(request)
+                else:
+                    response = await self._acollect_stream(provider, request, stop_when)
+            
+            if cache_key is not None:
+                self.cache.set(cache_key, response)
+            return response
+        
+        try:
+            return await asyncio.gather(*(run(request) for request in requests), return_exceptions=return_exceptions)
+        finally:
+            # The loop ends with this call, so loop-bound clients must be closed before it does
+            await provider.aclose()
+    
+    async def _acollect_stream(
+        self,
+        provider: LLMProvider,
+        request: LLMRequest,
+        stop_when: Callable[[str], bool]
+    ) -> LLMResponse:
+        """Accumulate a streamed completion, closing the stream once ``stop_when`` is satisfied."""
+        buf = io.StringIO()
+        finish_reason = "stop"
+        stream = provider.acomplete_stream(request)
+        try:
+            async for chunk in stream:
+                buf.write(chunk)
+                if stop_when(buf.getvalue()):
+                    finish_reason = "stop_when"
+                    break
+        finally:
+            await stream.aclose()
+        
+        return LLMResponse(
+            text=buf.getvalue(),
+            model=self.current_model,
+            finish_reason=finish_reason,
+            metadata={"provider": provider.provider_name, "streamed": True}
+        )
+    
+    def _cache_key(self, request: LLMRequest) -> Optional[bytes]:
+        """Cache key for a request against the current provider, or None when caching is off."""
+        if self.cache is None:
+            return None
+        return LLMResponseCache.make_key(f"{self.provider_name}:{self.current_model}", request)
+    
     def is_available(self) -> bool:
         """Check if the current provider is available."""
         try:
@@ -117,17 +367,22 @@ class LLMClient:
             return False
     
     def get_available_providers(self) -> list[str]:
-        """Get list of available providers."""
+        """Get list of available providers (cached for a short TTL)."""
+        now = time.monotonic()
+        if self._avail_cache is not None and now < self._avail_expires:
+            return list(self._avail_cache)
+        
         available = []
         for provider_name in self.config.providers.keys():
             try:
-                llm_config = get_llm_config(self.config, provider_name)
-                provider = self._create_provider(llm_config)
-                if provider.is_available():
+                if self._provider_for(provider_name).is_available():
                     available.append(provider_name)
             except Exception:
                 continue
-        return available
+        
+        self._avail_cache = available
+        self._avail_expires = now + _AVAILABILITY_TTL_SECONDS
+        return list(available)
     
     def switch_provider(self, provider_name: str) -> None:
         """Switch to a different provider."""
@@ -135,7 +390,21 @@ class LLMClient:
             raise ValueError(f"Unknown provider: {provider_name}")
         
         self.provider_name = provider_name
-        self._provider = None  # Force recreation
+        self._provider = None  # Re-resolve from the instance cache
+        self._avail_cache = None
+    
+    def close(self) -> None:
+        """Close every provider created by this client, and the response cache."""
+        for provider in self._providers_by_name.values():
+            try:
+                provider.close()
+            except Exception as e:
+                self.logger.warning(f"Failed to close provider {provider.provider_name}: {e}")
+        self._providers_by_name.clear()
+        self._provider = None
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
     
     @property
     def current_provider(self) -> str:
@@ -147,7 +416,7 @@ class LLMClient:
         """Get the current model name for the active provider, if available."""
         try:
             provider = self._get_provider()
-            # Support both dict configs and objects (e.g., SimpleNamespace)
+            # Support both dict configs and objects (e.g., the config view from get_llm_config)
             cfg = getattr(provider, 'config', None)
             if cfg is None:
                 return "unknown-model"
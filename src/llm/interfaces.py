@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 
 
 @dataclass
@@ -26,6 +27,8 @@ class LLMRequest:
     system_message: Optional[str] = None
     messages: Optional[List[Dict[str, str]]] = None
     extra_params: Optional[Dict[str, Any]] = None
+    # Ask the provider to constrain decoding to a single JSON object where it supports that
+    json_output: bool = False
 
 
 class LLMProvider(ABC):
@@ -40,6 +43,47 @@ class LLMProvider(ABC):
         """Generate a completion for the given request."""
         pass
     
+    async def acomplete(self, request: LLMRequest) -> LLMResponse:
+        """Asynchronously generate a completion.
+        
+        Providers without a native async client run the blocking call in a worker thread.
+        """
+        return await asyncio.to_thread(self.complete, request)
+    
+    def complete_stream(self, request: LLMRequest) -> Iterator[str]:
+        """Yield the completion text in chunks as it is generated.
+        
+        Providers without native streaming yield the whole completion as one chunk.
+        """
+        yield self.complete(request).text
+    
+    async def acomplete_stream(self, request: LLMRequest) -> AsyncIterator[str]:
+        """Asynchronously yield the completion text in chunks as it is generated."""
+        yield (await self.acomplete(request)).text
+    
+    @property
+    def supports_batch(self) -> bool:
+        """Whether ``complete_batch`` submits to a provider-side batch API."""
+        return False
+    
+    def complete_batch(self, requests: List[LLMRequest], poll_interval: float = 30.0) -> List[LLMResponse | Exception]:
+        """Run requests as one offline job on the provider's batch API and wait for the results.
+        
+        Args:
+            requests: Requests to submit together
+            poll_interval: Seconds between job status checks
+            
+        Returns:
+            One LLMResponse per request, in order; requests the job failed on hold the exception instead
+        """
+        raise NotImplementedError(f"{self.provider_name} has no batch API")
+    
+    def close(self) -> None:
+        """Release any resources held by the provider (no-op by default)."""
+    
+    async def aclose(self) -> None:
+        """Release resources bound to the running event loop (no-op by default)."""
+    
     @abstractmethod
     def is_available(self) -> bool:
         """Check if the provider is available and properly configured."""
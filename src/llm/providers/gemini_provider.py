@@ -2,13 +2,44 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 from src.llm.interfaces import LLMProvider, LLMRequest, LLMResponse
 from config.config_loader import get_api_key
 
 
+# Key last passed to genai.configure, which sets process-global state
+_configured_api_key: Optional[str] = None
+
+
+def _configure(api_key: Optional[str]) -> None:
+    """Point the SDK at api_key unless it is already the configured one."""
+    global _configured_api_key
+    if api_key and api_key != _configured_api_key:
+        import google.generativeai as genai
+        
+        genai.configure(api_key=api_key)
+        _configured_api_key = api_key
+
+
+@lru_cache(maxsize=8)
+def _make_model(model_name: str, api_key: Optional[str], safety_key: str):
+    """Build a GenerativeModel once per (model, key, safety settings) in this process.
+    
+    The key is only part of the cache key: a model binds the SDK client of whichever
+    key is configured when it first sends a request, so models are not shared across keys.
+    """
+    import google.generativeai as genai
+    
+    return genai.GenerativeModel(
+        model_name=model_name,
+        safety_settings=json.loads(safety_key)
+    )
+
+
 class GeminiProvider(LLMProvider):
     """Google Gemini API provider."""
     
@@ -21,21 +52,18 @@ class GeminiProvider(LLMProvider):
         """Lazy initialization of Gemini client."""
         if self._client is None:
             try:
-                import google.generativeai as genai
-                
                 if self.config.api_key_env:
                     self._api_key = get_api_key(self.config.api_key_env)
-                    genai.configure(api_key=self._api_key)
                 
-                self._client = genai.GenerativeModel(
-                    model_name=self.config.model,
-                    safety_settings=self._get_safety_settings()
-                )
+                safety_key = json.dumps(self._get_safety_settings(), sort_keys=True)
+                self._client = _make_model(self.config.model, self._api_key, safety_key)
             except ImportError:
                 raise ImportError("google-generativeai package not installed. Run: pip install google-generativeai")
             except Exception as e:
                 raise RuntimeError(f"Failed to initialize Gemini client: {e}")
         
+        # Checked on every call: another provider may have configured a different key since
+        _configure(self._api_key)
         return self._client
     
     def _get_safety_settings(self) -> List[Dict[str, Any]]:
@@ -57,7 +85,7 @@ class GeminiProvider(LLMProvider):
             "BLOCK_LOW_AND_ABOVE": "BLOCK_LOW_AND_ABOVE"
         }
         
-        # Support dict or SimpleNamespace
+        # Support dict or attribute-style config view
         raw_settings = self.config.safety_settings
         if hasattr(raw_settings, 'items'):
             items_iter = raw_settings.items()
@@ -80,50 +108,69 @@ class GeminiProvider(LLMProvider):
         """Generate completion using Gemini API."""
         try:
             client = self._get_client()
-            
-            # Prepare the prompt
-            full_prompt = request.prompt
-            if request.system_message:
-                full_prompt = f"System: {request.system_message}\n\nUser: {request.prompt}"
-            
-            # Generate content
-            generation_config = {
-                "max_output_tokens": request.max_tokens or self.config.max_tokens,
-                "temperature": request.temperature or self.config.temperature,
-            }
-            
-            # Add extra parameters
-            if request.extra_params:
-                generation_config.update(request.extra_params)
-            
+            full_prompt, generation_config = self._prepare_request(request)
             response = client.generate_content(
                 full_prompt,
                 generation_config=generation_config
             )
-            
-            # Extract response text
-            response_text = response.text if response.text else ""
-            
-            # Extract usage information if available
-            usage = None
-            if hasattr(response, 'usage_metadata'):
-                usage = {
-                    "prompt_tokens": getattr(response.usage_metadata, 'prompt_token_count', 0),
-                    "completion_tokens": getattr(response.usage_metadata, 'candidates_token_count', 0),
-                    "total_tokens": getattr(response.usage_metadata, 'total_token_count', 0)
-                }
-            
-            return LLMResponse(
-                text=response_text,
-                usage=usage,
-                model=self.config.model,
-                finish_reason=getattr(response, 'finish_reason', 'stop'),
-                metadata={"provider": "gemini", "safety_ratings": getattr(response, 'safety_ratings', [])}
-            )
+            return self._build_response(response)
             
         except Exception as e:
             raise RuntimeError(f"Gemini API error: {e}")
     
+    async def acomplete(self, request: LLMRequest) -> LLMResponse:
+        """Generate completion by running the blocking call in a worker thread.
+        
+        generate_content_async is avoided on purpose: the SDK caches its grpc.aio client
+        bound to the first event loop it ran on, and complete_many starts a fresh loop per
+        call, so every later call would land on a closed loop.
+        """
+        return await asyncio.to_thread(self.complete, request)
+    
+    def _prepare_request(self, request: LLMRequest) -> Tuple[str, Dict[str, Any]]:
+        """Build the prompt text and generation config for a request."""
+        # Prepare the prompt
+        full_prompt = request.prompt
+        if request.system_message:
+            full_prompt = f"System: {request.system_message}\n\nUser: {request.prompt}"
+        
+        # Generate content
+        generation_config = {
+            "max_output_tokens": request.max_tokens or self.config.max_tokens,
+            "temperature": request.temperature or self.config.temperature,
+        }
+        
+        if request.json_output:
+            generation_config["response_mime_type"] = "application/json"
+        
+        # Add extra parameters
+        if request.extra_params:
+            generation_config.update(request.extra_params)
+        
+        return full_prompt, generation_config
+    
+    def _build_response(self, response) -> LLMResponse:
+        """Convert a Gemini response into an LLMResponse."""
+        # Extract response text
+        response_text = response.text if response.text else ""
+        
+        # Extract usage information if available
+        usage = None
+        if hasattr(response, 'usage_metadata'):
+            usage = {
+                "prompt_tokens": getattr(response.usage_metadata, 'prompt_token_count', 0),
+                "completion_tokens": getattr(response.usage_metadata, 'candidates_token_count', 0),
+                "total_tokens": getattr(response.usage_metadata, 'total_token_count', 0)
+            }
+        
+        return LLMResponse(
+            text=response_text,
+            usage=usage,
+            model=self.config.model,
+            finish_reason=getattr(response, 'finish_reason', 'stop'),
+            metadata={"provider": "gemini", "safety_ratings": getattr(response, 'safety_ratings', [])}
+        )
+    
     def is_available(self) -> bool:
         """Check if Gemini provider is available."""
         try:
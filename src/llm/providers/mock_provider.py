@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from src.llm.interfaces import LLMProvider, LLMRequest, LLMResponse
+from src.serialization import dumps
 
 
 class MockProvider(LLMProvider):
@@ -31,12 +32,10 @@ class MockProvider(LLMProvider):
         Returns:
             Mock LLM response with predefined test case data
         """
-        import json
-        
         # Simple heuristic to determine response type
         if "test case" in request.prompt.lower() or "json" in request.prompt.lower():
             response_data = self._response_templates["test_case"]
-            response_text = json.dumps(response_data, indent=2)
+            response_text = dumps(response_data, indent=True)
         else:
             response_text = "Mock LLM response: " + request.prompt[:100] + "..."
         
@@ -2,11 +2,71 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import asyncio
+import importlib.util
+import time
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 
 from src.llm.interfaces import LLMProvider, LLMRequest, LLMResponse
+from src.serialization import dumps_bytes, loads
 from config.config_loader import get_api_key
 
+_DEFAULT_TIMEOUT_SECONDS = 60.0
+_CONNECT_TIMEOUT_SECONDS = 10.0
+# The SDK retries 408/409/429/5xx and connection errors with exponential backoff and jitter
+_DEFAULT_MAX_RETRIES = 5
+
+# Connection pool shared by every request of a client; idle connections are kept alive for reuse
+_MAX_CONNECTIONS = 64
+_MAX_KEEPALIVE_CONNECTIONS = 32
+# httpx only speaks HTTP/2 when the optional h2 package is installed (pip install "httpx[http2]")
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Batch API jobs finish within this window at a discount; these statuses end polling
+_BATCH_COMPLETION_WINDOW = "24h"
+_BATCH_FINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+# Shared, read-only metadata attached to every response
+_PROVIDER_METADATA = MappingProxyType({"provider": "openai"})
+
+
+def _usage_dict(usage) -> Optional[Dict[str, int]]:
+    """Token usage as a plain dict; the v1 SDK always sets ``usage``, possibly to None."""
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens
+    }
+
+
+def _batch_results(output: str, count: int) -> List[LLMResponse | Exception]:
+    """Map Batch API output lines back to request order via their ``custom_id``."""
+    results: List[LLMResponse | Exception] = [RuntimeError("OpenAI batch returned no result")] * count
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        entry = loads(line)
+        index = int(entry["custom_id"])
+        response = entry.get("response") or {}
+        body = response.get("body") or {}
+        if entry.get("error") or response.get("status_code") != 200:
+            error = entry.get("error") or body.get("error")
+            results[index] = RuntimeError(f"OpenAI batch request failed: {error}")
+            continue
+        choice = body["choices"][0]
+        usage = body.get("usage")
+        results[index] = LLMResponse(
+            text=choice["message"]["content"],
+            usage={key: usage[key] for key in ("prompt_tokens", "completion_tokens", "total_tokens")} if usage else None,
+            model=body.get("model"),
+            finish_reason=choice.get("finish_reason"),
+            metadata=_PROVIDER_METADATA
+        )
+    return results
+
 
 class OpenAIProvider(LLMProvider):
     """OpenAI API provider."""
@@ -15,18 +75,29 @@ class OpenAIProvider(LLMProvider):
         super().__init__(config)
         self._client = None
         self._api_key = None
+        self._async_client = None
+        self._async_loop = None
     
     def _get_client(self):
         """Lazy initialization of OpenAI client."""
         if self._client is None:
             try:
+                import httpx
                 import openai
                 
                 if self.config.api_key_env:
                     self._api_key = get_api_key(self.config.api_key_env)
-                    openai.api_key = self._api_key
                 
-                self._client = openai
+                # One client for the provider's lifetime so HTTP connections are pooled
+                self._client = openai.OpenAI(
+                    api_key=self._api_key,
+                    max_retries=self._max_retries(),
+                    http_client=httpx.Client(
+                        http2=_HTTP2_AVAILABLE,
+                        limits=self._limits(),
+                        timeout=self._timeout()
+                    )
+                )
             except ImportError:
                 raise ImportError("openai package not installed. Run: pip install openai")
             except Exception as e:
@@ -34,54 +105,234 @@ class OpenAIProvider(LLMProvider):
         
         return self._client
     
+    def _get_async_client(self):
+        """Async OpenAI client for the running event loop (its HTTP pool is loop-bound)."""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            try:
+                import httpx
+                import openai
+            except ImportError:
+                raise ImportError("openai package not installed. Run: pip install openai")
+            
+            if self.config.api_key_env:
+                self._api_key = get_api_key(self.config.api_key_env)
+            # Same pool settings as the sync client, so concurrent requests share keep-alive connections
+            self._async_client = openai.AsyncOpenAI(
+                api_key=self._api_key,
+                max_retries=self._max_retries(),
+                http_client=httpx.AsyncClient(
+                    http2=_HTTP2_AVAILABLE,
+                    limits=self._limits(),
+                    timeout=self._timeout()
+                )
+            )
+            self._async_loop = loop
+        
+        return self._async_client
+    
+    def _max_retries(self) -> int:
+        """Transient-error retries performed by the SDK (provider ``max_retries`` setting)."""
+        max_retries = getattr(self.config, 'max_retries', None)
+        return _DEFAULT_MAX_RETRIES if max_retries is None else int(max_retries)
+    
+    def _limits(self):
+        """Connection pool limits for the provider's HTTP clients."""
+        import httpx
+        
+        return httpx.Limits(max_connections=_MAX_CONNECTIONS, max_keepalive_connections=_MAX_KEEPALIVE_CONNECTIONS)
+    
+    def _timeout(self):
+        """Per-request timeout with a short connect phase (provider ``timeout`` setting)."""
+        import httpx
+        
+        total = getattr(self.config, 'timeout', None) or _DEFAULT_TIMEOUT_SECONDS
+        return httpx.Timeout(total, connect=min(total, _CONNECT_TIMEOUT_SECONDS))
+    
+    def _build_messages(self, request: LLMRequest) -> List[Dict[str, str]]:
+        """Build the chat message list for a request."""
+        messages = []
+        if request.system_message:
+            messages.append({"role": "system", "content": request.system_message})
+        
+        if request.messages:
+            messages.extend(request.messages)
+        else:
+            messages.append({"role": "user", "content": request.prompt})
+        return messages
+    
+    def _extra_params(self, request: LLMRequest) -> Dict[str, Any]:
+        """Provider parameters for a request, including JSON mode when it is requested."""
+        params = dict(request.extra_params or {})
+        if request.json_output:
+            params.setdefault("response_format", {"type": "json_object"})
+        return params
+    
+    async def acomplete(self, request: LLMRequest) -> LLMResponse:
+        """Generate completion using the async OpenAI client."""
+        try:
+            client = self._get_async_client()
+            response = await client.chat.completions.create(
+                model=self.config.model,
+                messages=self._build_messages(request),
+                max_tokens=request.max_tokens or self.config.max_tokens,
+                temperature=request.temperature or self.config.temperature,
+                **self._extra_params(request)
+            )
+            
+            choice = response.choices[0]
+            return LLMResponse(
+                text=choice.message.content,
+                usage=_usage_dict(response.usage),
+                model=self.config.model,
+                finish_reason=choice.finish_reason,
+                metadata=_PROVIDER_METADATA
+            )
+            
+        except Exception as e:
+            raise RuntimeError(f"OpenAI API error: {e}")
+    
     def complete(self, request: LLMRequest) -> LLMResponse:
         """Generate completion using OpenAI API."""
         try:
             client = self._get_client()
             
             # Prepare messages
-            messages = []
-            if request.system_message:
-                messages.append({"role": "system", "content": request.system_message})
-            
-            if request.messages:
-                messages.extend(request.messages)
-            else:
-                messages.append({"role": "user", "content": request.prompt})
+            messages = self._build_messages(request)
             
             # Generate completion
-            response = client.ChatCompletion.create(
+            response = client.chat.completions.create(
                 model=self.config.model,
                 messages=messages,
                 max_tokens=request.max_tokens or self.config.max_tokens,
                 temperature=request.temperature or self.config.temperature,
-                **(request.extra_params or {})
+                **self._extra_params(request)
             )
             
             # Extract response
             choice = response.choices[0]
             response_text = choice.message.content
             
-            # Extract usage information
-            usage = None
-            if hasattr(response, 'usage'):
-                usage = {
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_tokens": response.usage.total_tokens
-                }
-            
             return LLMResponse(
                 text=response_text,
-                usage=usage,
+                usage=_usage_dict(response.usage),
                 model=self.config.model,
                 finish_reason=choice.finish_reason,
-                metadata={"provider": "openai"}
+                metadata=_PROVIDER_METADATA
             )
             
         except Exception as e:
             raise RuntimeError(f"OpenAI API error: {e}")
     
+    def complete_stream(self, request: LLMRequest) -> Iterator[str]:
+        """Yield completion text deltas as OpenAI streams them.
+        
+        Closing the generator early closes the HTTP stream, which stops generation.
+        """
+        try:
+            client = self._get_client()
+            stream = client.chat.completions.create(
+                model=self.config.model,
+                messages=self._build_messages(request),
+                max_tokens=request.max_tokens or self.config.max_tokens,
+                temperature=request.temperature or self.config.temperature,
+                stream=True,
+                **self._extra_params(request)
+            )
+        except Exception as e:
+            raise RuntimeError(f"OpenAI API error: {e}")
+        
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()
+    
+    async def acomplete_stream(self, request: LLMRequest) -> AsyncIterator[str]:
+        """Yield completion text deltas from the async OpenAI client."""
+        try:
+            client = self._get_async_client()
+            stream = await client.chat.completions.create(
+                model=self.config.model,
+                messages=self._build_messages(request),
+                max_tokens=request.max_tokens or self.config.max_tokens,
+                temperature=request.temperature or self.config.temperature,
+                stream=True,
+                **self._extra_params(request)
+            )
+        except Exception as e:
+            raise RuntimeError(f"OpenAI API error: {e}")
+        
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+    
+    @property
+    def supports_batch(self) -> bool:
+        """OpenAI runs chat completions through the Batch API."""
+        return True
+    
+    def complete_batch(self, requests: List[LLMRequest], poll_interval: float = 30.0) -> List[LLMResponse | Exception]:
+        """Submit requests as one Batch API job, wait for it, and return its results in order."""
+        client = self._get_client()
+        lines = [
+            dumps_bytes({
+                "custom_id": str(index),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.config.model,
+                    "messages": self._build_messages(request),
+                    "max_tokens": request.max_tokens or self.config.max_tokens,
+                    "temperature": request.temperature or self.config.temperature,
+                    **self._extra_params(request)
+                }
+            })
+            for index, request in enumerate(requests)
+        ]
+        
+        try:
+            input_file = client.files.create(file=("batch.jsonl", b"\n".join(lines)), purpose="batch")
+            batch = client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window=_BATCH_COMPLETION_WINDOW
+            )
+            while batch.status not in _BATCH_FINAL_STATUSES:
+                time.sleep(poll_interval)
+                batch = client.batches.retrieve(batch.id)
+        except Exception as e:
+            raise RuntimeError(f"OpenAI API error: {e}")
+        
+        if batch.status != "completed":
+            raise RuntimeError(f"OpenAI batch {batch.id} ended with status {batch.status}")
+        
+        # Successful requests land in the output file, failed ones in a separate error file
+        output = "\n".join(
+            client.files.content(file_id).text
+            for file_id in (batch.output_file_id, batch.error_file_id) if file_id
+        )
+        return _batch_results(output, len(requests))
+    
+    async def aclose(self) -> None:
+        """Close the async client; its HTTP pool is bound to the loop that is finishing."""
+        if self._async_client is not None:
+            client, self._async_client, self._async_loop = self._async_client, None, None
+            await client.close()
+    
+    def close(self) -> None:
+        """Release the pooled HTTP connections."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+        if self._async_client is not None:
+            # Left over only if a loop ended without aclose(); its sockets are closed on a fresh loop
+            asyncio.run(self.aclose())
+    
     def is_available(self) -> bool:
         """Check if OpenAI provider is available."""
         try:
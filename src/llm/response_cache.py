@@ -0,0 +1,109 @@
+"""Disk-backed cache of LLM responses, keyed by model and request parameters."""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+from src.llm.interfaces import LLMRequest, LLMResponse
+from src.serialization import dumps, loads
+
+
+class LLMResponseCache:
+    """SQLite store of completed LLM responses.
+
+    Identical requests (same model, prompt and generation parameters) are answered
+    from disk, so re-running a change request skips the LLM round-trips entirely.
+    """
+
+    def __init__(self, db_path: Path):
+        """Open (or create) the cache database.
+
+        Args:
+            db_path: Path to the SQLite cache file
+        """
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # Lookup counters since the cache was opened
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key BLOB PRIMARY KEY,
+                response BLOB NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+    @staticmethod
+    def make_key(model: str, request: LLMRequest) -> bytes:
+        """Hash everything that influences the completion into a cache key.
+
+        Args:
+            model: Provider and model identifier
+            request: The request being sent
+
+        Returns:
+            SHA-256 digest identifying the request
+        """
+        payload = dumps([
+            model,
+            request.max_tokens,
+            request.temperature,
+            request.system_message,
+            request.messages,
+            request.extra_params,
+            request.json_output,
+            request.prompt,
+        ])
+        return hashlib.sha256(payload.encode("utf-8")).digest()
+
+    def get(self, key: bytes) -> Optional[LLMResponse]:
+        """Return the cached response for a key, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            response = None
+            if row is not None:
+                try:
+                    response = LLMResponse(**loads(row[0]))
+                except (TypeError, ValueError):
+                    pass
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return response
+
+    def set(self, key: bytes, response: LLMResponse) -> None:
+        """Store a response; responses that cannot be serialized are simply not cached."""
+        payload = {field.name: getattr(response, field.name) for field in dataclasses.fields(response)}
+        if payload["metadata"] is not None:
+            # Providers may share a read-only mapping here; store a plain copy
+            payload["metadata"] = dict(payload["metadata"])
+        try:
+            data = dumps(payload)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, response) VALUES (?, ?)",
+                (key, data)
+            )
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+
+    def close(self) -> None:
+        """Close the cache database."""
+        with self._lock:
+            self._conn.close()
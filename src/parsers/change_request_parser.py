@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from bisect import bisect_left
 from dataclasses import dataclass
 from pathlib import Path
 import re
@@ -15,21 +16,35 @@ class ChangeRequest:
 
 CHANGE_TYPES = {"new_feature", "feature_update", "bug_fix"}
 
+_TITLE_RE = re.compile(r"(?im)^#\s+(.+)$")
+_CHANGE_TYPE_RE = re.compile(r"(?im)change[_ -]?type\s*[:|-]\s*(new_feature|feature_update|bug[_ -]?fix)")
+_BUG_HINT_RE = re.compile(r"(?i)bug|fix|patch")
+_UPDATE_HINT_RE = re.compile(r"(?i)update|modify|tweak")
+_DESCRIPTION_RE = re.compile(r"(?im)^description\s*:|^##\s*description\b")
+_ACCEPTANCE_RE = re.compile(r"(?im)^acceptance criteria\s*:|^##\s*acceptance criteria\b|^###\s*acceptance criteria\b")
+# Zero-width so that overlapping boundaries (e.g. "Label:\n# Heading") are all reported
+_HEADING_START_RE = re.compile(r"(?=\n#{1,3}\s+\w|\n[A-Za-z][A-Za-z _-]*:\s*\n)")
+_BULLET_RE = re.compile(r"(?m)^[-*]\s+(.+)$")
 
-def parse_change_request(path: Path) -> ChangeRequest:
+
+def parse_change_request(path: Path, raw: bytes | None = None) -> ChangeRequest:
     """Parse a change request file and extract structured information.
     
     Args:
         path: Path to the change request file
+        raw: Optional file contents already read by the caller; skips re-reading ``path``
         
     Returns:
         ChangeRequest object with parsed information
     """
-    text = path.read_text(encoding="utf-8")
+    text = raw.decode("utf-8") if raw is not None else path.read_text(encoding="utf-8")
     change_type = _extract_change_type(text)
     title = _extract_title(text)
-    description = _extract_section(text, pattern=r"(?im)^description\s*:|^##\s*description\b") or text.strip()[:2000]
-    acceptance = _extract_bullets(text, pattern=r"(?im)^acceptance criteria\s*:|^##\s*acceptance criteria\b|^###\s*acceptance criteria\b")
+    # One pass over the document for every section boundary
+    heading_starts = [m.start() for m in _HEADING_START_RE.finditer(text)]
+    description = _extract_section(text, _DESCRIPTION_RE, heading_starts) or text.strip()[:2000]
+    # Cheap substring check before running the section regex
+    acceptance = _extract_bullets(text, _ACCEPTANCE_RE, heading_starts) if "acceptance" in text.lower() else []
     return ChangeRequest(
         change_type=change_type,
         title=title,
@@ -39,40 +54,37 @@ def parse_change_request(path: Path) -> ChangeRequest:
 
 
 def _extract_title(text: str) -> str:
-    m = re.search(r"(?im)^#\s+(.+)$", text)
+    m = _TITLE_RE.search(text)
     return m.group(1).strip() if m else "Untitled Change Request"
 
 
 def _extract_change_type(text: str) -> str:
-    m = re.search(r"(?im)change[_ -]?type\s*[:|-]\s*(new_feature|feature_update|bug[_ -]?fix)", text)
+    m = _CHANGE_TYPE_RE.search(text)
     if m:
         value = m.group(1).replace(" ", "_").replace("-", "_")
         return value
     # Fallback: infer from keywords
-    if re.search(r"(?i)bug|fix|patch", text):
+    if _BUG_HINT_RE.search(text):
         return "bug_fix"
-    if re.search(r"(?i)update|modify|tweak", text):
+    if _UPDATE_HINT_RE.search(text):
         return "feature_update"
     return "new_feature"
 
 
-def _extract_section(text: str, pattern: str) -> str | None:
-    m = re.search(pattern, text)
+def _extract_section(text: str, pattern: re.Pattern, heading_starts: list[int]) -> str | None:
+    m = pattern.search(text)
     if not m:
         return None
     start = m.end()
-    following = text[start:]
     # Stop at next heading
-    end_match = re.search(r"\n#{1,3}\s+\w+|\n[A-Za-z][A-Za-z _-]*:\s*\n", following)
-    end = end_match.start() if end_match else len(following)
-    return following[:end].strip()
+    i = bisect_left(heading_starts, start)
+    end = heading_starts[i] if i < len(heading_starts) else len(text)
+    return text[start:end].strip()
 
 
-def _extract_bullets(text: str, pattern: str) -> list[str]:
-    section = _extract_section(text, pattern)
+def _extract_bullets(text: str, pattern: re.Pattern, heading_starts: list[int]) -> list[str]:
+    section = _extract_section(text, pattern, heading_starts)
     if not section:
         return []
-    bullets = re.findall(r"(?m)^[-*]\s+(.+)$", section)
+    bullets = _BULLET_RE.findall(section)
     return [b.strip() for b in bullets if b.strip()]
-
-
@@ -1,16 +1,38 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
+import io
 import json
+import re
+import sys
 
+from src.serialization import dumps_bytes, loads
 from src.parsers.change_request_parser import ChangeRequest
 from src.retrieval.retriever_interface import Retriever
 from src.validation.schema_validator import validate_instance
 from src.llm.client import LLMClient
-from src.prompts.bug_fix_prompts import BugFixPrompts
+from src.prompts.bug_fix_prompts import controlled_analysis, controlled_analysis_batch, controlled_analysis_static_context, controlled_analysis_system
 from src.context.iw_context import load_iw_context
 from src.pipelines.shared import PipelineOutput, perform_retrieval, load_validator, display_pipeline_completion, display_skip_message
 
+_JSON_DECODER = json.JSONDecoder()
+_JSON_CODEBLOCK_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+
+# Upper bound on concurrent test case file writes
+_MAX_WRITE_WORKERS = 8
+
+# Related test cases listed in the report table
+_REPORT_MAX_ROWS = 10
+
+# Whitespace-delimited alphabetic tokens of 3+ letters, ignoring surrounding punctuation
+_QUERY_WORD_RE = re.compile(r"(?<!\S)[.,!?;:()\[\]{}*`]*([^\W\d_]{3,})[.,!?;:()\[\]{}*`]*(?!\S)")
+
+# Filter out common words and focus on technical terms
+_BUG_FIX_COMMON_WORDS = frozenset({"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by", "is", "are", "was", "were", "be", "been", "being", "have", "has", "had", "do", "does", "did", "will", "would", "could", "should", "may", "might", "must", "can", "this", "that", "these", "those", "change", "request", "author", "engineer", "overview", "discovered", "when", "pro", "turns", "back", "resulting", "missed", "steps", "reproduce", "launch", "allowed", "go", "settings", "notifications", "toggle", "allow", "push", "off", "kill", "relaunch", "removed", "return", "observe", "via", "charles", "proxyman", "no", "api", "call", "sent", "acceptance", "criteria", "sends", "fresh", "within", "seconds", "success", "toast", "re-enabled", "displayed", "present", "django", "admin", "under", "user", "profile"})
+_BUG_FIX_IMPORTANT_WORDS = frozenset({"notification", "push", "token", "refresh", "register", "settings", "toggle", "permission", "enable", "disable", "backend", "api", "app"})
+
 
 def run_bug_fix_pipeline(
     change: ChangeRequest,
@@ -46,15 +68,21 @@ def run_bug_fix_pipeline(
     
     # Step A: Controlled bug fix analysis with audit trail
     print("📝 Analyzing bug fix impact with controlled approach...")
-    updated_paths, analysis_log = _controlled_bug_fix_analysis(change, related, test_cases_dir, validator, llm_client, dry_run)
+    concurrency = config.global_settings.get('max_concurrency', 4) if config else 4
+    batch_size = config.global_settings.get('analysis_batch_size', 4) if config else 4
+    updated_paths, analysis_log = _controlled_bug_fix_analysis(
+        change, related, test_cases_dir, validator, llm_client, dry_run, concurrency, batch_size
+    )
     
     # Step C: Generate comprehensive change log
-    report = _build_auditable_report(change, related, updated_paths, analysis_log)
+    report_columns = _related_report_columns(related[:_REPORT_MAX_ROWS])
+    report = _build_auditable_report(change, related, updated_paths, analysis_log, report_columns)
     return PipelineOutput(updated=updated_paths, created=[], report=report, related_count=len(related), related_test_cases=related)
 
 
 def _controlled_bug_fix_analysis(change: ChangeRequest, related: list[dict], test_cases_dir: Path, 
-                                validator, llm_client: LLMClient, dry_run: bool) -> tuple[list[Path], list[dict]]:
+                                validator, llm_client: LLMClient, dry_run: bool,
+                                concurrency: int = 4, batch_size: int = 4) -> tuple[list[Path], list[dict]]:
     """
     Step A & B: Controlled bug fix analysis with audit trail.
     
@@ -73,48 +101,100 @@ def _controlled_bug_fix_analysis(change: ChangeRequest, related: list[dict], tes
     
     print(f"🔄 Analyzing {len(related)} test cases for bug fix impact...")
     
+    # Step A: Context packaging for LLM (all test cases up front)
+    jobs = []
     for i, tc_data in enumerate(related, 1):
         tc_id = tc_data.get("doc_id")
         if not tc_id:
             continue
-            
-        print(f"  📋 Analyzing test case {i}/{len(related)}: {tc_data.get('title', 'Unknown')}")
         
-        # Step A: Context packaging for LLM
         original_tc = _load_original_test_case(tc_id, test_cases_dir, tc_data)
         if not original_tc:
             print(f"    ❌ Could not load original test case {tc_id}")
             print("    The local index may be stale or corrupted.")
             print("    Please run: python reset_database.py and re-run the tool.")
-            import sys
             sys.exit(1)
+        jobs.append((i, tc_id, tc_data, original_tc))
+    
+    # Step B: Controlled analysis; test cases are sent batch_size per request so the shared
+    # context is billed once per batch, and the batch round-trips overlap. Instructions and
+    # IW context go in one system message shared by every request (a cacheable prefix).
+    static_context = _build_bug_fix_static_context(change, iw_context)
+    batch_size = max(1, batch_size)
+    batched = batch_size > 1
+    system_message = controlled_analysis_system(static_context, batch=batched)
+    batches = [jobs[start:start + batch_size] for start in range(0, len(jobs), batch_size)]
+    prompts = [_build_bug_fix_batch_prompt(batch, static_context, batched) for batch in batches]
+    try:
+        responses = llm_client.complete_many(prompts, concurrency=concurrency, max_tokens=2000 * batch_size,
+                                             system_message=system_message, return_exceptions=True,
+                                             stop_when=_analysis_json_complete)
+    except Exception as e:
+        responses = [e] * len(batches)
+    
+    outcomes = {}
+    retry_jobs = []
+    for batch, response in zip(batches, responses):
+        if isinstance(response, Exception):
+            outcomes.update((tc_id, response) for _, tc_id, _, _ in batch)
+        elif not batched:
+            outcomes[batch[0][1]] = _parse_controlled_bug_fix_analysis(response.text)
+        else:
+            analyses = _parse_batch_bug_fix_analysis(response.text)
+            if analyses is None:
+                # Unparseable or truncated batch answer: retry its test cases one per request
+                retry_jobs.extend(batch)
+                continue
+            for job in batch:
+                tc_id = job[1]
+                if str(tc_id) in analyses:
+                    outcomes[tc_id] = analyses[str(tc_id)]
+                else:
+                    # Skipped or misspelled id: an unanswered case is not a "no update" answer
+                    retry_jobs.append(job)
+    
+    if retry_jobs:
+        print(f"  🔁 Retrying {len(retry_jobs)} test cases individually after an incomplete batch response")
+        prompts = [_build_bug_fix_prompt(original_tc, static_context) for _, _, _, original_tc in retry_jobs]
+        try:
+            responses = llm_client.complete_many(prompts, concurrency=concurrency, max_tokens=2000,
+                                                 system_message=controlled_analysis_system(static_context),
+                                                 return_exceptions=True, stop_when=_analysis_json_complete)
+        except Exception as e:
+            responses = [e] * len(retry_jobs)
+        for (_, tc_id, _, _), response in zip(retry_jobs, responses):
+            if isinstance(response, Exception):
+                outcomes[tc_id] = response
+            else:
+                outcomes[tc_id] = _parse_controlled_bug_fix_analysis(response.text)
+    
+    pending_writes: list[tuple[Path, dict, dict]] = []
+    for i, tc_id, tc_data, original_tc in jobs:
+        print(f"  📋 Analyzing test case {i}/{len(related)}: {tc_data.get('title', 'Unknown')}")
         
-        # Step B: Controlled analysis with structured response
         try:
-            updated_tc, analysis_summary = _get_controlled_bug_fix_analysis(
-                change, original_tc, iw_context, llm_client
-            )
+            outcome = outcomes[tc_id]
+            if isinstance(outcome, Exception):
+                print(f"    ⚠️  LLM analysis failed: {outcome}")
+                updated_tc, analysis_summary = None, None
+            else:
+                updated_tc, analysis_summary = outcome
             
             if updated_tc and analysis_summary:
                 # Validate the updated test case
-                errors = validate_instance(validator, updated_tc)
+                errors = validate_instance(validator, updated_tc, fail_fast=True)
                 if not errors:
                     # Apply the update
                     file_path = _get_test_case_file_path(tc_id, test_cases_dir, tc_data)
                     if file_path and file_path.exists():
-                        if not dry_run:
-                            import json
-                            file_path.write_text(json.dumps(updated_tc, indent=2), encoding="utf-8")
-                        updated_paths.append(file_path)
-                        
-                        # Add to analysis log
-                        analysis_log_entries.append({
+                        # Queue the write together with its analysis log entry
+                        pending_writes.append((file_path, updated_tc, {
                             "test_case_id": tc_id,
                             "test_case_title": original_tc.get("title", "Unknown"),
                             "file_path": str(file_path),
                             "analysis_summary": analysis_summary,
                             "timestamp": _get_timestamp()
-                        })
+                        }))
                         
                         print(f"    ✅ Updated with {len(analysis_summary.get('changes', []))} changes")
                     else:
@@ -128,19 +208,54 @@ def _controlled_bug_fix_analysis(change: ChangeRequest, related: list[dict], tes
             print(f"    ⚠️  Analysis failed: {e}")
             continue
     
+    updated_paths, analysis_log_entries = _write_updated_test_cases(pending_writes, dry_run)
+    
     display_pipeline_completion("controlled bug fix", len(related), len(updated_paths), 0, len(analysis_log_entries), updated_paths)
     
     return updated_paths, analysis_log_entries
 
 
+def _write_updated_test_cases(pending_writes: list[tuple[Path, dict, dict]],
+                              dry_run: bool) -> tuple[list[Path], list[dict]]:
+    """
+    Write validated test case updates on a thread pool.
+    
+    Returns:
+        tuple: (updated_paths, analysis_log_entries) for the updates that were applied
+    """
+    if dry_run or not pending_writes:
+        errors = [None] * len(pending_writes)
+    else:
+        with ThreadPoolExecutor(max_workers=min(_MAX_WRITE_WORKERS, len(pending_writes))) as executor:
+            errors = list(executor.map(_write_test_case_file, pending_writes))
+    
+    updated_paths: list[Path] = []
+    analysis_log_entries: list[dict] = []
+    for (file_path, _, log_entry), error in zip(pending_writes, errors):
+        if error is not None:
+            print(f"    ⚠️  Failed to write {file_path.name}: {error}")
+            continue
+        updated_paths.append(file_path)
+        analysis_log_entries.append(log_entry)
+    return updated_paths, analysis_log_entries
+
+
+def _write_test_case_file(pending_write: tuple[Path, dict, dict]) -> Exception | None:
+    """Write one updated test case, returning the error instead of raising it."""
+    file_path, updated_tc, _ = pending_write
+    try:
+        file_path.write_bytes(dumps_bytes(updated_tc, indent=True))
+    except OSError as e:
+        return e
+    return None
+
+
 def _load_original_test_case(tc_id: str, test_cases_dir: Path, tc_data: dict) -> dict:
     """Load the original test case from file."""
     try:
         file_path = _get_test_case_file_path(tc_id, test_cases_dir, tc_data)
         if file_path and file_path.exists():
-            import json
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return loads(file_path.read_bytes())
     except Exception as e:
         print(f"    ⚠️  Failed to load test case {tc_id}: {e}")
     return None
@@ -162,69 +277,43 @@ def _get_test_case_file_path(tc_id: str, test_cases_dir: Path, tc_data: dict) ->
     return test_cases_dir / f"{tc_id}.json"
 
 
-def _get_controlled_bug_fix_analysis(change: ChangeRequest, original_tc: dict, 
-                                    iw_context: str, llm_client: LLMClient) -> tuple[dict, dict]:
+def _build_bug_fix_static_context(change: ChangeRequest, iw_context: str) -> dict:
+    """Build the prompt fields that are identical for every test case of this change."""
+    change_request = {
+        "title": change.title,
+        "description": change.description,
+        "acceptance_criteria": change.acceptance_criteria,
+        "change_type": change.change_type
+    }
+    return controlled_analysis_static_context(change_request, iw_context)
+
+
+def _build_bug_fix_prompt(original_tc: dict, static_context: dict) -> str:
+    """Build the controlled bug fix analysis prompt for one test case."""
+    # Use the controlled bug fix analysis prompt
+    return controlled_analysis({"original_test_case": original_tc}, static_context)
+
+
+def _build_bug_fix_batch_prompt(batch: list[tuple], static_context: dict, batched: bool) -> str:
+    """Build the analysis prompt for a batch of (index, tc_id, tc_data, original_tc) jobs."""
+    if not batched:
+        return _build_bug_fix_prompt(batch[0][3], static_context)
+    test_cases = [{"test_case_id": str(tc_id), "test_case": original_tc} for _, tc_id, _, original_tc in batch]
+    return controlled_analysis_batch({}, test_cases, static_context)
+
+
+def _parse_controlled_bug_fix_analysis(response_text: str) -> tuple[dict, dict]:
     """
-    Step B: Get controlled bug fix analysis with structured response.
+    Step B: Extract the structured bug fix analysis from an LLM response.
     
     Returns:
         tuple: (updated_test_case, analysis_summary)
     """
-    # Create context package for LLM
-    context_package = {
-        "change_request": {
-            "title": change.title,
-            "description": change.description,
-            "acceptance_criteria": change.acceptance_criteria,
-            "change_type": change.change_type
-        },
-        "original_test_case": original_tc,
-        "iw_context": iw_context
-    }
-    
-    # Use the controlled bug fix analysis prompt
-    prompt = BugFixPrompts.controlled_analysis(context_package)
-    
     try:
-        response = llm_client.complete(prompt, max_tokens=2000)
-        
         # Extract structured JSON response
-        import re
-        
-        # Extract JSON using improved method
-        json_str = None
-        
-        # First try to find JSON in code blocks
-        code_block_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', response.text, re.DOTALL)
-        if code_block_match:
-            json_str = code_block_match.group(1)
-        else:
-            # Try to find the largest JSON object by counting braces
-            brace_count = 0
-            start_pos = -1
-            for i, char in enumerate(response.text):
-                if char == '{':
-                    if brace_count == 0:
-                        start_pos = i
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0 and start_pos != -1:
-                        json_str = response.text[start_pos:i+1]
-                        break
-        
-        # Validate JSON
-        if json_str:
-            try:
-                import json
-                json.loads(json_str)  # Validate JSON
-            except (json.JSONDecodeError, TypeError):
-                json_str = None
+        result = _extract_json_object(response_text)
         
-        if json_str:
-            import json
-            result = json.loads(json_str)
-            
+        if result is not None:
             updated_tc = result.get("updated_test_case")
             analysis_summary = result.get("analysis_summary")
             
@@ -237,40 +326,93 @@ def _get_controlled_bug_fix_analysis(change: ChangeRequest, original_tc: dict,
     return None, None
 
 
+def _parse_batch_bug_fix_analysis(response_text: str) -> dict[str, tuple[dict, dict]] | None:
+    """
+    Step B: Extract per-test-case analyses from a batched LLM response.
+    
+    Returns:
+        dict: test_case_id -> (updated_test_case, analysis_summary), with (None, None) for a
+        case answered without an update; unanswered cases are absent. None if the response
+        holds no ``results`` list
+    """
+    try:
+        result = _extract_json_object(response_text)
+        if not isinstance(result, dict) or not isinstance(result.get("results"), list):
+            return None
+        
+        analyses = {}
+        for entry in result["results"]:
+            if not isinstance(entry, dict) or entry.get("test_case_id") is None:
+                continue
+            updated_tc = entry.get("updated_test_case")
+            analysis_summary = entry.get("analysis_summary")
+            if updated_tc and analysis_summary:
+                analyses[str(entry["test_case_id"])] = (updated_tc, analysis_summary)
+            else:
+                analyses[str(entry["test_case_id"])] = (None, None)
+        return analyses
+    
+    except Exception as e:
+        print(f"    ⚠️  LLM analysis failed: {e}")
+    
+    return None
+
+
+def _extract_json_object(response_text: str):
+    """Return the first JSON object in an LLM response (fenced code block first), or None."""
+    # First try to find JSON in code blocks
+    code_block_match = _JSON_CODEBLOCK_RE.search(response_text)
+    if code_block_match:
+        try:
+            return json.loads(code_block_match.group(1))
+        except json.JSONDecodeError:
+            pass
+    
+    # Decode the first parseable object, starting at each '{' in turn
+    idx = response_text.find('{')
+    while idx != -1:
+        try:
+            result, _ = _JSON_DECODER.raw_decode(response_text, idx)
+            return result
+        except json.JSONDecodeError:
+            idx = response_text.find('{', idx + 1)
+    return None
+
+
+def _analysis_json_complete(partial_text: str) -> bool:
+    """Whether a streamed response already holds a complete (single or batched) analysis object."""
+    # Only attempt a decode while a closing brace is among the most recent deltas
+    if '}' not in partial_text[-64:]:
+        return False
+    idx = partial_text.find('{')
+    if idx == -1:
+        return False
+    try:
+        result, _ = _JSON_DECODER.raw_decode(partial_text, idx)
+    except json.JSONDecodeError:
+        return False
+    if not isinstance(result, dict):
+        return False
+    return "results" in result or ("updated_test_case" in result and "analysis_summary" in result)
+
+
 def _get_timestamp() -> str:
     """Get current timestamp for audit trail."""
-    from datetime import datetime
     return datetime.now().isoformat()
 
 
 def _create_focused_bug_fix_query(change: ChangeRequest) -> str:
     """Create a focused query text for bug fix retrieval."""
-    # Extract key terms from the bug fix description
-    title_words = change.title.lower().split()
-    description_words = change.description.lower().split()
-    
-    # Filter out common words and focus on technical terms
-    common_words = {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by", "is", "are", "was", "were", "be", "been", "being", "have", "has", "had", "do", "does", "did", "will", "would", "could", "should", "may", "might", "must", "can", "this", "that", "these", "those", "change", "request", "author", "engineer", "overview", "discovered", "when", "pro", "turns", "back", "resulting", "missed", "steps", "reproduce", "launch", "allowed", "go", "settings", "notifications", "toggle", "allow", "push", "notifications", "off", "kill", "relaunch", "removed", "return", "observe", "via", "charles", "proxyman", "no", "api", "call", "sent", "acceptance", "criteria", "sends", "fresh", "within", "seconds", "success", "toast", "re-enabled", "displayed", "present", "django", "admin", "under", "user", "profile"}
-    
-    # Extract meaningful terms, avoiding duplicates
-    key_terms = []
-    seen_terms = set()
-    for word in title_words + description_words:
-        word = word.strip(".,!?;:()[]{}*`")
-        if len(word) > 2 and word not in common_words and word.isalpha() and word not in seen_terms:
-            key_terms.append(word)
-            seen_terms.add(word)
+    # Tokenize title + description in one regex pass (whitespace tokens, edge punctuation stripped)
+    words = _QUERY_WORD_RE.findall(f"{change.title} {change.description}".lower())
     
-    # Prioritize important technical terms
-    priority_terms = []
-    other_terms = []
-    important_words = {"notification", "push", "token", "refresh", "register", "settings", "toggle", "permission", "enable", "disable", "backend", "api", "app"}
+    # Extract meaningful terms, avoiding duplicates (dict preserves first-seen order);
+    # deduplicating first means each distinct word is checked against the stopwords once
+    key_terms = [w for w in dict.fromkeys(words) if w not in _BUG_FIX_COMMON_WORDS]
     
-    for term in key_terms:
-        if term in important_words:
-            priority_terms.append(term)
-        else:
-            other_terms.append(term)
+    # Prioritize important technical terms
+    priority_terms = [term for term in key_terms if term in _BUG_FIX_IMPORTANT_WORDS]
+    other_terms = [term for term in key_terms if term not in _BUG_FIX_IMPORTANT_WORDS]
     
     # Create focused query with priority terms first
     focused_terms = priority_terms + other_terms[:10]  # Limit to 15 total terms
@@ -280,119 +422,115 @@ def _create_focused_bug_fix_query(change: ChangeRequest) -> str:
 
 
 
+def _related_report_columns(related: list[dict]) -> tuple[list, list, list, list]:
+    """
+    Split related test cases into parallel columns for the report table.
+    
+    Returns:
+        tuple: (titles, priorities, scores, file_names)
+    """
+    titles = [tc.get('title', 'Unknown') for tc in related]
+    priorities = [tc.get('priority', 'Unknown') for tc in related]
+    scores = [tc.get('score', 0) for tc in related]
+    # Get file name from metadata
+    original_files = [tc.get("metadata", {}).get("original_file", "") for tc in related]
+    file_names = [Path(original_file).name if original_file else "Unknown" for original_file in original_files]
+    return titles, priorities, scores, file_names
+
+
 def _build_auditable_report(change: ChangeRequest, related: list[dict], 
-                           updated: list[Path], analysis_log: list[dict]) -> str:
+                           updated: list[Path], analysis_log: list[dict],
+                           report_columns: tuple[list, list, list, list] | None = None) -> str:
     """
     Step C: Generate comprehensive change log with audit trail for bug fix analysis.
+    
+    Args:
+        report_columns: Precomputed _related_report_columns() of the displayed rows
     """
-    lines = []
-    lines.append("# Bug Fix - Test Case Analysis Report")
-    lines.append("")
-    lines.append(f"**Generated**: {_get_timestamp()}")
-    lines.append("")
+    if report_columns is None:
+        report_columns = _related_report_columns(related[:_REPORT_MAX_ROWS])
+    
+    buf = io.StringIO()
+    w = buf.write
+    w("# Bug Fix - Test Case Analysis Report\n\n")
+    w(f"**Generated**: {_get_timestamp()}\n\n")
     
     # Change Request Metadata
-    lines.append("## Change Request Metadata")
-    lines.append("")
-    lines.append(f"**Type**: {change.change_type}")
-    lines.append(f"**Title**: {change.title}")
-    lines.append(f"**Description**: {change.description}")
-    lines.append("")
-    lines.append("**Acceptance Criteria**:")
-    for i, criteria in enumerate(change.acceptance_criteria, 1):
-        lines.append(f"{i}. {criteria}")
-    lines.append("")
+    w("## Change Request Metadata\n\n")
+    w(f"**Type**: {change.change_type}\n")
+    w(f"**Title**: {change.title}\n")
+    w(f"**Description**: {change.description}\n\n")
+    w("**Acceptance Criteria**:\n")
+    buf.writelines(f"{i}. {criteria}\n" for i, criteria in enumerate(change.acceptance_criteria, 1))
+    w("\n")
     
     # Test Cases Analyzed - Table Format
-    lines.append("## Test Cases Analyzed")
-    lines.append("")
-    lines.append("| # | Test Case Title | Priority | Score | File Name |")
-    lines.append("|---|----------------|----------|-------|-----------|")
-    
-    for i, tc in enumerate(related[:10], 1):
-        title = tc.get('title', 'Unknown')
-        priority = tc.get('priority', 'Unknown')
-        score = tc.get('score', 0)
-        
-        # Get file name from metadata
-        metadata = tc.get("metadata", {})
-        original_file = metadata.get("original_file", "")
-        if original_file:
-            file_name = Path(original_file).name
-        else:
-            file_name = "Unknown"
-        
-        lines.append(f"| {i} | {title} | {priority} | {score:.3f} | {file_name} |")
+    w("## Test Cases Analyzed\n\n")
+    w("| # | Test Case Title | Priority | Score | File Name |\n")
+    w("|---|----------------|----------|-------|-----------|\n")
+    
+    for i, (title, priority, score, file_name) in enumerate(zip(*report_columns), 1):
+        w(f"| {i} | {title} | {priority} | {score:.3f} | {file_name} |\n")
     
-    lines.append("")
+    w("\n")
     
     # Test Cases Updated
-    lines.append("## Test Cases Updated")
-    lines.append("")
+    w("## Test Cases Updated\n\n")
     if analysis_log:
         for entry in analysis_log:
             # Get file name instead of full path
             file_path = entry.get('file_path', '')
             file_name = Path(file_path).name if file_path else 'Unknown'
             
-            lines.append(f"### {entry['test_case_title']}")
-            lines.append(f"**File**: {file_name}")
-            lines.append(f"**Updated**: {entry['timestamp']}")
-            lines.append("")
+            w(f"### {entry['test_case_title']}\n")
+            w(f"**File**: {file_name}\n")
+            w(f"**Updated**: {entry['timestamp']}\n\n")
             
             analysis_summary = entry['analysis_summary']
             
             # Bug Impact Assessment
             bug_impact = analysis_summary.get('bug_impact', 'No impact assessment provided')
-            lines.append(f"**Bug Impact**: {bug_impact}")
-            lines.append("")
+            w(f"**Bug Impact**: {bug_impact}\n\n")
             
             # Changes Made
             changes = analysis_summary.get('changes', [])
             if changes:
-                lines.append("**Changes Made**:")
+                w("**Changes Made**:\n")
                 for change_item in changes:
-                    field = change_item.get('field', 'Unknown')
-                    before = change_item.get('before', 'N/A')
-                    after = change_item.get('after', 'N/A')
-                    lines.append(f"- **{field}**:")
-                    lines.append(f"  - Before: {before}")
-                    lines.append(f"  - After: {after}")
-                lines.append("")
+                    buf.writelines((
+                        f"- **{change_item.get('field', 'Unknown')}**:\n",
+                        f"  - Before: {change_item.get('before', 'N/A')}\n",
+                        f"  - After: {change_item.get('after', 'N/A')}\n",
+                    ))
+                w("\n")
             
             # Why? Section - Reasoning and Assumptions
-            lines.append("**Why?**")
+            w("**Why?**\n")
             reasoning = analysis_summary.get('reasoning', 'No reasoning provided')
             assumptions = analysis_summary.get('assumptions', [])
             
-            lines.append(f"**Reasoning**: {reasoning}")
-            lines.append("")
+            w(f"**Reasoning**: {reasoning}\n\n")
             
             if assumptions:
-                lines.append("**Assumptions Made**:")
-                for assumption in assumptions:
-                    lines.append(f"- {assumption}")
+                w("**Assumptions Made**:\n")
+                buf.writelines(f"- {assumption}\n" for assumption in assumptions)
             else:
-                lines.append("**Assumptions Made**: None documented")
-            lines.append("")
+                w("**Assumptions Made**: None documented\n")
+            w("\n")
             
             # Regression Tests
             regression_tests = analysis_summary.get('regression_tests', [])
             if regression_tests:
-                lines.append("**Regression Tests Added**:")
-                for test in regression_tests:
-                    lines.append(f"- {test}")
-                lines.append("")
+                w("**Regression Tests Added**:\n")
+                buf.writelines(f"- {test}\n" for test in regression_tests)
+                w("\n")
     else:
-        lines.append("No test cases were updated.")
-        lines.append("")
+        w("No test cases were updated.\n\n")
     
     # Summary
-    lines.append("## Summary")
-    lines.append("")
-    lines.append(f"- **Total Test Cases Analyzed**: {len(related)}")
-    lines.append(f"- **Total Test Cases Updated**: {len(updated)}")
-    lines.append(f"- **Analysis Entries**: {len(analysis_log)}")
-    lines.append("")
-    
-    return "\n".join(lines)
+    w("## Summary\n\n")
+    w(f"- **Total Test Cases Analyzed**: {len(related)}\n")
+    w(f"- **Total Test Cases Updated**: {len(updated)}\n")
+    w(f"- **Analysis Entries**: {len(analysis_log)}\n")
+    
+    return buf.getvalue()
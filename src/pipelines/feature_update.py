@@ -1,15 +1,57 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
+from typing import Callable, Optional
+import copy
+import io
 import json
+import logging
+import re
 
+from src.serialization import dumps_bytes, loads
 from src.parsers.change_request_parser import ChangeRequest
 from src.retrieval.retriever_interface import Retriever
 from src.validation.schema_validator import validate_instance
 from src.llm.client import LLMClient
-from src.prompts.feature_update_prompts import FeatureUpdatePrompts
+from src.prompts.feature_update_prompts import controlled_update, controlled_update_batch, controlled_update_static_context
 from src.context.iw_context import load_iw_context
 from src.pipelines.shared import PipelineOutput, perform_retrieval, load_validator, display_pipeline_completion, display_skip_message
+from src.pipelines.shared import pipeline_run_key, load_cached_run, save_cached_run
+from config.config_loader import get_pipeline_top_k
+
+logger = logging.getLogger(__name__)
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_CODEBLOCK_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+
+# Inputs fingerprinted by the run cache besides the test cases and schema
+_CONTROLLED_UPDATE_TEMPLATE = Path(__file__).resolve().parents[1] / "prompts" / "templates" / "feature_update" / "controlled_update.md.j2"
+_IW_CONTEXT_PATH = Path("IW_OVERVIEW.md")
+
+# Upper bound on concurrent test case file writes
+_MAX_WRITE_WORKERS = 8
+
+# Upper bound on concurrent test case file reads; smaller batches are read inline
+_MAX_READ_WORKERS = 8
+_MIN_PARALLEL_READS = 4
+
+# "24 hour"/"24 hours" in any casing (not "124 hours"); the matched "hour" keeps its casing when rewritten
+_TWENTY_FOUR_HOUR_RE = re.compile(r"(?<!\d)24 hour", re.IGNORECASE)
+
+# One "[index]" or ".key" / leading "key" segment of a field path like "steps[0].step_text"
+_FIELD_PATH_PART_RE = re.compile(r"\[(\d+)\]|\.?([^.\[\]]+)")
+
+# Common feature update keywords; a query word containing any of them is a priority term.
+# The alternation lets the regex engine check every keyword in a single scan of the word.
+_FEATURE_UPDATE_KEYWORD_RE = re.compile("|".join([
+    "feature", "update", "modify", "change", "enhance", "improve", "add", "remove",
+    "cancellation", "window", "time", "limit", "threshold", "validation", "verification",
+    "notification", "push", "email", "sms", "alert", "reminder", "settings", "preference",
+    "onboarding", "registration", "profile", "account", "authentication", "login",
+    "shift", "booking", "schedule", "availability", "waitlist", "approval", "requirement"
+]))
 
 
 def run_feature_update_pipeline(
@@ -20,6 +62,8 @@ def run_feature_update_pipeline(
     llm_client: LLMClient,
     config=None,
     dry_run: bool = False,
+    run_cache_dir: Optional[Path] = None,
+    batch_mode: bool = False,
 ) -> PipelineOutput:
     """Run the feature update pipeline to analyze and update test cases affected by feature changes.
     
@@ -31,10 +75,24 @@ def run_feature_update_pipeline(
         llm_client: LLM client for AI analysis
         config: Configuration object (optional)
         dry_run: If True, don't actually update files
+        run_cache_dir: If given, a run whose inputs match an earlier run (same change request,
+            test case files, schema, prompt template, context and model) returns that run's
+            output instead of repeating retrieval and LLM analysis
+        batch_mode: Send the LLM requests as one offline provider batch job (cheaper, but
+            can take hours) once at least ``batch_api_min_test_cases`` test cases are related
         
     Returns:
         PipelineOutput with updated test cases and analysis report
     """
+    model = f"{llm_client.current_provider}:{llm_client.current_model}"
+    if run_cache_dir is not None:
+        run_key = pipeline_run_key(change, test_cases_dir, model, dry_run,
+                                   _run_input_files(schema_path, retriever), _run_settings(config, retriever))
+        cached_output = load_cached_run(run_cache_dir, run_key)
+        if cached_output is not None:
+            print("♻️  Identical change request and test cases already processed; reusing that run's results")
+            return cached_output
+    
     # Create focused query text for better retrieval
     query_text = _create_focused_feature_update_query(change)
     
@@ -46,36 +104,68 @@ def run_feature_update_pipeline(
     
     # Step A: Context packaging for LLM - controlled updates with audit trail
     print("📝 Analyzing test cases for updates...")
-    # Determine debug verbosity from config
-    debug_logging = False
-    try:
-        if config and getattr(config, 'global_settings', None):
-            debug_logging = str(config.global_settings.get('log_level', 'INFO')).upper() == 'DEBUG'
-    except Exception:
-        debug_logging = False
+    # Raw LLM responses are logged at DEBUG level; enable it from the configured log level
+    log_level = str(config.global_settings.get('log_level', 'INFO')).upper() if config else 'INFO'
+    logger.setLevel(logging.DEBUG if log_level == 'DEBUG' else logging.NOTSET)
+    concurrency = config.global_settings.get('max_concurrency', 4) if config else 4
+    batch_size = config.global_settings.get('analysis_batch_size', 4) if config else 4
+    batch_api_min = config.global_settings.get('batch_api_min_test_cases', 50) if config else 50
+    poll_seconds = config.global_settings.get('batch_api_poll_seconds', 30) if config else 30
 
-    updated_paths, change_log = _controlled_llm_updates(
+    updated_paths, change_log, llm_failed = _controlled_llm_updates(
         change,
         related,
         test_cases_dir,
         validator,
         llm_client,
         dry_run,
-        debug_logging,
+        concurrency,
+        batch_size,
+        batch_mode and len(related) >= batch_api_min,
+        poll_seconds,
     )
     
     # Step C: Generate comprehensive change log
     report = _build_auditable_report(change, related, updated_paths, change_log)
-    return PipelineOutput(updated=updated_paths, created=[], report=report, related_count=len(related), related_test_cases=related)
+    output = PipelineOutput(updated=updated_paths, created=[], report=report, related_count=len(related), related_test_cases=related)
+    if run_cache_dir is not None and not llm_failed:
+        # Keyed on the test case files as this run left them, so resubmitting the same change is a no-op.
+        # Runs with failed LLM requests are not cached, so a rerun retries them instead of replaying.
+        run_key = pipeline_run_key(change, test_cases_dir, model, dry_run,
+                                   _run_input_files(schema_path, retriever), _run_settings(config, retriever))
+        save_cached_run(run_cache_dir, run_key, output)
+    return output
+
+
+def _run_input_files(schema_path: Path, retriever: Retriever) -> list[Path]:
+    """Files besides the test cases whose edits must invalidate a cached run."""
+    files = [schema_path, _CONTROLLED_UPDATE_TEMPLATE, _IW_CONTEXT_PATH]
+    db_path = getattr(getattr(retriever, "store", None), "db_path", None)
+    if db_path is not None:
+        # WAL mode: recent writes live in the sidecar until a checkpoint touches the main file
+        files += [Path(db_path), Path(f"{db_path}-wal")]
+    return files
+
+
+def _run_settings(config, retriever: Retriever) -> dict:
+    """Resolved settings whose changes must invalidate a cached run."""
+    return {
+        "top_k": get_pipeline_top_k(config, "feature_update") if config else 10,
+        "retriever": getattr(retriever, "config", None),
+        "global": config.global_settings if config else None,
+    }
 
 
 def _controlled_llm_updates(change: ChangeRequest, related: list[dict], test_cases_dir: Path, 
-                           validator, llm_client: LLMClient, dry_run: bool, debug_logging: bool) -> tuple[list[Path], list[dict]]:
+                           validator, llm_client: LLMClient, dry_run: bool,
+                           concurrency: int = 4, batch_size: int = 4, batch_api: bool = False,
+                           poll_seconds: float = 30.0) -> tuple[list[Path], list[dict], bool]:
     """
     Step A & B: Controlled LLM updates with audit trail.
     
     Returns:
-        tuple: (updated_paths, change_log_entries)
+        tuple: (updated_paths, change_log_entries, llm_failed), where llm_failed is True if
+        any test case's LLM request ended in an error rather than an answer
     """
     updated_paths: list[Path] = []
     change_log_entries: list[dict] = []
@@ -97,55 +187,117 @@ def _controlled_llm_updates(change: ChangeRequest, related: list[dict], test_cas
             for path in updated_paths:
                 print(f"      - {path.name}")
         
-        return updated_paths, change_log_entries
+        return updated_paths, change_log_entries, False
     
     # Load IW context for better analysis
     iw_context = load_iw_context()
     
     print(f"🔄 Processing {len(related)} test cases for controlled updates...")
     
+    # Step A: Context packaging for LLM (all test cases up front)
+    jobs = []
+    originals = _bulk_load_test_cases(related, test_cases_dir)
     for i, tc_data in enumerate(related, 1):
         tc_id = tc_data.get("doc_id")
         if not tc_id:
             continue
-            
-        print(f"  📋 Analyzing test case {i}/{len(related)}: {tc_data.get('title', 'Unknown')}")
         
-        # Step A: Context packaging for LLM
-        original_tc = _load_original_test_case(tc_id, test_cases_dir, tc_data)
+        original_tc = originals.get(tc_id)
         if not original_tc:
             print(f"    ❌ Could not load original test case {tc_id}")
             print("    The local index may be stale or corrupted.")
             print("    Please run: python reset_database.py and re-run the tool.")
             import sys
             sys.exit(1)
+        jobs.append((i, tc_id, tc_data, original_tc))
+    
+    # Step B: Controlled updates; test cases are sent batch_size per request so the shared
+    # context is billed once per batch, and the batch round-trips overlap. The shared context
+    # leads every prompt and the test cases come last, so requests share a cacheable prefix.
+    static_context = _build_feature_update_static_context(change, iw_context)
+    batch_size = max(1, batch_size)
+    batches = [jobs[start:start + batch_size] for start in range(0, len(jobs), batch_size)]
+    # Identical prompts from earlier runs are answered from the client's response cache
+    response_cache = getattr(llm_client, "cache", None)
+    cache_counts = (response_cache.hits, response_cache.misses) if response_cache is not None else None
+    prompts = [_build_feature_update_batch_prompt(batch, static_context) for batch in batches]
+    try:
+        if batch_api:
+            print(f"  📦 Submitting {len(prompts)} requests as one provider batch job; waiting for it to finish...")
+            responses = llm_client.complete_batch(prompts, max_tokens=2000 * batch_size,
+                                                  poll_interval=poll_seconds, concurrency=concurrency)
+        else:
+            responses = llm_client.complete_many(prompts, concurrency=concurrency, max_tokens=2000 * batch_size,
+                                                 return_exceptions=True)
+    except Exception as e:
+        responses = [e] * len(batches)
+    
+    outcomes = {}
+    retry_jobs = []
+    for batch, response in zip(batches, responses):
+        if isinstance(response, Exception):
+            outcomes.update((tc_id, response) for _, tc_id, _, _ in batch)
+        elif len(batch) == 1:
+            outcomes[batch[0][1]] = _parse_controlled_llm_update(response.text)
+        else:
+            updates = _parse_batch_llm_update(response.text)
+            if updates is None:
+                # Unparseable batch answer: retry its test cases one per request
+                retry_jobs.extend(batch)
+                continue
+            outcomes.update((tc_id, updates.get(str(tc_id), (None, None))) for _, tc_id, _, _ in batch)
+    
+    if retry_jobs:
+        print(f"  🔁 Retrying {len(retry_jobs)} test cases individually after an unparseable batch response")
+        prompts = [_build_feature_update_prompt(original_tc, static_context) for _, _, _, original_tc in retry_jobs]
+        try:
+            responses = llm_client.complete_many(prompts, concurrency=concurrency, max_tokens=2000,
+                                                 return_exceptions=True)
+        except Exception as e:
+            responses = [e] * len(retry_jobs)
+        for (_, tc_id, _, _), response in zip(retry_jobs, responses):
+            if isinstance(response, Exception):
+                outcomes[tc_id] = response
+            else:
+                outcomes[tc_id] = _parse_controlled_llm_update(response.text)
+    
+    if cache_counts is not None:
+        hits = response_cache.hits - cache_counts[0]
+        misses = response_cache.misses - cache_counts[1]
+        print(f"  💾 LLM response cache: {hits} hits, {misses} misses")
+    
+    pending_writes: list[tuple[Path, dict, dict]] = []
+    fallback_paths: list[Path] = []
+    fallback_entries: list[dict] = []
+    for i, tc_id, tc_data, original_tc in jobs:
+        print(f"  📋 Analyzing test case {i}/{len(related)}: {tc_data.get('title', 'Unknown')}")
         
-        # Step B: Controlled update with structured response
         try:
-            updated_tc, change_summary = _get_controlled_llm_update(
-                change, original_tc, iw_context, llm_client, debug_logging
-            )
+            outcome = outcomes[tc_id]
+            if isinstance(outcome, Exception):
+                print(f"    ⚠️  LLM update failed: {outcome}")
+                updated_tc, change_summary = None, None
+            else:
+                updated_tc, change_summary = outcome
             
-            if updated_tc and change_summary:
+            if updated_tc and updated_tc == original_tc:
+                # Nothing would change on disk, so there is nothing to write or report
+                print(f"    ℹ️  No updates needed (proposed test case is unchanged)")
+            elif updated_tc and change_summary:
                 # Validate the updated test case
                 errors = validate_instance(validator, updated_tc)
                 if not errors:
                     # Apply the update
                     file_path = _get_test_case_file_path(tc_id, test_cases_dir, tc_data)
                     if file_path and file_path.exists():
-                        if not dry_run:
-                            import json
-                            file_path.write_text(json.dumps(updated_tc, indent=2), encoding="utf-8")
-                        updated_paths.append(file_path)
-                        
-                        # Add to change log
-                        change_log_entries.append({
+                        # Queue the write together with its change log entry
+                        pending_writes.append((file_path, updated_tc, {
                             "test_case_id": tc_id,
                             "test_case_title": original_tc.get("title", "Unknown"),
                             "file_path": str(file_path),
                             "change_summary": change_summary,
                             "timestamp": _get_timestamp()
-                        })
+                        }))
                         
                         print(f"    ✅ Updated with {len(change_summary.get('changes', []))} changes")
                     else:
@@ -164,13 +316,18 @@ def _controlled_llm_updates(change: ChangeRequest, related: list[dict], test_cas
                     fallback_updates, fallback_log = _fallback_feature_update_analysis(
                         change, [tc_data], test_cases_dir, validator, dry_run
                     )
-                    updated_paths.extend(fallback_updates)
-                    change_log_entries.extend(fallback_log)
+                    fallback_paths.extend(fallback_updates)
+                    fallback_entries.extend(fallback_log)
                     print(f"    ✅ Fallback analysis completed for {tc_data.get('title', 'Unknown')}")
                 except Exception as fallback_e:
                     print(f"    ❌ Fallback analysis also failed: {fallback_e}")
             continue
     
+    updated_paths, change_log_entries = _write_updated_test_cases(pending_writes, dry_run)
+    updated_paths.extend(fallback_paths)
+    change_log_entries.extend(fallback_entries)
+    llm_failed = any(isinstance(outcome, Exception) for outcome in outcomes.values())
+    
     print(f"✅ Completed controlled feature update analysis:")
     print(f"   📊 Analyzed: {len(related)} test cases")
     print(f"   ✏️  Updated: {len(updated_paths)} test cases")
@@ -181,7 +338,7 @@ def _controlled_llm_updates(change: ChangeRequest, related: list[dict], test_cas
         for path in updated_paths:
             print(f"      - {path.name}")
     
-    return updated_paths, change_log_entries
+    return updated_paths, change_log_entries, llm_failed
 
 
 def _fallback_feature_update_analysis(change: ChangeRequest, related: list[dict], test_cases_dir: Path, 
@@ -199,37 +356,38 @@ def _fallback_feature_update_analysis(change: ChangeRequest, related: list[dict]
     Returns:
         tuple: (updated_paths, change_log_entries)
     """
-    updated_paths: list[Path] = []
-    change_log_entries: list[dict] = []
+    pending_writes: list[tuple[Path, dict, dict]] = []
     
     # Analyze each related test case for potential updates
+    analyzer = _select_impact_analyzer(change)
+    originals = _bulk_load_test_cases(related, test_cases_dir)
     for tc_data in related:
         tc_id = tc_data.get("doc_id")
         if not tc_id:
             continue
             
-        # Load original test case
-        original_tc = _load_original_test_case(tc_id, test_cases_dir, tc_data)
+        original_tc = originals.get(tc_id)
         if not original_tc:
             continue
             
         # Analyze what needs to be updated based on the change request
-        updates_needed = _analyze_feature_update_impact(change, original_tc, tc_data)
+        updates_needed = analyzer(original_tc, tc_data)
         
         if updates_needed["changes"]:
             # Apply updates
-            updated_tc = original_tc.copy()
+            # Deep copy: field updates reach into nested step dicts, which must not alias original_tc
+            updated_tc = copy.deepcopy(original_tc)
             for change_item in updates_needed["changes"]:
                 _apply_field_update(updated_tc, change_item["field"], change_item["after"])
+            if updated_tc == original_tc:
+                # Every proposed change was already in place (or its target path is missing)
+                continue
             
             # Validate updated test case
-            errors = validate_instance(validator, updated_tc)
+            errors = validate_instance(validator, updated_tc, fail_fast=True)
             if not errors:
                 # Write updated test case
                 file_path = _get_test_case_file_path(tc_id, test_cases_dir, tc_data)
-                if not dry_run:
-                    file_path.write_text(json.dumps(updated_tc, indent=2), encoding="utf-8")
-                updated_paths.append(file_path)
                 
                 # Create detailed change log entry
                 change_log_entry = {
@@ -244,11 +402,46 @@ def _fallback_feature_update_analysis(change: ChangeRequest, related: list[dict]
                         "assumptions": updates_needed["assumptions"]
                     }
                 }
-                change_log_entries.append(change_log_entry)
+                pending_writes.append((file_path, updated_tc, change_log_entry))
+    
+    return _write_updated_test_cases(pending_writes, dry_run)
+
+
+def _write_updated_test_cases(pending_writes: list[tuple[Path, dict, dict]],
+                              dry_run: bool) -> tuple[list[Path], list[dict]]:
+    """
+    Write validated test case updates on a thread pool.
+    
+    Returns:
+        tuple: (updated_paths, change_log_entries) for the updates that were applied
+    """
+    if dry_run or not pending_writes:
+        errors = [None] * len(pending_writes)
+    else:
+        with ThreadPoolExecutor(max_workers=min(_MAX_WRITE_WORKERS, len(pending_writes))) as executor:
+            errors = list(executor.map(_write_test_case_file, pending_writes))
     
+    updated_paths: list[Path] = []
+    change_log_entries: list[dict] = []
+    for (file_path, _, log_entry), error in zip(pending_writes, errors):
+        if error is not None:
+            print(f"    ⚠️  Failed to write {file_path.name}: {error}")
+            continue
+        updated_paths.append(file_path)
+        change_log_entries.append(log_entry)
     return updated_paths, change_log_entries
 
 
+def _write_test_case_file(pending_write: tuple[Path, dict, dict]) -> Exception | None:
+    """Write one updated test case, returning the error instead of raising it."""
+    file_path, updated_tc, _ = pending_write
+    try:
+        file_path.write_bytes(dumps_bytes(updated_tc, indent=True))
+    except OSError as e:
+        return e
+    return None
+
+
 def _analyze_feature_update_impact(change: ChangeRequest, original_tc: dict, tc_data: dict) -> dict:
     """
     Analyze what updates are needed for a test case based on the feature change.
@@ -256,124 +449,94 @@ def _analyze_feature_update_impact(change: ChangeRequest, original_tc: dict, tc_
     Returns:
         Dictionary with changes, reasoning, and assumptions
     """
+    return _select_impact_analyzer(change)(original_tc, tc_data)
+
+
+def _select_impact_analyzer(change: ChangeRequest) -> Callable[[dict, dict], dict]:
+    """
+    Pick the impact analyzer for a change request once per run.
+    
+    Returns:
+        Function taking (original_tc, tc_data) and returning the update analysis
+    """
+    analyzer = _IMPACT_ANALYZERS[_feature_update_kind(change.title, change.description)]
+    return partial(analyzer, change)
+
+
+def _analyze_cancellation_impact(change: ChangeRequest, original_tc: dict, tc_data: dict) -> dict:
+    """Rewrite 24-hour cancellation window references in a cancellation test case."""
     changes = []
-    feature_impact = ""
-    reasoning = ""
-    assumptions = []
-    
-    # Extract key terms from the change request
-    change_title_lower = change.title.lower()
-    change_desc_lower = change.description.lower()
-    acceptance_criteria_text = " ".join(change.acceptance_criteria).lower()
-    
-    # Analyze based on common feature update patterns
-    if "cancellation" in change_title_lower or "cancellation" in change_desc_lower:
-        feature_impact = "This test case is affected by the cancellation window change. The cancellation timing and validation rules need to be updated."
-        reasoning = "The feature update changes cancellation window from 24 hours to 12 hours. This affects any test case that involves shift cancellation timing."
-        assumptions = [
-            "The test case involves shift cancellation functionality",
-            "The 12-hour window applies to all shift types",
-            "Reliability penalties are calculated based on the new window"
-        ]
-        
-        # Check if test case involves cancellation
-        tc_title_lower = original_tc.get("title", "").lower()
-        tc_desc_lower = original_tc.get("description", "").lower()
-        
-        if "cancel" in tc_title_lower or "cancel" in tc_desc_lower:
-            print(f"    🔍 Found cancellation test case: {tc_title_lower}")
-            # Update steps and expected results related to cancellation timing
-            steps = original_tc.get("steps", [])
-            for i, step in enumerate(steps):
-                step_text = step.get("step_text", "").lower()
-                step_expected = step.get("step_expected", "").lower()
-                
-                if "24 hour" in step_text or "24 hours" in step_text:
-                    print(f"      ✏️  Updating step {i}: {step_text[:50]}...")
-                    changes.append({
-                        "field": f"steps[{i}].step_text",
-                        "before": step["step_text"],
-                        "after": step["step_text"].replace("24 hour", "12 hour").replace("24 hours", "12 hours")
-                    })
-                
-                if "24 hour" in step_expected or "24 hours" in step_expected:
-                    print(f"      ✏️  Updating step {i} expected: {step_expected[:50]}...")
-                    changes.append({
-                        "field": f"steps[{i}].step_expected",
-                        "before": step["step_expected"],
-                        "after": step["step_expected"].replace("24 hour", "12 hour").replace("24 hours", "12 hours")
-                    })
+    tc_title_lower = original_tc.get("title", "").lower()
+    
+    # Check if test case involves cancellation
+    if "cancel" in tc_title_lower or "cancel" in original_tc.get("description", "").lower():
+        print(f"    🔍 Found cancellation test case: {tc_title_lower}")
+        # Update steps and expected results related to cancellation timing
+        steps = original_tc.get("steps", [])
+        for i, step in enumerate(steps):
+            step_text = step.get("step_text", "")
+            step_expected = step.get("step_expected", "")
             
-            # Check preconditions for 24 hour references
-            preconditions = original_tc.get("preconditions", "")
-            if preconditions and ("24 hour" in preconditions.lower() or "24 hours" in preconditions.lower()):
-                print(f"      ✏️  Updating preconditions: {preconditions[:50]}...")
+            if _TWENTY_FOUR_HOUR_RE.search(step_text):
+                print(f"      ✏️  Updating step {i}: {step_text.lower()[:50]}...")
                 changes.append({
-                    "field": "preconditions",
-                    "before": preconditions,
-                    "after": preconditions.replace("24 hour", "12 hour").replace("24 hours", "12 hours")
+                    "field": f"steps[{i}].step_text",
+                    "before": step_text,
+                    "after": _to_twelve_hours(step_text)
                 })
             
-            # Add updated tag
-            tags = original_tc.get("tags", [])
-            if "updated" not in tags:
+            if _TWENTY_FOUR_HOUR_RE.search(step_expected):
+                print(f"      ✏️  Updating step {i} expected: {step_expected.lower()[:50]}...")
                 changes.append({
-                    "field": "tags",
-                    "before": tags,
-                    "after": tags + ["updated", "feature_update"]
+                    "field": f"steps[{i}].step_expected",
+                    "before": step_expected,
+                    "after": _to_twelve_hours(step_expected)
                 })
-    
-    elif "notification" in change_title_lower or "push" in change_title_lower:
-        feature_impact = "This test case is affected by the notification system changes. Push notification token handling needs to be updated."
-        reasoning = "The feature update changes how push notification tokens are handled when toggling notifications on/off."
-        assumptions = [
-            "The test case involves notification functionality",
-            "Token registration happens when notifications are enabled",
-            "Backend API calls are required for token management"
-        ]
         
-        # Check if test case involves notifications
-        tc_title_lower = original_tc.get("title", "").lower()
-        tc_desc_lower = original_tc.get("description", "").lower()
+        # Check preconditions for 24 hour references
+        preconditions = original_tc.get("preconditions", "")
+        if preconditions and _TWENTY_FOUR_HOUR_RE.search(preconditions):
+            print(f"      ✏️  Updating preconditions: {preconditions[:50]}...")
+            changes.append({
+                "field": "preconditions",
+                "before": preconditions,
+                "after": _to_twelve_hours(preconditions)
+            })
         
-        if "notification" in tc_title_lower or "notification" in tc_desc_lower or "push" in tc_title_lower:
-            # Add verification steps for token registration
-            steps = original_tc.get("steps", [])
-            new_step = {
-                "step_text": "Verify that register_push_token API is called when notifications are enabled",
-                "step_expected": "API call is made within 5 seconds of enabling notifications"
-            }
-            
+        # Add updated tag
+        tags = original_tc.get("tags", [])
+        if "updated" not in tags:
             changes.append({
-                "field": "steps",
-                "before": steps,
-                "after": steps + [new_step]
+                "field": "tags",
+                "before": tags,
+                "after": tags + ["updated", "feature_update"]
             })
-            
-            # Add updated tag
-            tags = original_tc.get("tags", [])
-            if "updated" not in tags:
-                changes.append({
-                    "field": "tags",
-                    "before": tags,
-                    "after": tags + ["updated", "feature_update", "regression"]
-                })
     
-    else:
-        # Generic feature update analysis
-        feature_impact = "This test case may be affected by the feature update. General validation and verification steps may need updates."
-        reasoning = f"The feature update '{change.title}' may impact this test case. Additional verification steps should be added to ensure the update works correctly."
-        assumptions = [
-            "The test case is related to the updated feature",
-            "Additional validation is needed to verify the update",
-            "Regression testing should be performed"
+    return {
+        "feature_impact": "This test case is affected by the cancellation window change. The cancellation timing and validation rules need to be updated.",
+        "changes": changes,
+        "reasoning": "The feature update changes cancellation window from 24 hours to 12 hours. This affects any test case that involves shift cancellation timing.",
+        "assumptions": [
+            "The test case involves shift cancellation functionality",
+            "The 12-hour window applies to all shift types",
+            "Reliability penalties are calculated based on the new window"
         ]
-        
-        # Add a generic verification step
+    }
+
+
+def _analyze_notification_impact(change: ChangeRequest, original_tc: dict, tc_data: dict) -> dict:
+    """Add a push token registration check to a notification test case."""
+    changes = []
+    tc_title_lower = original_tc.get("title", "").lower()
+    
+    # Check if test case involves notifications
+    if ("notification" in tc_title_lower or "push" in tc_title_lower
+            or "notification" in original_tc.get("description", "").lower()):
+        # Add verification steps for token registration
         steps = original_tc.get("steps", [])
         new_step = {
-            "step_text": f"Verify that the feature update '{change.title}' works as expected",
-            "step_expected": "Feature update functions correctly according to acceptance criteria"
+            "step_text": "Verify that register_push_token API is called when notifications are enabled",
+            "step_expected": "API call is made within 5 seconds of enabling notifications"
         }
         
         changes.append({
@@ -388,17 +551,88 @@ def _analyze_feature_update_impact(change: ChangeRequest, original_tc: dict, tc_
             changes.append({
                 "field": "tags",
                 "before": tags,
-                "after": tags + ["updated", "feature_update"]
+                "after": tags + ["updated", "feature_update", "regression"]
             })
     
     return {
-        "feature_impact": feature_impact,
+        "feature_impact": "This test case is affected by the notification system changes. Push notification token handling needs to be updated.",
         "changes": changes,
-        "reasoning": reasoning,
-        "assumptions": assumptions
+        "reasoning": "The feature update changes how push notification tokens are handled when toggling notifications on/off.",
+        "assumptions": [
+            "The test case involves notification functionality",
+            "Token registration happens when notifications are enabled",
+            "Backend API calls are required for token management"
+        ]
+    }
+
+
+def _analyze_generic_impact(change: ChangeRequest, original_tc: dict, tc_data: dict) -> dict:
+    """Add a generic verification step for any other feature update."""
+    changes = []
+    
+    # Add a generic verification step
+    steps = original_tc.get("steps", [])
+    new_step = {
+        "step_text": f"Verify that the feature update '{change.title}' works as expected",
+        "step_expected": "Feature update functions correctly according to acceptance criteria"
+    }
+    
+    changes.append({
+        "field": "steps",
+        "before": steps,
+        "after": steps + [new_step]
+    })
+    
+    # Add updated tag
+    tags = original_tc.get("tags", [])
+    if "updated" not in tags:
+        changes.append({
+            "field": "tags",
+            "before": tags,
+            "after": tags + ["updated", "feature_update"]
+        })
+    
+    return {
+        "feature_impact": "This test case may be affected by the feature update. General validation and verification steps may need updates.",
+        "changes": changes,
+        "reasoning": f"The feature update '{change.title}' may impact this test case. Additional verification steps should be added to ensure the update works correctly.",
+        "assumptions": [
+            "The test case is related to the updated feature",
+            "Additional validation is needed to verify the update",
+            "Regression testing should be performed"
+        ]
     }
 
 
+_IMPACT_ANALYZERS = {
+    "cancellation": _analyze_cancellation_impact,
+    "notification": _analyze_notification_impact,
+    "generic": _analyze_generic_impact,
+}
+
+
+@lru_cache(maxsize=32)
+def _feature_update_kind(title: str, description: str) -> str:
+    """Classify a change request as a "cancellation", "notification" or "generic" feature update."""
+    title_lower = title.lower()
+    if "cancellation" in title_lower or "cancellation" in description.lower():
+        return "cancellation"
+    if "notification" in title_lower or "push" in title_lower:
+        return "notification"
+    return "generic"
+
+
+def _to_twelve_hours(text: str) -> str:
+    """Rewrite every "24 hour(s)" reference in one pass, keeping the casing of "hour"."""
+    return _TWENTY_FOUR_HOUR_RE.sub(lambda m: "12" + m.group(0)[2:], text)
+
+
+@lru_cache(maxsize=512)
+def _compile_field_path(field_path: str) -> tuple:
+    """Parse a field path such as "steps[0].step_text" once into keys and indexes: ("steps", 0, "step_text")."""
+    return tuple(int(index) if index else key for index, key in _FIELD_PATH_PART_RE.findall(field_path))
+
+
 def _apply_field_update(test_case: dict, field_path: str, new_value: any) -> None:
     """
     Apply a field update to a test case using dot notation.
@@ -408,25 +642,26 @@ def _apply_field_update(test_case: dict, field_path: str, new_value: any) -> Non
         field_path: Field path in dot notation (e.g., "steps[0].step_text")
         new_value: New value to set
     """
-    if "[" in field_path and "]" in field_path:
-        # Handle array notation like "steps[0].step_text"
-        parts = field_path.split("[")
-        array_field = parts[0]
-        rest = parts[1]
-        
-        # Extract index and remaining path
-        index_part = rest.split("]")[0]
-        remaining_path = rest.split("]")[1][1:] if rest.split("]")[1].startswith(".") else ""
-        
-        array = test_case.get(array_field, [])
-        if int(index_part) < len(array):
-            if remaining_path:
-                _apply_field_update(array[int(index_part)], remaining_path, new_value)
-            else:
-                array[int(index_part)] = new_value
-    else:
-        # Handle simple field
-        test_case[field_path] = new_value
+    path = _compile_field_path(field_path)
+    if not path:
+        return
+    
+    # Walk to the parent container; paths that do not exist in this test case are skipped
+    target = test_case
+    for part in path[:-1]:
+        if isinstance(part, int):
+            if not isinstance(target, list) or part >= len(target):
+                return
+        elif not isinstance(target, dict) or part not in target:
+            return
+        target = target[part]
+    
+    last = path[-1]
+    if isinstance(last, int):
+        if isinstance(target, list) and last < len(target):
+            target[last] = new_value
+    elif isinstance(target, dict):
+        target[last] = new_value
 
 
 def _load_original_test_case(tc_id: str, test_cases_dir: Path, tc_data: dict) -> dict:
@@ -434,14 +669,41 @@ def _load_original_test_case(tc_id: str, test_cases_dir: Path, tc_data: dict) ->
     try:
         file_path = _get_test_case_file_path(tc_id, test_cases_dir, tc_data)
         if file_path and file_path.exists():
-            import json
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return loads(file_path.read_bytes())
     except Exception as e:
         print(f"    ⚠️  Failed to load test case {tc_id}: {e}")
     return None
 
 
+def _bulk_load_test_cases(related: list, test_cases_dir: Path) -> dict:
+    """Load the original test cases for all related results up front.
+    
+    Files are read concurrently on a thread pool once there are enough of them
+    to amortize it.
+    
+    Args:
+        related: Retrieved test case records
+        test_cases_dir: Directory containing test case files
+        
+    Returns:
+        Dictionary mapping test case ID to its parsed contents (None if it could not be loaded)
+    """
+    wanted = {}
+    for tc_data in related:
+        tc_id = tc_data.get("doc_id")
+        if tc_id and tc_id not in wanted:
+            wanted[tc_id] = tc_data
+    
+    def load(item):
+        tc_id, tc_data = item
+        return tc_id, _load_original_test_case(tc_id, test_cases_dir, tc_data)
+    
+    if len(wanted) < _MIN_PARALLEL_READS:
+        return dict(map(load, wanted.items()))
+    with ThreadPoolExecutor(max_workers=min(_MAX_READ_WORKERS, len(wanted))) as pool:
+        return dict(pool.map(load, wanted.items()))
+
+
 def _get_test_case_file_path(tc_id: str, test_cases_dir: Path, tc_data: dict) -> Path:
     """Get the file path for a test case."""
     # First try to get the original file path from metadata
@@ -458,106 +720,129 @@ def _get_test_case_file_path(tc_id: str, test_cases_dir: Path, tc_data: dict) ->
     return test_cases_dir / f"{tc_id}.json"
 
 
-def _get_controlled_llm_update(change: ChangeRequest, original_tc: dict, 
-                              iw_context: str, llm_client: LLMClient, debug_logging: bool) -> tuple[dict, dict]:
+def _build_feature_update_static_context(change: ChangeRequest, iw_context: str) -> dict:
+    """Build the prompt fields that are identical for every test case of this change."""
+    change_request = {
+        "title": change.title,
+        "description": change.description,
+        "acceptance_criteria": change.acceptance_criteria,
+        "change_type": change.change_type
+    }
+    return controlled_update_static_context(change_request, iw_context)
+
+
+def _build_feature_update_prompt(original_tc: dict, static_context: dict) -> str:
+    """Build the controlled update prompt for one test case."""
+    # Use the controlled update prompt
+    return controlled_update({"original_test_case": original_tc}, static_context)
+
+
+def _build_feature_update_batch_prompt(batch: list[tuple], static_context: dict) -> str:
+    """Build the update prompt for a batch of (index, tc_id, tc_data, original_tc) jobs."""
+    if len(batch) == 1:
+        return _build_feature_update_prompt(batch[0][3], static_context)
+    test_cases = [{"test_case_id": str(tc_id), "test_case": original_tc} for _, tc_id, _, original_tc in batch]
+    return controlled_update_batch({}, test_cases, static_context)
+
+
+def _parse_controlled_llm_update(response_text: str) -> tuple[dict, dict]:
     """
-    Step B: Get controlled LLM update with structured response.
+    Step B: Extract the structured update from an LLM response.
     
     Returns:
         tuple: (updated_test_case, change_summary)
     """
-    # Create context package for LLM
-    context_package = {
-        "change_request": {
-            "title": change.title,
-            "description": change.description,
-            "acceptance_criteria": change.acceptance_criteria,
-            "change_type": change.change_type
-        },
-        "original_test_case": original_tc,
-        "iw_context": iw_context
-    }
-    
-    # Use the controlled update prompt
-    prompt = FeatureUpdatePrompts.controlled_update(context_package)
-    
     try:
-        response = llm_client.complete(prompt, max_tokens=2000)
-        
-        # Debug (verbose only): Print raw LLM response
-        if debug_logging:
-            print(f"    🔍 Raw LLM Response (first 500 chars): {response.text[:500]}...")
+        logger.debug("Raw LLM response (first 500 chars): %.500s...", response_text)
         
         # Extract structured JSON response
-        import re
-        
-        # Extract JSON using improved method
-        json_str = None
-        
-        # First try to find JSON in code blocks
-        code_block_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', response.text, re.DOTALL)
-        if code_block_match:
-            json_str = code_block_match.group(1)
-        else:
-            # Try to find the largest JSON object by counting braces
-            brace_count = 0
-            start_pos = -1
-            for i, char in enumerate(response.text):
-                if char == '{':
-                    if brace_count == 0:
-                        start_pos = i
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0 and start_pos != -1:
-                        json_str = response.text[start_pos:i+1]
-                        break
+        result = _extract_json_object(response_text)
+        if result is not None:
+            return _normalize_llm_update(result)
+    
+    except Exception as e:
+        print(f"    ⚠️  LLM update failed: {e}")
+    
+    return None, None
+
+
+def _parse_batch_llm_update(response_text: str) -> dict[str, tuple[dict, dict]] | None:
+    """
+    Step B: Extract per-test-case updates from a batched LLM response.
+    
+    Returns:
+        dict: test_case_id -> (updated_test_case, change_summary), or None if the
+        response holds no ``results`` list
+    """
+    try:
+        logger.debug("Raw LLM response (first 500 chars): %.500s...", response_text)
         
-        # Validate JSON
-        if json_str:
-            try:
-                import json
-                json.loads(json_str)  # Validate JSON
-            except (json.JSONDecodeError, TypeError):
-                json_str = None
+        result = _extract_json_object(response_text)
+        if not isinstance(result, dict) or not isinstance(result.get("results"), list):
+            return None
         
-        if json_str:
-            import json
-            result = json.loads(json_str)
-            
-            updated_tc = result.get("updated_test_case")
-            change_summary = result.get("change_summary")
-            
-            # Debug: Print details only when debug enabled
-            if debug_logging:
-                print(f"    🔍 LLM Response Debug:")
-                print(f"      - Updated TC: {'Yes' if updated_tc else 'No'}")
-                print(f"      - Change Summary: {'Yes' if change_summary else 'No'}")
-                if change_summary:
-                    print(f"      - Change Summary Keys: {list(change_summary.keys())}")
-                    print(f"      - Feature Impact: {change_summary.get('feature_impact', 'Missing')}")
-                    print(f"      - Reasoning: {change_summary.get('reasoning', 'Missing')}")
-                    print(f"      - Changes Count: {len(change_summary.get('changes', []))}")
-                    print(f"      - Full Change Summary: {change_summary}")
-            
+        updates = {}
+        for entry in result["results"]:
+            updated_tc, change_summary = _normalize_llm_update(entry)
             if updated_tc and change_summary:
-                # Clean up the updated test case by removing invalid fields
-                if "tags" in updated_tc:
-                    del updated_tc["tags"]
-                
-                # Map LLM response to expected format
-                normalized_change_summary = {
-                    "feature_impact": change_summary.get("feature_impact", change_summary.get("reason", "No impact assessment provided")),
-                    "changes": change_summary.get("changes", []),
-                    "reasoning": change_summary.get("reasoning", change_summary.get("reason", "No reasoning provided")),
-                    "assumptions": change_summary.get("assumptions", [])
-                }
-                
-                return updated_tc, normalized_change_summary
+                updates[str(entry.get("test_case_id"))] = (updated_tc, change_summary)
+        return updates
     
     except Exception as e:
         print(f"    ⚠️  LLM update failed: {e}")
     
+    return None
+
+
+def _extract_json_object(response_text: str):
+    """Return the first JSON object in an LLM response (fenced code block first), or None."""
+    # First try to find JSON in code blocks
+    code_block_match = _JSON_CODEBLOCK_RE.search(response_text)
+    if code_block_match:
+        try:
+            return json.loads(code_block_match.group(1))
+        except json.JSONDecodeError:
+            pass
+    
+    # Decode the first parseable object, starting at each '{' in turn
+    idx = response_text.find('{')
+    while idx != -1:
+        try:
+            result, _ = _JSON_DECODER.raw_decode(response_text, idx)
+            return result
+        except json.JSONDecodeError:
+            idx = response_text.find('{', idx + 1)
+    return None
+
+
+def _normalize_llm_update(result: dict) -> tuple[dict, dict]:
+    """Map one ``{updated_test_case, change_summary}`` answer to the expected format, or (None, None)."""
+    updated_tc = result.get("updated_test_case")
+    change_summary = result.get("change_summary")
+    
+    logger.debug("LLM response: updated TC %s, change summary %s",
+                 "yes" if updated_tc else "no", "yes" if change_summary else "no")
+    if change_summary and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Change summary: feature impact %r, reasoning %r, %d changes, keys %s",
+                     change_summary.get('feature_impact', 'Missing'), change_summary.get('reasoning', 'Missing'),
+                     len(change_summary.get('changes', [])), list(change_summary.keys()))
+        logger.debug("Full change summary: %s", change_summary)
+    
+    if updated_tc and change_summary:
+        # Clean up the updated test case by removing invalid fields
+        if "tags" in updated_tc:
+            del updated_tc["tags"]
+        
+        # Map LLM response to expected format
+        normalized_change_summary = {
+            "feature_impact": change_summary.get("feature_impact", change_summary.get("reason", "No impact assessment provided")),
+            "changes": change_summary.get("changes", []),
+            "reasoning": change_summary.get("reasoning", change_summary.get("reason", "No reasoning provided")),
+            "assumptions": change_summary.get("assumptions", [])
+        }
+        
+        return updated_tc, normalized_change_summary
+    
     return None, None
 
 
@@ -572,29 +857,24 @@ def _build_auditable_report(change: ChangeRequest, related: list[dict],
     """
     Step C: Generate comprehensive change log with audit trail.
     """
-    lines = []
-    lines.append("# Feature Update - Test Case Analysis Report")
-    lines.append("")
-    lines.append(f"**Generated**: {_get_timestamp()}")
-    lines.append("")
+    buf = io.StringIO()
+    w = buf.write
+    w("# Feature Update - Test Case Analysis Report\n\n")
+    w(f"**Generated**: {_get_timestamp()}\n\n")
     
     # Change Request Metadata
-    lines.append("## Change Request Metadata")
-    lines.append("")
-    lines.append(f"**Type**: {change.change_type}")
-    lines.append(f"**Title**: {change.title}")
-    lines.append(f"**Description**: {change.description}")
-    lines.append("")
-    lines.append("**Acceptance Criteria**:")
-    for i, criteria in enumerate(change.acceptance_criteria, 1):
-        lines.append(f"{i}. {criteria}")
-    lines.append("")
+    w("## Change Request Metadata\n\n")
+    w(f"**Type**: {change.change_type}\n")
+    w(f"**Title**: {change.title}\n")
+    w(f"**Description**: {change.description}\n\n")
+    w("**Acceptance Criteria**:\n")
+    buf.writelines(f"{i}. {criteria}\n" for i, criteria in enumerate(change.acceptance_criteria, 1))
+    w("\n")
     
     # Test Cases Analyzed - Table Format
-    lines.append("## Test Cases Analyzed")
-    lines.append("")
-    lines.append("| # | Test Case Title | Priority | Score | File Name |")
-    lines.append("|---|----------------|----------|-------|-----------|")
+    w("## Test Cases Analyzed\n\n")
+    w("| # | Test Case Title | Priority | Score | File Name |\n")
+    w("|---|----------------|----------|-------|-----------|\n")
     
     for i, tc in enumerate(related[:10], 1):
         title = tc.get('title', 'Unknown')
@@ -609,80 +889,70 @@ def _build_auditable_report(change: ChangeRequest, related: list[dict],
         else:
             file_name = "Unknown"
         
-        lines.append(f"| {i} | {title} | {priority} | {score:.3f} | {file_name} |")
+        w(f"| {i} | {title} | {priority} | {score:.3f} | {file_name} |\n")
     
-    lines.append("")
+    w("\n")
     
     # Test Cases Updated
-    lines.append("## Test Cases Updated")
-    lines.append("")
+    w("## Test Cases Updated\n\n")
     if change_log:
         for entry in change_log:
             # Get file name instead of full path
             file_path = entry.get('file_path', '')
             file_name = Path(file_path).name if file_path else 'Unknown'
             
-            lines.append(f"### {entry['test_case_title']}")
-            lines.append(f"**File**: {file_name}")
-            lines.append(f"**Updated**: {entry['timestamp']}")
-            lines.append("")
+            w(f"### {entry['test_case_title']}\n")
+            w(f"**File**: {file_name}\n")
+            w(f"**Updated**: {entry['timestamp']}\n\n")
             
             change_summary = entry['change_summary']
             
             # Feature Impact Assessment
             feature_impact = change_summary.get('feature_impact', 'No impact assessment provided')
-            lines.append(f"**Feature Impact**: {feature_impact}")
-            lines.append("")
+            w(f"**Feature Impact**: {feature_impact}\n\n")
             
             # Changes Made
             changes = change_summary.get('changes', [])
             if changes:
-                lines.append("**Changes Made**:")
+                w("**Changes Made**:\n")
                 for change_item in changes:
-                    field = change_item.get('field', 'Unknown')
-                    before = change_item.get('before', 'N/A')
-                    after = change_item.get('after', 'N/A')
-                    lines.append(f"- **{field}**:")
-                    lines.append(f"  - Before: {before}")
-                    lines.append(f"  - After: {after}")
-                lines.append("")
+                    buf.writelines((
+                        f"- **{change_item.get('field', 'Unknown')}**:\n",
+                        f"  - Before: {change_item.get('before', 'N/A')}\n",
+                        f"  - After: {change_item.get('after', 'N/A')}\n",
+                    ))
+                w("\n")
             
             # Why? Section - Reasoning and Assumptions
-            lines.append("**Why?**")
+            w("**Why?**\n")
             reasoning = change_summary.get('reasoning', 'No reasoning provided')
             assumptions = change_summary.get('assumptions', [])
             
-            lines.append(f"**Reasoning**: {reasoning}")
-            lines.append("")
+            w(f"**Reasoning**: {reasoning}\n\n")
             
             if assumptions:
-                lines.append("**Assumptions Made**:")
-                for assumption in assumptions:
-                    lines.append(f"- {assumption}")
+                w("**Assumptions Made**:\n")
+                buf.writelines(f"- {assumption}\n" for assumption in assumptions)
             else:
-                lines.append("**Assumptions Made**: None documented")
-            lines.append("")
+                w("**Assumptions Made**: None documented\n")
+            w("\n")
             
             # Regression Tests
             regression_tests = change_summary.get('regression_tests', [])
             if regression_tests:
-                lines.append("**Regression Tests Added**:")
-                for test in regression_tests:
-                    lines.append(f"- {test}")
-                lines.append("")
+                w("**Regression Tests Added**:\n")
+                buf.writelines(f"- {test}\n" for test in regression_tests)
+                w("\n")
     else:
-        lines.append("No test cases were updated.")
-        lines.append("")
+        w("No test cases were updated.\n\n")
     
     # Summary
-    lines.append("## Summary")
-    lines.append("")
-    lines.append(f"- **Total Test Cases Analyzed**: {len(related)}")
-    lines.append(f"- **Total Test Cases Updated**: {len(updated)}")
-    lines.append(f"- **Analysis Entries**: {len(change_log)}")
-    lines.append("")
+    w("## Summary\n\n")
+    w(f"- **Total Test Cases Analyzed**: {len(related)}\n")
+    w(f"- **Total Test Cases Updated**: {len(updated)}\n")
+    w(f"- **Analysis Entries**: {len(change_log)}\n")
     
-    return "\n".join(lines)
+    return buf.getvalue()
 
 
 def _create_focused_feature_update_query(change: ChangeRequest) -> str:
@@ -694,25 +964,14 @@ def _create_focused_feature_update_query(change: ChangeRequest) -> str:
     priority_terms = []
     other_terms = []
     
-    # Common feature update keywords
-    feature_keywords = [
-        "feature", "update", "modify", "change", "enhance", "improve", "add", "remove",
-        "cancellation", "window", "time", "limit", "threshold", "validation", "verification",
-        "notification", "push", "email", "sms", "alert", "reminder", "settings", "preference",
-        "onboarding", "registration", "profile", "account", "authentication", "login",
-        "shift", "booking", "schedule", "availability", "waitlist", "approval", "requirement"
-    ]
-    
-    # Extract words and prioritize important terms
-    words = all_text.split()
-    for word in words:
-        clean_word = word.strip(".,!?;:\"'()[]{}").lower()
-        if len(clean_word) > 2:  # Skip very short words
-            if any(keyword in clean_word for keyword in feature_keywords):
-                if clean_word not in priority_terms:
-                    priority_terms.append(clean_word)
-            elif clean_word not in other_terms:
-                other_terms.append(clean_word)
+    # Extract words and prioritize important terms; duplicates are dropped up front
+    # (dict preserves first-seen order) so each distinct word is classified once
+    clean_words = (word.strip(".,!?;:\"'()[]{}") for word in all_text.split())
+    for clean_word in dict.fromkeys(w for w in clean_words if len(w) > 2):  # Skip very short words
+        if _FEATURE_UPDATE_KEYWORD_RE.search(clean_word):
+            priority_terms.append(clean_word)
+        else:
+            other_terms.append(clean_word)
     
     # Create focused query with priority terms first
     focused_terms = priority_terms + other_terms[:10]
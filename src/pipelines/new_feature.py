@@ -1,14 +1,62 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict
+import io
 import json
+import re
 
 from src.parsers.change_request_parser import ChangeRequest
 from src.validation.schema_validator import validate_instance
 from src.llm.client import LLMClient
 from src.prompts.new_feature_prompts import NewFeaturePrompts
 from src.context.iw_context import load_iw_context
-from src.pipelines.shared import PipelineOutput, load_validator, display_pipeline_completion, display_skip_message
+from src.pipelines.shared import PipelineOutput, atomic_write_bytes, load_validator, display_pipeline_completion, display_skip_message
+from src.serialization import dumps_bytes
+
+try:
+    from json_repair import repair_json
+except ImportError:  # json_repair is optional; malformed responses then go to the reformat retry
+    repair_json = None
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_CODEBLOCK_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+
+# Upper bound on concurrent test case file writes
+_MAX_WRITE_WORKERS = 8
+
+# Generated test case titles to filename-safe stems in one pass: spaces and dashes to "_", colons dropped
+_TITLE_TRANS = str.maketrans({" ": "_", "-": "_", ":": None})
+
+# Test case types accepted by the schema; anything else is normalized to "functional"
+_ALLOWED_TYPES = frozenset({"functional", "integration", "ui", "api", "performance", "security", "regression"})
+
+# Priority labels accepted by the schema
+_PRIORITY_LABELS = ('P1 - Critical', 'P2 - High', 'P3 - Medium', 'P4 - Low')
+
+# minLength constraints from schema/test_case.schema.json, checked while normalizing
+_TITLE_MIN_LEN = 5
+_STEP_TEXT_MIN_LEN = 5
+_STEP_EXPECTED_MIN_LEN = 3
+
+# Keys that make a bare response object recognizable as the test case itself
+_TC_MIN_KEYS = ('title', 'steps')
+
+# Loose priority spellings from LLM output mapped to the schema's priority labels
+_PRIO_MAP = MappingProxyType({
+    'p1': 'P1 - Critical', 'critical': 'P1 - Critical',
+    'p2': 'P2 - High', 'high': 'P2 - High',
+    'p3': 'P3 - Medium', 'medium': 'P3 - Medium',
+    'p4': 'P4 - Low', 'low': 'P4 - Low',
+})
+
+# Keys LLMs use for a step's action and expectation, in order of preference
+_STEP_TEXT_KEYS = ('step_text', 'action', 'description', 'text')
+_STEP_EXPECTED_KEYS = ('step_expected', 'expected', 'expected_result')
+_DEFAULT_STEP_EXPECTED = "Expectation documented in acceptance criteria."
 
 
 def run_new_feature_pipeline(
@@ -41,7 +89,11 @@ def run_new_feature_pipeline(
     
     # Step A: Controlled test case generation with audit trail
     print("📝 Generating new test cases with controlled approach...")
-    created_paths, generation_log = _controlled_test_generation(change, related, test_cases_dir, validator, llm_client, dry_run)
+    concurrency = config.global_settings.get('max_concurrency', 4) if config else 4
+    batch_size = config.global_settings.get('analysis_batch_size', 4) if config else 4
+    strict_validation = config.global_settings.get('strict_validation', False) if config else False
+    created_paths, generation_log = _controlled_test_generation(change, related, test_cases_dir, validator, llm_client, dry_run,
+                                                                concurrency, batch_size, strict_validation)
     
     # Step C: Generate comprehensive change log
     report = _build_auditable_report(change, related, created_paths, generation_log)
@@ -49,7 +101,9 @@ def run_new_feature_pipeline(
 
 
 def _controlled_test_generation(change: ChangeRequest, related: list[dict], test_cases_dir: Path, 
-                               validator, llm_client: LLMClient, dry_run: bool) -> tuple[list[Path], list[dict]]:
+                               validator, llm_client: LLMClient, dry_run: bool,
+                               concurrency: int = 4, batch_size: int = 4,
+                               strict_validation: bool = False) -> tuple[list[Path], list[dict]]:
     """
     Step A & B: Controlled test case generation with audit trail.
     
@@ -58,6 +112,7 @@ def _controlled_test_generation(change: ChangeRequest, related: list[dict], test
     """
     created_paths: list[Path] = []
     generation_log_entries: list[dict] = []
+    pending_writes: list[tuple[Path, dict, dict]] = []
     
     if not llm_client.is_available() or llm_client.current_provider == "mock":
         display_skip_message("new feature generation", "LLM provider unavailable", 3, 0, len(created_paths), len(generation_log_entries))
@@ -68,39 +123,82 @@ def _controlled_test_generation(change: ChangeRequest, related: list[dict], test
     
     print(f"🔄 Generating 3 new test cases (positive, negative, edge)...")
     
-    # Generate exactly three variants
+    # Generate exactly three variants, batch_size per request so the change request, context and
+    # schema are sent once per batch; the requests run concurrently and results are handled in order
     variants = ["positive", "negative", "edge"]
+    batch_size = max(1, batch_size)
+    batches = [variants[start:start + batch_size] for start in range(0, len(variants), batch_size)]
+    prompts = [
+        _build_controlled_generation_batch_prompt(change, iw_context, variants.index(batch[0]) + 1, batch)
+        for batch in batches
+    ]
+    # Identical prompts from earlier runs (including reformat retries) are answered from the client's response cache
+    response_cache = getattr(llm_client, "cache", None)
+    cache_counts = (response_cache.hits, response_cache.misses) if response_cache is not None else None
+    # JSON output mode lets providers that support it constrain decoding, so the reformat retry is rarely needed
+    try:
+        responses = llm_client.complete_many(prompts, concurrency=concurrency, max_tokens=2000 * len(batches[0]),
+                                             return_exceptions=True, json_output=True)
+    except Exception as e:
+        responses = [e] * len(batches)
+    
+    # Per variant: an exception, a parsed (new_tc, generation_summary) or a single-variant response to parse
+    outcomes = {}
+    retry_variants = []
+    for batch, response in zip(batches, responses):
+        if isinstance(response, Exception) or len(batch) == 1:
+            outcomes.update((variant, response) for variant in batch)
+            continue
+        parsed = _parse_batch_generation(response.text, batch)
+        outcomes.update(parsed)
+        retry_variants.extend(variant for variant in batch if variant not in parsed)
+    
+    if retry_variants:
+        print(f"  🔁 Generating {len(retry_variants)} variants individually after an incomplete batch response")
+        prompts = [
+            _build_controlled_generation_variant_prompt(change, iw_context, variants.index(variant) + 1, variant)
+            for variant in retry_variants
+        ]
+        try:
+            responses = llm_client.complete_many(prompts, concurrency=concurrency, max_tokens=2000,
+                                                 return_exceptions=True, json_output=True)
+        except Exception as e:
+            responses = [e] * len(retry_variants)
+        outcomes.update(zip(retry_variants, responses))
+    
     for i, variant in enumerate(variants, start=1):
         print(f"  📝 Generating {variant} test case {i}/3...")
         
         try:
             # Step B: Controlled generation with structured response
-            new_tc, generation_summary = _get_controlled_test_generation_variant(
-                change, iw_context, llm_client, i, variant
-            )
+            outcome = outcomes[variant]
+            if isinstance(outcome, Exception):
+                print(f"    ⚠️  LLM generation failed: {outcome}")
+                new_tc, generation_summary = None, None
+            elif isinstance(outcome, tuple):
+                new_tc, generation_summary = outcome
+            else:
+                new_tc, generation_summary = _parse_controlled_test_generation_variant(outcome.text, llm_client)
             
             if new_tc and generation_summary is not None:
-                # Normalize to schema shape before validation
-                new_tc = _normalize_generated_test_case(change, new_tc, variant)
-                # Validate the generated test case
-                errors = validate_instance(validator, new_tc)
+                # Normalize to schema shape; the schema constraints are checked in the same pass,
+                # so the full schema validation only runs as an audit in strict mode
+                new_tc, errors = _normalize_generated_test_case(change, new_tc, variant)
+                if not errors and strict_validation:
+                    errors = validate_instance(validator, new_tc)
                 if not errors:
                     # Create the test case file
-                    safe_title = new_tc['title'].lower().replace(" ", "_").replace(":", "").replace("-", "_")[:50]
+                    safe_title = new_tc['title'].lower().translate(_TITLE_TRANS)[:50]
                     filename = f"auto_{safe_title}_{variant}.json"
                     path = test_cases_dir / filename
-                    if not dry_run:
-                        path.write_text(json.dumps(new_tc, indent=2), encoding="utf-8")
-                    created_paths.append(path)
-                    
-                    # Add to generation log
-                    generation_log_entries.append({
+                    # Queue the write together with its generation log entry
+                    pending_writes.append((path, new_tc, {
                         "test_case_id": f"auto_{safe_title}_{variant}",
                         "test_case_title": new_tc.get("title", "Unknown"),
                         "file_path": str(path),
                         "generation_summary": generation_summary,
                         "timestamp": _get_timestamp()
-                    })
+                    }))
                     
                     print(f"    ✅ Generated: {new_tc.get('title', 'Unknown')}")
                 else:
@@ -113,6 +211,13 @@ def _controlled_test_generation(change: ChangeRequest, related: list[dict], test
             print(f"    ❌ Generation failed: {e}")
             continue
     
+    created_paths, generation_log_entries = _write_created_test_cases(pending_writes, dry_run)
+    
+    if cache_counts is not None:
+        hits = response_cache.hits - cache_counts[0]
+        misses = response_cache.misses - cache_counts[1]
+        print(f"  💾 LLM response cache: {hits} hits, {misses} misses")
+    
     display_pipeline_completion("controlled generation", 3, 0, len(created_paths), len(generation_log_entries), created_paths)
     
     return created_paths, generation_log_entries
@@ -120,14 +225,46 @@ def _controlled_test_generation(change: ChangeRequest, related: list[dict], test
 
 
 
-def _get_controlled_test_generation_variant(change: ChangeRequest,
-                                           iw_context: str,
-                                           llm_client: LLMClient,
-                                           test_number: int,
-                                           variant: str) -> tuple[dict, dict]:
-    """Variant-specific controlled generation (positive | negative | edge)."""
-    from typing import Dict, Any
+def _write_created_test_cases(pending_writes: list[tuple[Path, dict, dict]],
+                              dry_run: bool) -> tuple[list[Path], list[dict]]:
+    """
+    Write validated new test cases on a thread pool.
+    
+    Returns:
+        tuple: (created_paths, generation_log_entries) for the test cases that were written
+    """
+    if dry_run or not pending_writes:
+        errors = [None] * len(pending_writes)
+    else:
+        with ThreadPoolExecutor(max_workers=min(_MAX_WRITE_WORKERS, len(pending_writes))) as executor:
+            errors = list(executor.map(_write_test_case_file, pending_writes))
+    
+    created_paths: list[Path] = []
+    generation_log_entries: list[dict] = []
+    for (file_path, _, log_entry), error in zip(pending_writes, errors):
+        if error is not None:
+            print(f"    ⚠️  Failed to write {file_path.name}: {error}")
+            continue
+        created_paths.append(file_path)
+        generation_log_entries.append(log_entry)
+    return created_paths, generation_log_entries
+
+
+def _write_test_case_file(pending_write: tuple[Path, dict, dict]) -> Exception | None:
+    """Write one new test case atomically, returning the error instead of raising it."""
+    file_path, new_tc, _ = pending_write
+    try:
+        atomic_write_bytes(file_path, dumps_bytes(new_tc, indent=True))
+    except OSError as e:
+        return e
+    return None
+
 
+def _build_controlled_generation_variant_prompt(change: ChangeRequest,
+                                                iw_context: str,
+                                                test_number: int,
+                                                variant: str) -> str:
+    """Build the variant-specific generation prompt (positive | negative | edge)."""
     context_package: Dict[str, Any] = {
         "change_request": {
             "title": change.title,
@@ -139,62 +276,60 @@ def _get_controlled_test_generation_variant(change: ChangeRequest,
         "test_number": test_number,
     }
 
-    prompt = NewFeaturePrompts.controlled_generation_variant(context_package, variant)
+    return NewFeaturePrompts.controlled_generation_variant(context_package, variant)
 
+
+def _build_controlled_generation_batch_prompt(change: ChangeRequest,
+                                              iw_context: str,
+                                              first_test_number: int,
+                                              batch: list[str]) -> str:
+    """Build one generation prompt for a batch of variants (a single variant gets the per-variant prompt)."""
+    if len(batch) == 1:
+        return _build_controlled_generation_variant_prompt(change, iw_context, first_test_number, batch[0])
+    context_package: Dict[str, Any] = {
+        "change_request": {
+            "title": change.title,
+            "description": change.description,
+            "acceptance_criteria": change.acceptance_criteria,
+            "change_type": change.change_type,
+        },
+        "iw_context": iw_context,
+        "test_number": first_test_number,
+    }
+    return NewFeaturePrompts.controlled_generation_batch(context_package, batch)
+
+
+def _parse_batch_generation(response_text: str, batch: list[str]) -> dict[str, tuple]:
+    """
+    Extract per-variant results from a batched generation response.
+    
+    Returns:
+        dict: variant -> (new_test_case, generation_summary) for the usable entries of ``batch``
+    """
+    parsed = _extract_first_json(response_text)
+    entries = parsed.get("variants") if isinstance(parsed, dict) else None
+    if not isinstance(entries, list):
+        return {}
+    
+    results = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        variant = str(entry.get("variant", "")).strip().lower()
+        if variant not in batch or variant in results:
+            continue
+        new_tc, generation_summary = _normalize_generation_result(entry)
+        if new_tc and generation_summary is not None:
+            results[variant] = (new_tc, generation_summary)
+    return results
+
+
+def _parse_controlled_test_generation_variant(response_text: str, llm_client: LLMClient) -> tuple[dict, dict]:
+    """Extract (new_test_case, generation_summary) from a variant response, asking once for a JSON-only reformat."""
     try:
-        response = llm_client.complete(prompt, max_tokens=2000)
-
-        import re, json
-
-        def extract_first_json(text: str) -> dict | None:
-            # Try fenced block first
-            m = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', text, re.DOTALL)
-            candidate = m.group(1) if m else None
-            if not candidate:
-                # Fallback: longest top-level JSON object
-                brace_count = 0
-                start_pos = -1
-                best = None
-                for i, ch in enumerate(text):
-                    if ch == '{':
-                        if brace_count == 0:
-                            start_pos = i
-                        brace_count += 1
-                    elif ch == '}':
-                        brace_count -= 1
-                        if brace_count == 0 and start_pos != -1:
-                            best = text[start_pos:i+1]
-                            start_pos = -1
-                candidate = best
-            if not candidate:
-                return None
-            try:
-                return json.loads(candidate)
-            except Exception:
-                return None
-
-        def normalize_result(obj: dict) -> tuple[dict | None, dict | str | None]:
-            if not isinstance(obj, dict):
-                return None, None
-            # Primary keys
-            new_tc = obj.get('new_test_case')
-            gen_sum = obj.get('generation_summary')
-            # Common aliases
-            if new_tc is None:
-                new_tc = obj.get('test_case') or obj.get('updated_test_case') or obj.get('generated_test_case')
-            if gen_sum is None:
-                gen_sum = obj.get('change_summary') or obj.get('analysis_summary') or obj.get('summary')
-            # If still missing but object itself looks like a test case, accept it
-            if new_tc is None and all(k in obj for k in ('title', 'steps')):
-                new_tc = obj
-            # Ensure gen_sum is either dict or string, not None
-            if gen_sum is None and new_tc is not None:
-                gen_sum = "Generated test case for new feature"
-            return new_tc, gen_sum
-
-        parsed = extract_first_json(response.text)
+        parsed = _extract_first_json(response_text)
         if isinstance(parsed, dict):
-            new_tc, generation_summary = normalize_result(parsed)
+            new_tc, generation_summary = _normalize_generation_result(parsed)
             if new_tc and generation_summary is not None:
                 return new_tc, generation_summary
         else:
@@ -207,11 +342,11 @@ def _get_controlled_test_generation_variant(change: ChangeRequest,
         )
         retry = llm_client.complete(retry_prompt, max_tokens=800, messages=[
             {"role": "system", "content": "You are formatting assistant."},
-            {"role": "user", "content": response.text[:4000]}
+            {"role": "user", "content": response_text[:4000]}
         ])
-        parsed_retry = extract_first_json(retry.text)
+        parsed_retry = _extract_first_json(retry.text)
         if isinstance(parsed_retry, dict):
-            new_tc, generation_summary = normalize_result(parsed_retry)
+            new_tc, generation_summary = _normalize_generation_result(parsed_retry)
             if new_tc and generation_summary is not None:
                 return new_tc, generation_summary
         else:
@@ -223,35 +358,91 @@ def _get_controlled_test_generation_variant(change: ChangeRequest,
     return None, None
 
 
+def _extract_first_json(text: str) -> dict | None:
+    """Return the first JSON object in an LLM response (fenced code block first, then a local repair), or None."""
+    # Fast path: a bare JSON answer, as the prompt asks for, needs no regex scan
+    start = len(text) - len(text.lstrip())
+    if text.startswith('{', start):
+        try:
+            return _JSON_DECODER.raw_decode(text, start)[0]
+        except json.JSONDecodeError:
+            pass
+    # Try fenced block first
+    m = _JSON_CODEBLOCK_RE.search(text)
+    if m:
+        try:
+            return json.loads(m.group(1))
+        except json.JSONDecodeError:
+            pass
+    # Fallback: decode the first parseable object, starting at each '{' in turn
+    idx = text.find('{')
+    while idx != -1:
+        try:
+            return _JSON_DECODER.raw_decode(text, idx)[0]
+        except json.JSONDecodeError:
+            idx = text.find('{', idx + 1)
+    # Last resort: repair the outermost object locally (trailing commas, unquoted keys,
+    # unterminated strings) instead of spending an LLM round-trip on a reformat
+    first = text.find('{')
+    if repair_json is not None and first != -1:
+        last = text.rfind('}')
+        repaired = repair_json(text[first:last + 1] if last > first else text[first:], return_objects=True)
+        if isinstance(repaired, dict) and repaired:
+            return repaired
+    return None
+
+
+def _normalize_generation_result(obj: dict) -> tuple[dict | None, dict | str | None]:
+    """Pick the generated test case and its summary out of the common LLM answer shapes."""
+    if not isinstance(obj, dict):
+        return None, None
+    # Primary keys
+    new_tc = obj.get('new_test_case')
+    gen_sum = obj.get('generation_summary')
+    # Common aliases
+    if new_tc is None:
+        new_tc = obj.get('test_case') or obj.get('updated_test_case') or obj.get('generated_test_case')
+    if gen_sum is None:
+        gen_sum = obj.get('change_summary') or obj.get('analysis_summary') or obj.get('summary')
+    # If still missing but object itself looks like a test case, accept it
+    if new_tc is None and all(k in obj for k in _TC_MIN_KEYS):
+        new_tc = obj
+    # Ensure gen_sum is either dict or string, not None
+    if gen_sum is None and new_tc is not None:
+        gen_sum = "Generated test case for new feature"
+    return new_tc, gen_sum
+
+
 def _get_timestamp() -> str:
     """Get current timestamp for audit trail."""
-    from datetime import datetime
     return datetime.now().isoformat()
 
 
-def _normalize_generated_test_case(change: ChangeRequest, tc: dict, variant: str) -> dict:
-    """Map common LLM output shapes to the schema-compliant test case format."""
+def _normalize_generated_test_case(change: ChangeRequest, tc: dict, variant: str) -> tuple[dict, list[str]]:
+    """Map common LLM output shapes to the schema-compliant test case format.
+    
+    Returns:
+        tuple: (normalized test case, schema violations found while normalizing)
+    """
     normalized = {}
+    errors: list[str] = []
 
     # Title
     title = tc.get('title') or tc.get('name') or f"{change.title} - {variant.capitalize()}"
     normalized['title'] = str(title)[:300]
+    if len(normalized['title']) < _TITLE_MIN_LEN:
+        errors.append(f"{normalized['title']!r} is too short")
 
     # Type
     t = (tc.get('type') or 'functional').lower()
-    allowed_types = {"functional", "integration", "ui", "api", "performance", "security", "regression"}
-    normalized['type'] = t if t in allowed_types else 'functional'
+    normalized['type'] = t if t in _ALLOWED_TYPES else 'functional'
 
     # Priority
     prio = tc.get('priority') or tc.get('severity') or ''
-    prio_map = {
-        'p1': 'P1 - Critical', 'critical': 'P1 - Critical',
-        'p2': 'P2 - High', 'high': 'P2 - High',
-        'p3': 'P3 - Medium', 'medium': 'P3 - Medium',
-        'p4': 'P4 - Low', 'low': 'P4 - Low',
-    }
     prio_key = str(prio).strip().lower()
-    normalized['priority'] = tc.get('priority') if prio_key.startswith('p') and ' - ' in str(prio) else prio_map.get(prio_key, 'P2 - High')
+    normalized['priority'] = tc.get('priority') if prio_key.startswith('p') and ' - ' in str(prio) else _PRIO_MAP.get(prio_key, 'P2 - High')
+    if normalized['priority'] not in _PRIORITY_LABELS:
+        errors.append(f"{normalized['priority']!r} is not one of {list(_PRIORITY_LABELS)!r}")
 
     # Preconditions
     pre = tc.get('preconditions') or tc.get('setup') or tc.get('given') or ''
@@ -264,19 +455,15 @@ def _normalize_generated_test_case(change: ChangeRequest, tc: dict, variant: str
     steps: list = []
     if isinstance(steps_src, list):
         for item in steps_src:
-            if isinstance(item, dict):
-                text = item.get('step_text') or item.get('action') or item.get('description') or item.get('text') or ''
-                exp = item.get('step_expected') or item.get('expected') or item.get('expected_result') or ''
-                if isinstance(text, dict):
-                    text = text.get('text') or text.get('value') or str(text)
-                if isinstance(exp, dict):
-                    exp = exp.get('text') or exp.get('value') or str(exp)
-                if text or exp:
-                    steps.append({"step_text": str(text), "step_expected": str(exp)})
-            elif isinstance(item, str):
-                steps.append({"step_text": item, "step_expected": "Expectation documented in acceptance criteria."})
+            build_step = _STEP_BUILDERS.get(type(item))
+            step = build_step(item) if build_step else None
+            if step:
+                _check_step(step, errors)
+                steps.append(step)
     elif isinstance(steps_src, str):
-        steps.append({"step_text": steps_src, "step_expected": "Expectation documented in acceptance criteria."})
+        step = _step_from_str(steps_src)
+        _check_step(step, errors)
+        steps.append(step)
 
     if not steps:
         # Guarantee at least one step to pass minItems
@@ -287,11 +474,46 @@ def _normalize_generated_test_case(change: ChangeRequest, tc: dict, variant: str
     normalized['steps'] = steps
 
     # Remove unexpected properties by returning only schema fields
-    return normalized
+    return normalized, errors
+
+
+def _first_truthy(item: dict, keys: tuple) -> Any:
+    """Return the first non-empty value among ``keys`` in ``item``, or ''."""
+    for key in keys:
+        value = item.get(key)
+        if value:
+            return value
+    return ''
+
+
+def _step_from_dict(item: dict) -> dict | None:
+    """Build a schema step from a dict step in any of the common LLM shapes (None if it is empty)."""
+    text = _first_truthy(item, _STEP_TEXT_KEYS)
+    exp = _first_truthy(item, _STEP_EXPECTED_KEYS)
+    if isinstance(text, dict):
+        text = text.get('text') or text.get('value') or str(text)
+    if isinstance(exp, dict):
+        exp = exp.get('text') or exp.get('value') or str(exp)
+    if text or exp:
+        return {"step_text": str(text), "step_expected": str(exp)}
+    return None
+
+
+def _step_from_str(item: str) -> dict:
+    """Build a schema step from a plain-text step."""
+    return {"step_text": item, "step_expected": _DEFAULT_STEP_EXPECTED}
 
 
+def _check_step(step: dict, errors: list[str]) -> None:
+    """Record a normalized step's schema minLength violations in ``errors``."""
+    if len(step["step_text"]) < _STEP_TEXT_MIN_LEN:
+        errors.append(f"{step['step_text']!r} is too short")
+    if len(step["step_expected"]) < _STEP_EXPECTED_MIN_LEN:
+        errors.append(f"{step['step_expected']!r} is too short")
 
 
+# Step builders by the exact type of the LLM's step item; other types are dropped
+_STEP_BUILDERS = {dict: _step_from_dict, str: _step_from_str}
 
 
 def _build_auditable_report(change: ChangeRequest, related: list[dict], 
@@ -299,74 +521,65 @@ def _build_auditable_report(change: ChangeRequest, related: list[dict],
     """
     Step C: Generate comprehensive change log with audit trail for new feature generation.
     """
-    lines = []
-    lines.append("# New Feature - Test Case Generation Log")
-    lines.append("")
-    lines.append(f"**Change Request ID**: {change.change_type}_{change.title[:50].replace(' ', '_')}")
-    lines.append(f"**Timestamp**: {_get_timestamp()}")
-    lines.append("")
+    buf = io.StringIO()
+    w = buf.write
+    w("# New Feature - Test Case Generation Log\n\n")
+    w(f"**Change Request ID**: {change.change_type}_{change.title[:50].replace(' ', '_')}\n")
+    w(f"**Timestamp**: {_get_timestamp()}\n\n")
     
     # Overview section
-    lines.append("## Overview")
-    lines.append(f"- **Change Type**: {change.change_type}")
-    lines.append(f"- **Title**: {change.title}")
-    lines.append(f"- **Description**: {change.description}")
-    lines.append("")
-    lines.append("### Acceptance Criteria")
-    for i, criteria in enumerate(change.acceptance_criteria, 1):
-        lines.append(f"{i}. {criteria}")
-    lines.append("")
+    w("## Overview\n")
+    w(f"- **Change Type**: {change.change_type}\n")
+    w(f"- **Title**: {change.title}\n")
+    w(f"- **Description**: {change.description}\n\n")
+    w("### Acceptance Criteria\n")
+    buf.writelines(f"{i}. {criteria}\n" for i, criteria in enumerate(change.acceptance_criteria, 1))
+    w("\n")
     
     # Context sections omitted for new feature generation (no related test cases used)
     
     # Brand-New Test Cases Added
-    lines.append("## Brand-New Test Cases Added")
-    lines.append(f"**Total Added**: {len(created)}")
-    lines.append("")
+    w("## Brand-New Test Cases Added\n")
+    w(f"**Total Added**: {len(created)}\n\n")
     
     if generation_log:
         for entry in generation_log:
-            lines.append(f"### {entry['test_case_title']}")
-            lines.append(f"- **File**: {entry['file_path']}")
-            lines.append(f"- **Added At**: {entry['timestamp']}")
+            w(f"### {entry['test_case_title']}\n")
+            w(f"- **File**: {entry['file_path']}\n")
+            w(f"- **Added At**: {entry['timestamp']}\n")
             if 'generation_summary' in entry:
                 gs = entry['generation_summary']
                 # Handle both dict and string generation summaries
                 if isinstance(gs, dict):
-                    lines.append(f"- **Why Added**: {gs.get('reasoning', 'N/A')}")
+                    w(f"- **Why Added**: {gs.get('reasoning', 'N/A')}\n")
                     dd = gs.get('design_decisions', [])
                     if dd:
-                        lines.append("- **Design Decisions**:")
-                        for d in dd:
-                            lines.append(f"  - {d}")
+                        w("- **Design Decisions**:\n")
+                        buf.writelines(f"  - {d}\n" for d in dd)
                     assumptions = gs.get('assumptions', [])
                     if assumptions:
-                        lines.append("- **Assumptions**:")
-                        for a in assumptions:
-                            lines.append(f"  - {a}")
+                        w("- **Assumptions**:\n")
+                        buf.writelines(f"  - {a}\n" for a in assumptions)
                     questions = gs.get('open_questions', [])
                     if questions:
-                        lines.append("- **Open Questions**:")
-                        for q in questions:
-                            lines.append(f"  - {q}")
+                        w("- **Open Questions**:\n")
+                        buf.writelines(f"  - {q}\n" for q in questions)
                 else:
                     # Handle string generation summary
-                    lines.append(f"- **Summary**: {str(gs)}")
+                    w(f"- **Summary**: {str(gs)}\n")
             else:
-                lines.append("- **Why Added**: Fallback deterministic generation")
-            lines.append("")
+                w("- **Why Added**: Fallback deterministic generation\n")
+            w("\n")
     else:
-        lines.append("No test cases were generated.")
-        lines.append("")
+        w("No test cases were generated.\n\n")
     
     # Summary
-    lines.append("## Summary")
-    lines.append(f"- **Brand-New Test Cases Added**: {len(created)}")
-    lines.append(f"- **Assumptions / Open Questions**: See sections above")
-    lines.append("")
-    lines.append("This generation log provides a complete audit trail of all new test cases created for the feature implementation.")
+    w("## Summary\n")
+    w(f"- **Brand-New Test Cases Added**: {len(created)}\n")
+    w("- **Assumptions / Open Questions**: See sections above\n\n")
+    w("This generation log provides a complete audit trail of all new test cases created for the feature implementation.")
     
-    return "\n".join(lines)
+    return buf.getvalue()
 
 
 
@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional
+import hashlib
+import json
+import os
 from src.retrieval.retriever_interface import Retriever
 from src.validation.schema_validator import load_schema
 from config.config_loader import get_pipeline_top_k
@@ -18,6 +22,24 @@ class PipelineOutput:
     report: str
     related_count: int
     related_test_cases: list[dict] = None
+    # True when the output was replayed from the run cache: nothing was analyzed or written
+    replayed: bool = False
+
+
+# Bump when the cached PipelineOutput layout or pipeline semantics change
+_RUN_CACHE_VERSION = 2
+
+_REPLAYED_REPORT_NOTE = (
+    "> **Replayed run:** the change request, test cases and settings match an earlier run, so its "
+    "results are shown again. No test cases were analyzed or modified in this run; the files listed "
+    "as updated were written by the earlier run.\n\n"
+)
+
+
+def _emit(lines: List[str]) -> None:
+    """Print display lines with a single write; set QA_QUIET to silence them (e.g. for batch runs)."""
+    if not os.environ.get("QA_QUIET"):
+        print("\n".join(lines))
 
 
 def display_retrieval_results(related: List[Dict[str, Any]], pipeline_name: str) -> None:
@@ -28,19 +50,20 @@ def display_retrieval_results(related: List[Dict[str, Any]], pipeline_name: str)
         related: List of related test cases
         pipeline_name: Name of the pipeline for context
     """
-    print(f"🔍 Retrieved {len(related)} relevant test cases:")
+    lines = [f"🔍 Retrieved {len(related)} relevant test cases:"]
     for i, tc in enumerate(related[:3], 1):  # Show top 3
         score = tc.get('score', 0)
         keyword_score = tc.get('keyword_score', 0)
         semantic_score = tc.get('semantic_score', 0)
         priority_score = tc.get('priority_score', 0)
         
-        print(f"  {i}. {tc.get('title', 'Unknown')}")
-        print(f"     Score: {score:.3f} (Keyword: {keyword_score:.3f}, Semantic: {semantic_score:.3f}, Priority: {priority_score:.3f})")
-        print(f"     Priority: {tc.get('priority', 'Unknown')}")
+        lines.append(f"  {i}. {tc.get('title', 'Unknown')}")
+        lines.append(f"     Score: {score:.3f} (Keyword: {keyword_score:.3f}, Semantic: {semantic_score:.3f}, Priority: {priority_score:.3f})")
+        lines.append(f"     Priority: {tc.get('priority', 'Unknown')}")
     if len(related) > 3:
-        print(f"  ... and {len(related) - 3} more")
-    print()
+        lines.append(f"  ... and {len(related) - 3} more")
+    lines.append("")
+    _emit(lines)
 
 
 def perform_retrieval(
@@ -106,17 +129,19 @@ def display_pipeline_completion(
         log_entries_count: Number of log entries
         updated_paths: List of updated file paths
     """
-    print(f"✅ Completed {pipeline_name} analysis:")
-    print(f"   📊 Analyzed: {analyzed_count} test cases")
-    print(f"   ✏️  Updated: {updated_count} test cases")
+    lines = [
+        f"✅ Completed {pipeline_name} analysis:",
+        f"   📊 Analyzed: {analyzed_count} test cases",
+        f"   ✏️  Updated: {updated_count} test cases",
+    ]
     if created_count > 0:
-        print(f"   📄 Created: {created_count} test cases")
-    print(f"   📝 Analysis log entries: {log_entries_count}")
+        lines.append(f"   📄 Created: {created_count} test cases")
+    lines.append(f"   📝 Analysis log entries: {log_entries_count}")
     
     if updated_paths:
-        print(f"   📁 Updated files:")
-        for path in updated_paths:
-            print(f"      - {path.name}")
+        lines.append(f"   📁 Updated files:")
+        lines.extend(f"      - {path.name}" for path in updated_paths)
+    _emit(lines)
 
 
 def display_skip_message(
@@ -138,12 +163,120 @@ def display_skip_message(
         created_count: Number created (usually 0 when skipped)
         log_entries_count: Number of log entries (usually 0 when skipped)
     """
-    print(f"⚠️  {reason}, skipping {pipeline_name} analysis")
+    lines = [f"⚠️  {reason}, skipping {pipeline_name} analysis"]
     
     if analyzed_count > 0:
-        print(f"✅ {pipeline_name} analysis skipped:")
-        print(f"   📊 Would have analyzed: {analyzed_count} test cases")
-        print(f"   ✏️  Updated: {updated_count} test cases")
+        lines.append(f"✅ {pipeline_name} analysis skipped:")
+        lines.append(f"   📊 Would have analyzed: {analyzed_count} test cases")
+        lines.append(f"   ✏️  Updated: {updated_count} test cases")
         if created_count > 0:
-            print(f"   📄 Created: {created_count} test cases")
-        print(f"   📝 Analysis log entries: {log_entries_count}")
+            lines.append(f"   📄 Created: {created_count} test cases")
+        lines.append(f"   📝 Analysis log entries: {log_entries_count}")
+    _emit(lines)
+
+
+def pipeline_run_key(
+    change,
+    test_cases_dir: Path,
+    model: str,
+    dry_run: bool,
+    input_files: Iterable[Path] = (),
+    settings: Optional[Mapping] = None
+) -> str:
+    """
+    Hash everything a pipeline run depends on, for reusing the output of an identical earlier run.
+    
+    Test case files and the other inputs are fingerprinted by name, size and mtime, so any
+    edit (including the updates a run writes itself) produces a new key.
+    
+    Args:
+        change: Change request object
+        test_cases_dir: Directory containing test case files
+        model: Provider and model identifier
+        dry_run: Whether the run writes its updates
+        input_files: Other files the result depends on (schema, prompt templates, context,
+            retrieval database)
+        settings: Resolved configuration the result depends on (retrieval settings, top_k,
+            global settings); must be JSON-serializable apart from nested mappings
+        
+    Returns:
+        Hex digest identifying the run
+    """
+    def fingerprint(path: Path) -> list:
+        try:
+            st = path.stat()
+        except OSError:
+            return [str(path), None, None]
+        return [str(path), st.st_mtime_ns, st.st_size]
+    
+    payload = {
+        "version": _RUN_CACHE_VERSION,
+        "change": [change.change_type, change.title, change.description, list(change.acceptance_criteria)],
+        "test_cases": [fingerprint(path) for path in sorted(test_cases_dir.glob("*.json"))],
+        "inputs": [fingerprint(Path(path)) for path in input_files],
+        "model": model,
+        "dry_run": dry_run,
+        "settings": settings,
+    }
+    # Configuration mappings may be read-only proxies; anything else unexpected is keyed by its repr
+    text = json.dumps(payload, sort_keys=True, default=lambda o: dict(o) if isinstance(o, Mapping) else repr(o))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """
+    Write a file so readers see either the old or the new contents, never a partial write.
+    
+    The data goes to a sibling ``.tmp`` file that is then swapped in with ``os.replace``.
+    
+    Args:
+        path: File to write
+        data: Complete file contents
+    """
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def load_cached_run(run_cache_dir: Path, run_key: str) -> Optional[PipelineOutput]:
+    """
+    Return the PipelineOutput stored for a run key, or None if there is no usable entry.
+    
+    The output is marked as replayed and its report says so, since this run changes nothing.
+    """
+    try:
+        data = json.loads((run_cache_dir / f"{run_key}.json").read_text(encoding="utf-8"))
+        return PipelineOutput(
+            updated=[Path(p) for p in data["updated"]],
+            created=[Path(p) for p in data["created"]],
+            report=_REPLAYED_REPORT_NOTE + data["report"],
+            related_count=data["related_count"],
+            related_test_cases=data.get("related_test_cases"),
+            replayed=True,
+        )
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_cached_run(run_cache_dir: Path, run_key: str, output: PipelineOutput) -> None:
+    """Store a PipelineOutput under its run key; the cache is optional so failures are ignored."""
+    data = {
+        "updated": [str(p) for p in output.updated],
+        "created": [str(p) for p in output.created],
+        "report": output.report,
+        "related_count": output.related_count,
+        "related_test_cases": output.related_test_cases,
+    }
+    try:
+        # Retrieval scores may be numpy scalars
+        text = json.dumps(data, default=float)
+        run_cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = run_cache_dir / f"{run_key}.json.tmp"
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, run_cache_dir / f"{run_key}.json")
+    except (OSError, TypeError, ValueError):
+        pass
@@ -1,28 +1,76 @@
 """Prompt templates for bug fix test case analysis and generation."""
 
-import json
-from pathlib import Path
-from typing import Dict, Any, List
+import re
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from src.parsers.change_request_parser import ChangeRequest
-from src.prompts.template_loader import render_template
-
-
-class BugFixPrompts:
-    """Prompt templates for analyzing and updating test cases for bug fixes."""
-    
-    @staticmethod
-    def analyze_bug_impact(change: ChangeRequest, related_test_cases: List[Dict[str, Any]]) -> str:
-        """
-        Generate a prompt for analyzing the impact of a bug fix on existing test cases.
-        
-        Args:
-            change: The change request containing bug fix details
-            related_test_cases: List of related test cases that might be affected
-            
-        Returns:
-            Formatted prompt string for LLM
-        """
-        base_prompt = """You are an expert QA engineer analyzing the impact of a bug fix on existing test cases.
+from src.prompts.related_test_cases import related_tc_key, format_related_tcs
+from src.prompts.schema_loader import load_test_case_schema
+from src.prompts.template_loader import render_template, template_exists
+from src.serialization import dumps
+
+
+# Severity and bug type keyword heuristics for analyze_bug_impact, fused into one case-insensitive
+# scan. Like the substring checks they replace they match anywhere in the description; the
+# lookahead reports overlapping keywords too. "ui" counts as both low severity and a UI bug
+_CLASSIFIER_RE = re.compile(
+    r"(?=(?P<high>critical|severe|crash|data loss)"
+    r"|(?P<low>minor|cosmetic)"
+    r"|(?P<ui_word>ui)"
+    r"|(?P<security>authentication|login|security)"
+    r"|(?P<performance>performance|slow|timeout)"
+    r"|(?P<ui>interface|display))",
+    re.IGNORECASE,
+)
+_CLASSIFIER_CATEGORIES = {
+    'high': ('high',),
+    'low': ('low',),
+    'ui_word': ('low', 'ui'),
+    'security': ('security',),
+    'performance': ('performance',),
+    'ui': ('ui',),
+}
+
+
+# One bullet of a markdown list
+_BULLET = "- {}".format
+
+
+def _classify_bug(description: str) -> Tuple[str, str]:
+    """Return (severity, bug_type) from keywords in the description."""
+    found = set()
+    for match in _CLASSIFIER_RE.finditer(description):
+        found.update(_CLASSIFIER_CATEGORIES[match.lastgroup])
+        if 'high' in found and 'security' in found:
+            break  # Both already at their top-precedence value
+
+    if 'high' in found:
+        severity = "High"
+    elif 'low' in found:
+        severity = "Low"
+    else:
+        severity = "Medium"
+
+    if 'security' in found:
+        bug_type = "Security"
+    elif 'performance' in found:
+        bug_type = "Performance"
+    elif 'ui' in found:
+        bug_type = "UI/UX"
+    else:
+        bug_type = "General"
+    return severity, bug_type
+
+
+def _bullets(items: List[str]) -> str:
+    """Render items as a markdown bullet list."""
+    return "\n".join(map(_BULLET, items))
+
+
+# Prompt bodies are str.format templates built once at import; literal braces are doubled
+# analyze_bug_impact
+_ANALYZE_BUG_IMPACT_PROMPT = """You are an expert QA engineer analyzing the impact of a bug fix on existing test cases.
 
 ## Bug Fix Details
 **Title:** {title}
@@ -79,65 +127,16 @@ Return ONLY a valid JSON array with this structure:
 
 Analyze the bug fix impact now:"""
 
-        # Format related test cases
-        tc_context = []
-        for i, tc in enumerate(related_test_cases[:8], 1):  # Limit to top 8 for bug fixes
-            tc_context.append(f"**Test Case {i}:**")
-            tc_context.append(f"- ID: {tc.get('doc_id', 'N/A')}")
-            tc_context.append(f"- Title: {tc.get('title', 'N/A')}")
-            tc_context.append(f"- Description: {tc.get('description', 'N/A')}")
-            tc_context.append(f"- Steps: {tc.get('steps', [])}")
-            tc_context.append(f"- Expected Result: {tc.get('expected_result', 'N/A')}")
-            tc_context.append(f"- Tags: {tc.get('tags', [])}")
-            tc_context.append("")
-
-        # Extract bug type and severity from description (simple heuristic)
-        bug_type = "General"  # Default
-        severity = "Medium"   # Default
-        
-        description_lower = change.description.lower()
-        if any(word in description_lower for word in ["critical", "severe", "crash", "data loss"]):
-            severity = "High"
-        elif any(word in description_lower for word in ["minor", "cosmetic", "ui"]):
-            severity = "Low"
-            
-        if any(word in description_lower for word in ["authentication", "login", "security"]):
-            bug_type = "Security"
-        elif any(word in description_lower for word in ["performance", "slow", "timeout"]):
-            bug_type = "Performance"
-        elif any(word in description_lower for word in ["ui", "interface", "display"]):
-            bug_type = "UI/UX"
-
-        formatted_prompt = base_prompt.format(
-            title=change.title,
-            description=change.description,
-            bug_type=bug_type,
-            severity=severity,
-            related_test_cases='\n'.join(tc_context) if tc_context else "No related test cases found."
-        )
-        
-        return formatted_prompt
-    
-    @staticmethod
-    def generate_regression_tests(change: ChangeRequest, bug_scenarios: List[str]) -> str:
-        """
-        Generate a prompt for creating specific regression tests for a bug fix.
-        
-        Args:
-            change: The change request
-            bug_scenarios: List of scenarios that were affected by the bug
-            
-        Returns:
-            Regression test generation prompt
-        """
-        return f"""Create regression tests to ensure this bug fix is properly validated.
+
+# generate_regression_tests
+_REGRESSION_TESTS_PROMPT = """Create regression tests to ensure this bug fix is properly validated.
 
 ## Bug Fix
-**Title:** {change.title}
-**Description:** {change.description}
+**Title:** {title}
+**Description:** {description}
 
 ## Bug Scenarios
-{chr(10).join(f"- {scenario}" for scenario in bug_scenarios)}
+{bug_scenarios}
 
 ## Task
 Generate regression test cases that specifically verify:
@@ -175,27 +174,17 @@ Return a JSON array of regression test cases:
 - Mark as high priority if the bug was critical
 
 Generate regression tests now:"""
-    
-    @staticmethod
-    def analyze_test_coverage(change: ChangeRequest, existing_tests: List[Dict[str, Any]]) -> str:
-        """
-        Generate a prompt for analyzing test coverage for a bug fix.
-        
-        Args:
-            change: The change request
-            existing_tests: List of existing test cases
-            
-        Returns:
-            Test coverage analysis prompt
-        """
-        return f"""Analyze test coverage for this bug fix to identify gaps.
+
+
+# analyze_test_coverage
+_TEST_COVERAGE_PROMPT = """Analyze test coverage for this bug fix to identify gaps.
 
 ## Bug Fix
-**Title:** {change.title}
-**Description:** {change.description}
+**Title:** {title}
+**Description:** {description}
 
 ## Existing Test Cases
-{len(existing_tests)} related test cases found.
+{existing_count} related test cases found.
 
 ## Analysis Task
 Determine:
@@ -212,23 +201,14 @@ Provide a coverage analysis with:
 - Priority recommendations
 
 Focus on ensuring this type of bug cannot occur again without being caught by tests."""
-    
-    @staticmethod
-    def create_bug_reproduction_test(change: ChangeRequest) -> str:
-        """
-        Generate a prompt for creating a test case that reproduces the original bug.
-        
-        Args:
-            change: The change request
-            
-        Returns:
-            Bug reproduction test prompt
-        """
-        return f"""Create a test case that reproduces the original bug (before the fix).
+
+
+# create_bug_reproduction_test
+_BUG_REPRODUCTION_PROMPT = """Create a test case that reproduces the original bug (before the fix).
 
 ## Bug Details
-**Title:** {change.title}
-**Description:** {change.description}
+**Title:** {title}
+**Description:** {description}
 
 ## Task
 Create a test case that:
@@ -259,23 +239,10 @@ Create a test case that:
 - Make it easy to reproduce consistently
 
 Create the bug reproduction test case:"""
-    
-    @staticmethod
-    def controlled_analysis(context_package: Dict[str, Any]) -> str:
-        """
-        Generate a controlled bug fix analysis prompt following the new guidelines.
-        
-        Args:
-            context_package: Dictionary containing change_request, original_test_case, and iw_context
-            
-        Returns:
-            Formatted prompt for controlled LLM bug fix analysis with audit trail
-        """
-        change_request = context_package.get("change_request", {})
-        original_tc = context_package.get("original_test_case", {})
-        iw_context = context_package.get("iw_context", "")
-        
-        prompt = """You are an expert QA engineer performing a controlled analysis of a test case for a bug fix.
+
+
+# controlled_analysis (used if its template is missing)
+_CONTROLLED_ANALYSIS_FALLBACK_PROMPT = """You are an expert QA engineer performing a controlled analysis of a test case for a bug fix.
 
 ## CRITICAL INSTRUCTIONS
 - Analyze the bug fix impact on the existing test case
@@ -379,53 +346,199 @@ Return ONLY a valid JSON object with this exact structure:
 
 Analyze the bug fix impact now:"""
 
-        # Load schema and render via template
-        schema_content = _load_test_case_schema()
-        context = {
-            "title": change_request.get("title", ""),
-            "description": change_request.get("description", ""),
-            "acceptance_criteria": ', '.join(change_request.get("acceptance_criteria", [])),
-            "change_type": change_request.get("change_type", ""),
-            "original_test_case": json.dumps(original_tc, indent=2),
-            "iw_context": iw_context or "No additional context available.",
-            "schema": schema_content,
-        }
-        try:
-            return render_template("bug_fix/controlled_analysis.md.j2", context)
-        except FileNotFoundError:
-            return prompt.format(**context)
-
-
-def _load_test_case_schema() -> str:
-    """Load the test case schema for formatting requirements."""
-    try:
-        schema_path = Path("schema/test_case.schema.json")
-        if schema_path.exists():
-            with open(schema_path, 'r', encoding='utf-8') as f:
-                return f.read()
-    except Exception:
-        pass
+
+def analyze_bug_impact(change: ChangeRequest, related_test_cases: Iterable[Dict[str, Any]]) -> str:
+    """
+    Generate a prompt for analyzing the impact of a bug fix on existing test cases.
     
-    # Fallback schema if file not found
-    return """{
-  "type": "object",
-  "required": ["title", "type", "priority", "steps"],
-  "properties": {
-    "title": {"type": "string", "minLength": 5, "maxLength": 300},
-    "type": {"type": "string", "enum": ["functional", "integration", "ui", "api", "performance", "security", "regression"]},
-    "priority": {"type": "string", "enum": ["P1 - Critical", "P2 - High", "P3 - Medium", "P4 - Low"]},
-    "preconditions": {"type": "string"},
-    "steps": {
-      "type": "array",
-      "minItems": 1,
-      "items": {
-        "type": "object",
-        "required": ["step_text", "step_expected"],
-        "properties": {
-          "step_text": {"type": "string", "minLength": 5},
-          "step_expected": {"type": "string", "minLength": 3}
-        }
-      }
+    Args:
+        change: The change request containing bug fix details
+        related_test_cases: Related test cases that might be affected; only the first 8 are used
+        
+    Returns:
+        Formatted prompt string for LLM
+    """
+    # Identical inputs give identical prompts, so the prompt is memoized on the fields it shows
+    tc_keys = tuple(related_tc_key(tc) for tc in islice(related_test_cases, 8))  # Limit to top 8 for bug fixes
+    return _build_analyze_bug_impact_prompt(change.title, change.description, tc_keys)
+
+
+@lru_cache(maxsize=256)
+def _build_analyze_bug_impact_prompt(title: str, description: str, tc_keys: Tuple[Tuple[str, ...], ...]) -> str:
+    """Build the analyze_bug_impact prompt; cached per (title, description, related test case keys)."""
+    tc_context = format_related_tcs(tc_keys)
+
+    # Extract bug type and severity from description (simple heuristic)
+    severity, bug_type = _classify_bug(description)
+
+    formatted_prompt = _ANALYZE_BUG_IMPACT_PROMPT.format(
+        title=title,
+        description=description,
+        bug_type=bug_type,
+        severity=severity,
+        related_test_cases=tc_context or "No related test cases found."
+    )
+    
+    return formatted_prompt
+
+
+def generate_regression_tests(change: ChangeRequest, bug_scenarios: List[str]) -> str:
+    """
+    Generate a prompt for creating specific regression tests for a bug fix.
+    
+    Args:
+        change: The change request
+        bug_scenarios: List of scenarios that were affected by the bug
+        
+    Returns:
+        Regression test generation prompt
+    """
+    return _REGRESSION_TESTS_PROMPT.format(
+        title=change.title,
+        description=change.description,
+        bug_scenarios=_bullets(bug_scenarios)
+    )
+
+
+def analyze_test_coverage(change: ChangeRequest, existing_tests: List[Dict[str, Any]]) -> str:
+    """
+    Generate a prompt for analyzing test coverage for a bug fix.
+    
+    Args:
+        change: The change request
+        existing_tests: List of existing test cases
+        
+    Returns:
+        Test coverage analysis prompt
+    """
+    return _TEST_COVERAGE_PROMPT.format(
+        title=change.title,
+        description=change.description,
+        existing_count=len(existing_tests)
+    )
+
+
+def create_bug_reproduction_test(change: ChangeRequest) -> str:
+    """
+    Generate a prompt for creating a test case that reproduces the original bug.
+    
+    Args:
+        change: The change request
+        
+    Returns:
+        Bug reproduction test prompt
+    """
+    return _BUG_REPRODUCTION_PROMPT.format(title=change.title, description=change.description)
+
+
+def controlled_analysis_static_context(change_request: Dict[str, Any], iw_context: str) -> Dict[str, str]:
+    """
+    Build the prompt fields shared by every test case analyzed for one change request.
+    
+    Args:
+        change_request: Dictionary with title, description, acceptance_criteria and change_type
+        iw_context: System context text
+        
+    Returns:
+        Template fields for controlled_analysis, excluding original_test_case
+    """
+    return {
+        "title": change_request.get("title", ""),
+        "description": change_request.get("description", ""),
+        "acceptance_criteria": ', '.join(change_request.get("acceptance_criteria", [])),
+        "change_type": change_request.get("change_type", ""),
+        "iw_context": iw_context or "No additional context available.",
+        "schema": load_test_case_schema(),
+    }
+
+
+def controlled_analysis_system(static_context: Dict[str, str], batch: bool = False) -> str:
+    """
+    Generate the system message for controlled bug fix analysis.
+    
+    It carries the IW context, schema and all instructions, which are identical for every
+    request of a run, so providers can cache it as a shared prompt prefix.
+    
+    Args:
+        static_context: Result of controlled_analysis_static_context
+        batch: Describe the batched ``{"results": [...]}`` output instead of a single analysis
+        
+    Returns:
+        System message to send with controlled_analysis / controlled_analysis_batch prompts
+    """
+    return render_template("bug_fix/controlled_analysis_system.md.j2", {**static_context, "batch": batch})
+
+
+def controlled_analysis(context_package: Dict[str, Any], static_context: Optional[Dict[str, str]] = None) -> str:
+    """
+    Generate the user message of a controlled bug fix analysis for one test case.
+    
+    Send it with controlled_analysis_system() as the system message.
+    
+    Args:
+        context_package: Dictionary containing change_request, original_test_case, and iw_context
+        static_context: Precomputed result of controlled_analysis_static_context; pass it when
+            building prompts for many test cases so only original_test_case is serialized per call
+        
+    Returns:
+        Formatted prompt for controlled LLM bug fix analysis with audit trail
+    """
+    original_tc = context_package.get("original_test_case", {})
+    if static_context is None:
+        static_context = controlled_analysis_static_context(
+            context_package.get("change_request", {}),
+            context_package.get("iw_context", "")
+        )
+    
+    # Render via template; only the test case itself varies between calls
+    context = {**static_context, "original_test_case": dumps(original_tc, indent=True)}
+    if template_exists("bug_fix/controlled_analysis.md.j2"):
+        return render_template("bug_fix/controlled_analysis.md.j2", context)
+    return _CONTROLLED_ANALYSIS_FALLBACK_PROMPT.format(**context)
+
+
+def controlled_analysis_batch(context_package: Dict[str, Any], test_cases: List[Dict[str, Any]],
+                              static_context: Optional[Dict[str, str]] = None) -> str:
+    """
+    Generate the user message of a controlled bug fix analysis covering several test cases.
+    
+    Send it with controlled_analysis_system(batch=True) as the system message; the LLM
+    answers with ``{"results": [...]}`` holding one analysis per test case.
+    
+    Args:
+        context_package: Dictionary containing change_request and iw_context
+        test_cases: Dictionaries with ``test_case_id`` and the original ``test_case``
+        static_context: Precomputed result of controlled_analysis_static_context
+        
+    Returns:
+        Formatted prompt for a batched controlled bug fix analysis
+    """
+    if static_context is None:
+        static_context = controlled_analysis_static_context(
+            context_package.get("change_request", {}),
+            context_package.get("iw_context", "")
+        )
+    
+    context = {
+        **static_context,
+        "test_cases": [
+            {"test_case_id": tc["test_case_id"], "test_case": dumps(tc["test_case"], indent=True)}
+            for tc in test_cases
+        ],
     }
-  }
-}"""
+    return render_template("bug_fix/controlled_analysis.md.j2", context)
+
+
+class BugFixPrompts:
+    """Prompt templates for analyzing and updating test cases for bug fixes.
+    
+    Kept for existing callers; the prompts are plain module functions.
+    """
+    analyze_bug_impact = staticmethod(analyze_bug_impact)
+    generate_regression_tests = staticmethod(generate_regression_tests)
+    analyze_test_coverage = staticmethod(analyze_test_coverage)
+    create_bug_reproduction_test = staticmethod(create_bug_reproduction_test)
+    controlled_analysis_static_context = staticmethod(controlled_analysis_static_context)
+    controlled_analysis_system = staticmethod(controlled_analysis_system)
+    controlled_analysis = staticmethod(controlled_analysis)
+    controlled_analysis_batch = staticmethod(controlled_analysis_batch)
@@ -1,28 +1,18 @@
 """Prompt templates for feature update test case modification."""
 
-import json
-from pathlib import Path
-from typing import Dict, Any, List
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from src.parsers.change_request_parser import ChangeRequest
-from src.prompts.template_loader import render_template
+from src.prompts.related_test_cases import related_tc_key, format_related_tcs
+from src.prompts.schema_loader import load_test_case_schema
+from src.prompts.template_loader import render_template, template_exists
+from src.serialization import dumps
 
 
-class FeatureUpdatePrompts:
-    """Prompt templates for updating existing test cases when features change."""
-    
-    @staticmethod
-    def analyze_impact(change: ChangeRequest, related_test_cases: List[Dict[str, Any]]) -> str:
-        """
-        Generate a prompt for analyzing the impact of feature updates on existing test cases.
-        
-        Args:
-            change: The change request containing update details
-            related_test_cases: List of related test cases that might be affected
-            
-        Returns:
-            Formatted prompt string for LLM
-        """
-        base_prompt = """You are an expert QA engineer analyzing the impact of a feature update on existing test cases.
+# Prompt bodies are str.format templates built once at import; literal braces are doubled
+# analyze_impact
+_ANALYZE_IMPACT_PROMPT = """You are an expert QA engineer analyzing the impact of a feature update on existing test cases.
 
 ## Feature Update Details
 **Title:** {title}
@@ -77,53 +67,22 @@ Return ONLY a valid JSON array with this structure:
 
 Analyze the impact now:"""
 
-        # Format related test cases
-        tc_context = []
-        for i, tc in enumerate(related_test_cases[:10], 1):  # Limit to top 10
-            tc_context.append(f"**Test Case {i}:**")
-            tc_context.append(f"- ID: {tc.get('doc_id', 'N/A')}")
-            tc_context.append(f"- Title: {tc.get('title', 'N/A')}")
-            tc_context.append(f"- Description: {tc.get('description', 'N/A')}")
-            tc_context.append(f"- Steps: {tc.get('steps', [])}")
-            tc_context.append(f"- Expected Result: {tc.get('expected_result', 'N/A')}")
-            tc_context.append(f"- Tags: {tc.get('tags', [])}")
-            tc_context.append("")
-
-        formatted_prompt = base_prompt.format(
-            title=change.title,
-            description=change.description,
-            acceptance_criteria=', '.join(change.acceptance_criteria) if change.acceptance_criteria else "Not specified",
-            related_test_cases='\n'.join(tc_context) if tc_context else "No related test cases found."
-        )
-        
-        return formatted_prompt
-    
-    @staticmethod
-    def generate_update_suggestions(change: ChangeRequest, test_case: Dict[str, Any]) -> str:
-        """
-        Generate specific update suggestions for a single test case.
-        
-        Args:
-            change: The change request
-            test_case: The test case to update
-            
-        Returns:
-            Prompt for updating a specific test case
-        """
-        return f"""You are updating a test case based on a feature change.
+
+# generate_update_suggestions
+_UPDATE_SUGGESTIONS_PROMPT = """You are updating a test case based on a feature change.
 
 ## Feature Update
-**Title:** {change.title}
-**Description:** {change.description}
-**Acceptance Criteria:** {', '.join(change.acceptance_criteria) if change.acceptance_criteria else "Not specified"}
+**Title:** {title}
+**Description:** {description}
+**Acceptance Criteria:** {acceptance_criteria}
 
 ## Current Test Case
-**ID:** {test_case.get('id', 'N/A')}
-**Title:** {test_case.get('title', 'N/A')}
-**Description:** {test_case.get('description', 'N/A')}
-**Steps:** {test_case.get('steps', [])}
-**Expected Result:** {test_case.get('expected_result', 'N/A')}
-**Tags:** {test_case.get('tags', [])}
+**ID:** {test_case_id}
+**Title:** {test_case_title}
+**Description:** {test_case_description}
+**Steps:** {steps}
+**Expected Result:** {expected_result}
+**Tags:** {tags}
 
 ## Task
 Update this test case to reflect the feature changes. Consider:
@@ -142,23 +101,13 @@ Focus on:
 - Adding appropriate tags (e.g., "updated", "regression")
 
 Provide the updated test case:"""
-    
-    @staticmethod
-    def batch_update_analysis(change: ChangeRequest, test_cases: List[Dict[str, Any]]) -> str:
-        """
-        Generate a prompt for analyzing multiple test cases for batch updates.
-        
-        Args:
-            change: The change request
-            test_cases: List of test cases to analyze
-            
-        Returns:
-            Batch analysis prompt
-        """
-        return f"""Analyze {len(test_cases)} test cases for updates based on this feature change:
-
-**Feature Update:** {change.title}
-**Description:** {change.description}
+
+
+# batch_update_analysis
+_BATCH_UPDATE_ANALYSIS_PROMPT = """Analyze {test_case_count} test cases for updates based on this feature change:
+
+**Feature Update:** {title}
+**Description:** {description}
 
 For each test case, determine:
 1. Does it need updates? (Yes/No)
@@ -172,23 +121,10 @@ Provide a summary analysis focusing on:
 - Risk assessment for each change type
 
 Keep the analysis concise and actionable."""
-    
-    @staticmethod
-    def controlled_update(context_package: Dict[str, Any]) -> str:
-        """
-        Generate a controlled update prompt following the new guidelines.
-        
-        Args:
-            context_package: Dictionary containing change_request, original_test_case, and iw_context
-            
-        Returns:
-            Formatted prompt for controlled LLM updates with audit trail
-        """
-        change_request = context_package.get("change_request", {})
-        original_tc = context_package.get("original_test_case", {})
-        iw_context = context_package.get("iw_context", "")
-        
-        prompt = """You are an expert QA engineer performing a controlled update of a test case based on a feature change.
+
+
+# controlled_update (used if its template is missing)
+_CONTROLLED_UPDATE_FALLBACK_PROMPT = """You are an expert QA engineer performing a controlled update of a test case based on a feature change.
 
 ## CRITICAL INSTRUCTIONS
 - Update ONLY what is necessary to align with the change request
@@ -198,20 +134,15 @@ Keep the analysis concise and actionable."""
 - DO NOT add any fields that are not in the original test case (like "tags")
 - ONLY use these exact field names: title, type, priority, preconditions, steps
 
+## System Context
+{iw_context}
+
 ## Change Request Context
 **Title:** {title}
 **Description:** {description}
 **Acceptance Criteria:** {acceptance_criteria}
 **Change Type:** {change_type}
 
-## Original Test Case
-```json
-{original_test_case}
-```
-
-## System Context
-{iw_context}
-
 ## Test Case Schema Requirements
 The updated test case MUST conform to the following JSON schema:
 ```json
@@ -279,55 +210,179 @@ Return ONLY a valid JSON object with this exact structure. The change_summary MU
 - Preserve existing test logic where possible
 - DO NOT add extra fields like "tags" - the schema only allows: title, type, priority, preconditions, steps
 
+## Original Test Case
+```json
+{original_test_case}
+```
+
 Update the test case now:"""
 
-        # Load schema for formatting requirements
-        schema_content = _load_test_case_schema()
-        context = {
-            "title": change_request.get("title", ""),
-            "description": change_request.get("description", ""),
-            "acceptance_criteria": ', '.join(change_request.get("acceptance_criteria", [])),
-            "change_type": change_request.get("change_type", ""),
-            "original_test_case": json.dumps(original_tc, indent=2),
-            "iw_context": iw_context or "No additional context available.",
-            "schema": schema_content,
-        }
-        try:
-            return render_template("feature_update/controlled_update.md.j2", context)
-        except FileNotFoundError:
-            return prompt.format(**context)
-
-
-def _load_test_case_schema() -> str:
-    """Load the test case schema for formatting requirements."""
-    try:
-        schema_path = Path("schema/test_case.schema.json")
-        if schema_path.exists():
-            with open(schema_path, 'r', encoding='utf-8') as f:
-                return f.read()
-    except Exception:
-        pass
+
+def analyze_impact(change: ChangeRequest, related_test_cases: Iterable[Dict[str, Any]]) -> str:
+    """
+    Generate a prompt for analyzing the impact of feature updates on existing test cases.
+    
+    Args:
+        change: The change request containing update details
+        related_test_cases: Related test cases that might be affected; only the first 10 are used
+        
+    Returns:
+        Formatted prompt string for LLM
+    """
+    # Identical inputs give identical prompts, so the prompt is memoized on the fields it shows
+    tc_keys = tuple(related_tc_key(tc) for tc in islice(related_test_cases, 10))  # Limit to top 10
+    acceptance_criteria = ', '.join(change.acceptance_criteria) if change.acceptance_criteria else "Not specified"
+    return _build_analyze_impact_prompt(change.title, change.description, acceptance_criteria, tc_keys)
+
+
+@lru_cache(maxsize=256)
+def _build_analyze_impact_prompt(title: str, description: str, acceptance_criteria: str,
+                                 tc_keys: Tuple[Tuple[str, ...], ...]) -> str:
+    """Build the analyze_impact prompt; cached per (change fields, related test case keys)."""
+    tc_context = format_related_tcs(tc_keys)
+
+    formatted_prompt = _ANALYZE_IMPACT_PROMPT.format(
+        title=title,
+        description=description,
+        acceptance_criteria=acceptance_criteria,
+        related_test_cases=tc_context or "No related test cases found."
+    )
+    
+    return formatted_prompt
+
+
+def generate_update_suggestions(change: ChangeRequest, test_case: Dict[str, Any]) -> str:
+    """
+    Generate specific update suggestions for a single test case.
+    
+    Args:
+        change: The change request
+        test_case: The test case to update
+        
+    Returns:
+        Prompt for updating a specific test case
+    """
+    return _UPDATE_SUGGESTIONS_PROMPT.format(
+        title=change.title,
+        description=change.description,
+        acceptance_criteria=', '.join(change.acceptance_criteria) if change.acceptance_criteria else "Not specified",
+        test_case_id=test_case.get('id', 'N/A'),
+        test_case_title=test_case.get('title', 'N/A'),
+        test_case_description=test_case.get('description', 'N/A'),
+        steps=test_case.get('steps', []),
+        expected_result=test_case.get('expected_result', 'N/A'),
+        tags=test_case.get('tags', [])
+    )
+
+
+def batch_update_analysis(change: ChangeRequest, test_cases: List[Dict[str, Any]]) -> str:
+    """
+    Generate a prompt for analyzing multiple test cases for batch updates.
+    
+    Args:
+        change: The change request
+        test_cases: List of test cases to analyze
+        
+    Returns:
+        Batch analysis prompt
+    """
+    return _BATCH_UPDATE_ANALYSIS_PROMPT.format(
+        test_case_count=len(test_cases),
+        title=change.title,
+        description=change.description
+    )
+
+
+def controlled_update_static_context(change_request: Dict[str, Any], iw_context: str) -> Dict[str, str]:
+    """
+    Build the prompt fields shared by every test case updated for one change request.
+    
+    Args:
+        change_request: Dictionary with title, description, acceptance_criteria and change_type
+        iw_context: System context text
+        
+    Returns:
+        Template fields for controlled_update, excluding original_test_case
+    """
+    return {
+        "title": change_request.get("title", ""),
+        "description": change_request.get("description", ""),
+        "acceptance_criteria": ', '.join(change_request.get("acceptance_criteria", [])),
+        "change_type": change_request.get("change_type", ""),
+        "iw_context": iw_context or "No additional context available.",
+        "schema": load_test_case_schema(),
+    }
+
+
+def controlled_update(context_package: Dict[str, Any], static_context: Optional[Dict[str, str]] = None) -> str:
+    """
+    Generate a controlled update prompt following the new guidelines.
+    
+    Everything shared by the test cases of one run comes first and the test case last,
+    so consecutive requests share a long prefix that providers can cache.
+    
+    Args:
+        context_package: Dictionary containing change_request, original_test_case, and iw_context
+        static_context: Precomputed result of controlled_update_static_context; pass it when
+            building prompts for many test cases so only original_test_case is serialized per call
+        
+    Returns:
+        Formatted prompt for controlled LLM updates with audit trail
+    """
+    original_tc = context_package.get("original_test_case", {})
+    if static_context is None:
+        static_context = controlled_update_static_context(
+            context_package.get("change_request", {}),
+            context_package.get("iw_context", "")
+        )
+    
+    # Render via template; only the test case itself varies between calls
+    context = {**static_context, "original_test_case": dumps(original_tc, indent=True)}
+    if template_exists("feature_update/controlled_update.md.j2"):
+        return render_template("feature_update/controlled_update.md.j2", context)
+    return _CONTROLLED_UPDATE_FALLBACK_PROMPT.format(**context)
+
+
+def controlled_update_batch(context_package: Dict[str, Any], test_cases: List[Dict[str, Any]],
+                            static_context: Optional[Dict[str, str]] = None) -> str:
+    """
+    Generate one controlled update prompt covering several test cases.
     
-    # Fallback schema if file not found
-    return """{
-  "type": "object",
-  "required": ["title", "type", "priority", "steps"],
-  "properties": {
-    "title": {"type": "string", "minLength": 5, "maxLength": 300},
-    "type": {"type": "string", "enum": ["functional", "integration", "ui", "api", "performance", "security", "regression"]},
-    "priority": {"type": "string", "enum": ["P1 - Critical", "P2 - High", "P3 - Medium", "P4 - Low"]},
-    "preconditions": {"type": "string"},
-    "steps": {
-      "type": "array",
-      "minItems": 1,
-      "items": {
-        "type": "object",
-        "required": ["step_text", "step_expected"],
-        "properties": {
-          "step_text": {"type": "string", "minLength": 5},
-          "step_expected": {"type": "string", "minLength": 3}
-        }
-      }
+    The change request, system context and instructions are sent once for the whole batch;
+    the LLM answers with ``{"results": [...]}`` holding one update per test case.
+    
+    Args:
+        context_package: Dictionary containing change_request and iw_context
+        test_cases: Dictionaries with ``test_case_id`` and the original ``test_case``
+        static_context: Precomputed result of controlled_update_static_context
+        
+    Returns:
+        Formatted prompt for a batched controlled update
+    """
+    if static_context is None:
+        static_context = controlled_update_static_context(
+            context_package.get("change_request", {}),
+            context_package.get("iw_context", "")
+        )
+    
+    context = {
+        **static_context,
+        "test_cases": [
+            {"test_case_id": tc["test_case_id"], "test_case": dumps(tc["test_case"], indent=True)}
+            for tc in test_cases
+        ],
     }
-  }
-}"""
+    return render_template("feature_update/controlled_update.md.j2", context)
+
+
+class FeatureUpdatePrompts:
+    """Prompt templates for updating existing test cases when features change.
+    
+    Kept for existing callers; the prompts are plain module functions.
+    """
+    analyze_impact = staticmethod(analyze_impact)
+    generate_update_suggestions = staticmethod(generate_update_suggestions)
+    batch_update_analysis = staticmethod(batch_update_analysis)
+    controlled_update_static_context = staticmethod(controlled_update_static_context)
+    controlled_update = staticmethod(controlled_update)
+    controlled_update_batch = staticmethod(controlled_update_batch)
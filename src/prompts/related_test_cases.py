@@ -0,0 +1,55 @@
+"""Related test case blocks shared by the impact analysis prompts."""
+
+import logging
+from typing import Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Upper bound on the rendered steps/tags of one related test case, so a test case with
+# hundreds of steps cannot blow up the prompt size
+_MAX_TC_FIELD_CHARS = 2000
+
+# One related test case in the impact analysis prompt
+_TC_BLOCK = (
+    "**Test Case {i}:**\n"
+    "- ID: {doc_id}\n"
+    "- Title: {title}\n"
+    "- Description: {description}\n"
+    "- Steps: {steps}\n"
+    "- Expected Result: {expected_result}\n"
+    "- Tags: {tags}\n"
+)
+
+
+def _capped(value: Any, field: str, doc_id: str) -> str:
+    """Render a list field of a related test case, truncated to _MAX_TC_FIELD_CHARS."""
+    text = str(value)
+    if len(text) > _MAX_TC_FIELD_CHARS:
+        logger.warning("Truncating %s of related test case %s from %d to %d characters",
+                       field, doc_id, len(text), _MAX_TC_FIELD_CHARS)
+        text = text[:_MAX_TC_FIELD_CHARS]
+    return text
+
+
+def related_tc_key(tc: Dict[str, Any]) -> Tuple[str, ...]:
+    """The fields of a related test case shown in the impact prompt, as a hashable memo key."""
+    get = tc.get  # Bound once; six lookups per test case
+    doc_id = str(get('doc_id', 'N/A'))
+    return (
+        doc_id,
+        str(get('title', 'N/A')),
+        str(get('description', 'N/A')),
+        _capped(get('steps', []), 'steps', doc_id),
+        str(get('expected_result', 'N/A')),
+        _capped(get('tags', []), 'tags', doc_id),
+    )
+
+
+def format_related_tcs(tc_keys: Tuple[Tuple[str, ...], ...]) -> str:
+    """Render related test case keys as numbered blocks."""
+    return "\n".join(
+        _TC_BLOCK.format(i=i, doc_id=doc_id, title=title, description=description, steps=steps,
+                         expected_result=expected_result, tags=tags)
+        for i, (doc_id, title, description, steps, expected_result, tags) in enumerate(tc_keys, 1)
+    )
@@ -0,0 +1,53 @@
+"""Test case schema text shared by the prompt modules."""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+
+
+# Resolved against the working directory (the project root when run via run.sh)
+_SCHEMA_PATH = "schema/test_case.schema.json"
+
+
+# Fallback schema if the schema file is not found
+_FALLBACK_SCHEMA = """{
+  "type": "object",
+  "required": ["title", "type", "priority", "steps"],
+  "properties": {
+    "title": {"type": "string", "minLength": 5, "maxLength": 300},
+    "type": {"type": "string", "enum": ["functional", "integration", "ui", "api", "performance", "security", "regression"]},
+    "priority": {"type": "string", "enum": ["P1 - Critical", "P2 - High", "P3 - Medium", "P4 - Low"]},
+    "preconditions": {"type": "string"},
+    "steps": {
+      "type": "array",
+      "minItems": 1,
+      "items": {
+        "type": "object",
+        "required": ["step_text", "step_expected"],
+        "properties": {
+          "step_text": {"type": "string", "minLength": 5},
+          "step_expected": {"type": "string", "minLength": 3}
+        }
+      }
+    }
+  }
+}"""
+
+
+def load_test_case_schema() -> str:
+    """Load the test case schema for formatting requirements."""
+    # A single stat per call; the file is only read again when its mtime or size changes
+    try:
+        st = os.stat(_SCHEMA_PATH)
+    except OSError:
+        return _FALLBACK_SCHEMA
+    try:
+        return _read_schema_text(os.path.abspath(_SCHEMA_PATH), st.st_mtime_ns, st.st_size)
+    except Exception:
+        return _FALLBACK_SCHEMA
+
+
+@lru_cache(maxsize=8)
+def _read_schema_text(schema_path: str, mtime_ns: int, size: int) -> str:
+    """Read the schema file once per (path, mtime, size) so every prompt module and run reuses it."""
+    return Path(schema_path).read_text(encoding='utf-8')
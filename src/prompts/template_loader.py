@@ -1,6 +1,7 @@
 """Template loader for Jinja2 templates."""
 
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional
 from jinja2 import Environment, FileSystemLoader, Template
@@ -20,11 +21,21 @@ class TemplateLoader:
             template_dir = Path(__file__).parent / "templates"
         
         self.template_dir = template_dir
+        # Templates ship with the code, so compiled templates are kept for the life of
+        # the process without re-checking the files on every render
         self.env = Environment(
             loader=FileSystemLoader(str(template_dir)),
             trim_blocks=True,
-            lstrip_blocks=True
+            lstrip_blocks=True,
+            cache_size=-1,
+            auto_reload=False
         )
+        # Template objects by name, skipping the Environment's cache key and globals handling
+        self._templates: Dict[str, Template] = {}
+    
+    def template_exists(self, template_name: str) -> bool:
+        """Check whether a template file is present in the template directory."""
+        return (self.template_dir / template_name).is_file()
     
     def render_template(self, template_name: str, context: Dict[str, Any]) -> str:
         """Render a template with the given context.
@@ -39,7 +50,9 @@ class TemplateLoader:
         Raises:
             FileNotFoundError: If template file doesn't exist
         """
-        template = self.env.get_template(template_name)
+        template = self._templates.get(template_name)
+        if template is None:
+            template = self._templates[template_name] = self.env.get_template(template_name)
         return template.render(**context)
 
 
@@ -64,3 +77,18 @@ def render_template(template_name: str, context: Dict[str, Any]) -> str:
     """
     loader = get_template_loader()
     return loader.render_template(template_name, context)
+
+
+@lru_cache(maxsize=None)
+def template_exists(template_name: str) -> bool:
+    """Check once per process whether a template is available to render_template.
+    
+    Templates added while the process runs are picked up after template_exists.cache_clear().
+    
+    Args:
+        template_name: Name of the template file
+        
+    Returns:
+        True if the template file exists
+    """
+    return get_template_loader().template_exists(template_name)
@@ -16,7 +16,8 @@ def write_report(report_text: str, output_dir: Path, filename: str = "report.md"
     """
     output_dir.mkdir(parents=True, exist_ok=True)
     path = output_dir / filename
-    path.write_text(report_text, encoding="utf-8")
+    # Encode once and write the bytes in a single call (no text-layer newline translation)
+    path.write_bytes(report_text.encode("utf-8"))
     return path
 
 
@@ -1,14 +1,82 @@
 """Hybrid retriever with keyword filtering and semantic ranking."""
 
-import json
+import re
+import threading
 import numpy as np
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    import faiss
+except ImportError:  # faiss is optional; semantic-first queries fall back to an exact NumPy scan
+    faiss = None
 
 from src.database.test_case_store import TestCaseStore
+from src.serialization import dumps_bytes, loads
 from ..retriever_interface import Retriever
 
 
+# int8 dynamically quantized export shipped with all-MiniLM-L6-v2, used by the "onnx" backend
+_DEFAULT_ONNX_MODEL_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+# Neighbors per node of the HNSW graph used by query_semantic_first
+_HNSW_M = 32
+
+# Domain-specific terms (higher priority), matched as substrings of the query
+_DOMAIN_TERMS = (
+    'onboarding', 'positions', 'graphql', 'api', 'ui', 'auth', 'authentication',
+    'booking', 'shift', 'approval', 'cancellation', 'notification', 'push',
+    'token', 'refresh', 'login', 'logout', 'user', 'profile', 'settings',
+    'payment', 'billing', 'subscription', 'waitlist', 'queue', 'priority'
+)
+# One scan finds every term: the lookahead tries each position, longest term first, and a
+# match also counts the terms it contains (e.g. "authentication" includes "auth")
+_DOMAIN_TERM_RE = re.compile(
+    "(?=(" + "|".join(sorted(_DOMAIN_TERMS, key=len, reverse=True)) + "))"
+)
+_DOMAIN_TERM_IMPLIES = {
+    term: frozenset(other for other in _DOMAIN_TERMS if other in term) for term in _DOMAIN_TERMS
+}
+_PRIORITY_SCORES = {
+    "P1": 1.0,  # Critical - highest priority
+    "P2": 0.8,  # High
+    "P3": 0.6,  # Medium
+    "P4": 0.4   # Low - lowest priority
+}
+_WORD_RE = re.compile(r'\b[a-zA-Z0-9_-]+\b')
+
+
+# SentenceTransformer.encode options: one float32 matrix of unit-length rows, without a
+# progress bar per batch
+_ENCODE_OPTIONS = {"convert_to_numpy": True, "normalize_embeddings": True, "show_progress_bar": False}
+
+
+@lru_cache(maxsize=None)
+def _stop_words() -> frozenset:
+    """English stop words, imported on first use so scikit-learn loads only when querying."""
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+    return frozenset(ENGLISH_STOP_WORDS)
+
+
+def _lowered(candidate: Dict[str, Any], field: str) -> str:
+    """candidate[field].lower(), reusing the store's lowercased copy where it is identical."""
+    text = candidate.get(field, "")
+    lowered = candidate.get(f"_{field}_lc")
+    # SQLite's lower() only folds ASCII letters, so its copy matches str.lower() for
+    # ASCII text; isascii() is a constant-time flag check
+    if lowered is not None and text.isascii():
+        return lowered
+    return text.lower()
+
+
+def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale vectors (rows of a matrix) to unit length; zero vectors stay zero."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
 class HybridRetriever(Retriever):
     """Hybrid retriever with keyword filtering and semantic ranking."""
     
@@ -26,10 +94,17 @@ class HybridRetriever(Retriever):
             'semantic_weight': 0.4,
             'priority_weight': 0.2,
             'max_candidates': 200,
+            'semantic_rerank_candidates': 20,
+            'use_fp16_gpu': True,
+            'embedding_backend': 'torch',
             'max_results': 10,
             'min_similarity_threshold': 0.1
         }
         self._embedding_model = None
+        self._model_lock = threading.Lock()
+        self._model_thread: Optional[threading.Thread] = None
+        # (test case ids, HNSW index or normalized vector matrix) for query_semantic_first
+        self._semantic_index = None
     
     @classmethod
     def from_test_case_dir(cls, test_cases_dir: Path, db_path: Optional[Path] = None, config: Optional[Dict[str, Any]] = None) -> 'HybridRetriever':
@@ -51,7 +126,8 @@ class HybridRetriever(Retriever):
         
         # Store all test cases from directory
         print(f"📚 Loading test cases from {test_cases_dir}...")
-        count = store.store_test_cases_from_directory(test_cases_dir)
+        # The JSON files are the source of truth, so the cache can be loaded without fsync
+        count = store.store_test_cases_from_directory(test_cases_dir, unsafe=True)
         print(f"✅ Stored {count} test cases in database")
         
         return cls(store, config)
@@ -70,20 +146,91 @@ class HybridRetriever(Retriever):
         """
         # Step B: Extract keywords and run deterministic filters
         keywords = self._extract_keywords(query_text)
-        candidates = self.store.search_by_keywords(keywords, self.config["max_candidates"])
+        # Ranking never reads metadata, so it is only fetched for the returned results; the
+        # lowercased title/text blob are computed once at write time by the store
+        candidates = self.store.search_by_keywords(
+            keywords, self.config["max_candidates"], with_metadata=False, with_lowercase=True
+        )
         
         if not candidates:
             return []
         
-        # Step C: Lightweight semantic re-rank
+        # Step C: Lightweight semantic re-rank of the best keyword/priority matches
+        self._wait_for_embedding_model()
         if self._embedding_model is not None:
+            candidates = self._prefilter_for_rerank(query_text, candidates, top_k)
             candidates = self._semantic_rerank(query_text, candidates)
         
         # Apply final ranking with weights
         ranked_results = self._apply_ranking(query_text, candidates)
         
         # Return top_k results
-        return ranked_results[:top_k]
+        results = ranked_results[:top_k]
+        metadata = self.store.get_metadata([result["doc_id"] for result in results])
+        for result in results:
+            result.pop("_title_lc", None)
+            result.pop("_text_blob_lc", None)
+            result["metadata"] = metadata.get(result["doc_id"], {})
+        return results
+    
+    def query_semantic_first(self, query_text: str, top_k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Find the test cases whose embeddings are nearest to the query, without keyword filtering.
+        
+        Uses an approximate HNSW index when faiss is installed and an exact scan otherwise;
+        either is built from the stored vectors on first use.
+        
+        Args:
+            query_text: Query text from change request
+            top_k: Number of results to return
+            
+        Returns:
+            Test cases with their semantic_score, most similar first
+        """
+        ids, index = self._get_semantic_index()
+        if not ids:
+            return []
+        
+        query_vector = _l2_normalize(np.asarray(self._get_embedding(query_text), dtype=np.float32))
+        k = min(top_k, len(ids))
+        if faiss is not None:
+            scores, rows = index.search(query_vector[None, :], k)
+            hits = [(row, score) for row, score in zip(rows[0].tolist(), scores[0].tolist()) if row >= 0]
+        else:
+            similarities = index @ query_vector
+            best = np.argsort(-similarities, kind="stable")[:k]
+            hits = list(zip(best.tolist(), similarities[best].tolist()))
+        
+        results = []
+        for row, score in hits:
+            test_case = self.store.get_test_case(ids[row])
+            if test_case is None:
+                continue
+            test_case["doc_id"] = test_case.pop("id")
+            test_case["semantic_score"] = score
+            results.append(test_case)
+        return results
+    
+    def _get_semantic_index(self) -> Tuple[List[str], Any]:
+        """Build (or reuse) the test case ids and the index over their normalized vectors."""
+        if self._semantic_index is None:
+            ids, vectors = [], []
+            for test_case in self.store.iter_test_cases():
+                if test_case["vector"] is not None:
+                    ids.append(test_case["id"])
+                    vectors.append(test_case["vector"])
+            
+            index = None
+            if vectors:
+                matrix = _l2_normalize(np.vstack(vectors).astype(np.float32, copy=False))
+                if faiss is not None:
+                    # Inner product on unit vectors is cosine similarity
+                    index = faiss.IndexHNSWFlat(matrix.shape[1], _HNSW_M, faiss.METRIC_INNER_PRODUCT)
+                    index.add(matrix)
+                else:
+                    index = matrix
+            self._semantic_index = (ids, index)
+        return self._semantic_index
     
     def _extract_keywords(self, query_text: str) -> List[str]:
         """
@@ -95,30 +242,58 @@ class HybridRetriever(Retriever):
         Returns:
             List of extracted keywords
         """
-        import re
-        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
-        
-        # Domain-specific terms (higher priority)
-        domain_terms = [
-            'onboarding', 'positions', 'graphql', 'api', 'ui', 'auth', 'authentication',
-            'booking', 'shift', 'approval', 'cancellation', 'notification', 'push',
-            'token', 'refresh', 'login', 'logout', 'user', 'profile', 'settings',
-            'payment', 'billing', 'subscription', 'waitlist', 'queue', 'priority'
-        ]
-        
         query_lower = query_text.lower()
         
-        # Extract domain-specific keywords first (higher priority)
-        domain_keywords = [term for term in domain_terms if term in query_lower]
+        # Extract domain-specific keywords first (higher priority), in _DOMAIN_TERMS order
+        found = set()
+        for match in _DOMAIN_TERM_RE.finditer(query_lower):
+            found |= _DOMAIN_TERM_IMPLIES[match.group(1)]
+        domain_keywords = [term for term in _DOMAIN_TERMS if term in found]
         
         # Extract general keywords using proper stopwords
-        words = re.findall(r'\b[a-zA-Z0-9_-]+\b', query_lower)
-        general_keywords = [word for word in words if len(word) > 2 and word not in ENGLISH_STOP_WORDS]
+        stop_words = _stop_words()
+        words = _WORD_RE.findall(query_lower)
+        general_keywords = [word for word in words if len(word) > 2 and word not in stop_words]
         
         # Combine and remove duplicates, prioritizing domain terms
         all_keywords = domain_keywords + general_keywords
         return list(dict.fromkeys(all_keywords))  # Preserve order, remove duplicates
     
+    def _prefilter_for_rerank(self, query_text: str, candidates: List[Dict[str, Any]],
+                              top_k: int) -> List[Dict[str, Any]]:
+        """
+        Keep the candidates with the best keyword + priority scores for semantic re-ranking.
+        
+        At most max(2 * top_k, semantic_rerank_candidates) candidates are kept, in their
+        retrieval order; a limit of 0 keeps all of them.
+        
+        Args:
+            query_text: Original query text
+            candidates: List of candidate test cases
+            top_k: Number of results the query returns
+            
+        Returns:
+            The candidates worth embedding
+        """
+        limit = self.config.get("semantic_rerank_candidates", 20)
+        if not limit:
+            return candidates
+        limit = max(2 * top_k, limit)
+        if len(candidates) <= limit:
+            return candidates
+        
+        query_words = query_text.lower().split()
+        partial_scores = np.fromiter(
+            (
+                self.config["keyword_weight"] * self._calculate_keyword_score(query_words, candidate) +
+                self.config["priority_weight"] * self._calculate_priority_score(candidate.get("priority", "P2"))
+                for candidate in candidates
+            ),
+            dtype=np.float64, count=len(candidates)
+        )
+        best = np.sort(np.argsort(-partial_scores, kind="stable")[:limit])
+        return [candidates[i] for i in best.tolist()]
+    
     def _semantic_rerank(self, query_text: str, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Apply semantic re-ranking using embeddings.
@@ -132,23 +307,34 @@ class HybridRetriever(Retriever):
         """
         try:
             # Generate query embedding - this will raise an exception if embeddings are not available
-            query_embedding = self._get_embedding(query_text)
+            query_embedding = np.asarray(self._get_embedding(query_text), dtype=np.float32)
             
-            # Calculate semantic similarity for each candidate
-            for candidate in candidates:
-                candidate_vector = candidate.get("vector")
-                if candidate_vector:
-                    similarity = self._cosine_similarity(query_embedding, candidate_vector)
-                    candidate["semantic_score"] = similarity
-                else:
-                    test_case_id = candidate.get('doc_id', candidate.get('id', 'unknown'))
-                    raise ValueError(f"Test case {test_case_id} has no vector embedding. Please run generate_embeddings() first.")
+            # Cosine similarity of all candidates in one matrix-vector product over unit vectors
+            matrix = np.vstack(self._candidate_vectors(candidates)).astype(np.float32, copy=False)
+            similarities = _l2_normalize(matrix) @ _l2_normalize(query_embedding)
+            
+            for candidate, similarity in zip(candidates, similarities.tolist()):
+                candidate["semantic_score"] = similarity
             
             return candidates
             
         except Exception as e:
             raise RuntimeError(f"Semantic re-ranking failed: {e}") from e
     
+    def _candidate_vectors(self, candidates: List[Dict[str, Any]]) -> List[Any]:
+        """Stored vectors of the candidates; missing ones are encoded in one batch and saved."""
+        vectors = [candidate.get("vector") for candidate in candidates]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            embeddings = self._embedding_model.encode([candidates[i]["text_blob"] for i in missing], **_ENCODE_OPTIONS)
+            self.store.update_vectors_bulk(
+                (candidates[i]["doc_id"], embedding) for i, embedding in zip(missing, embeddings)
+            )
+            for i, embedding in zip(missing, embeddings):
+                vectors[i] = candidates[i]["vector"] = np.asarray(embedding, dtype=np.float32)
+            self._semantic_index = None
+        return vectors
+    
     def _apply_ranking(self, query_text: str, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Apply final ranking with weighted scores.
@@ -160,114 +346,135 @@ class HybridRetriever(Retriever):
         Returns:
             Ranked results with final scores
         """
-        query_lower = query_text.lower()
-        
-        for candidate in candidates:
-            # Calculate keyword match score
-            keyword_score = self._calculate_keyword_score(query_lower, candidate)
-            
-            # Get semantic score (default to 0 if not available)
-            semantic_score = candidate.get("semantic_score", 0.0)
-            
-            # Calculate priority score
-            priority_score = self._calculate_priority_score(candidate.get("priority", "P2"))
-            
-            # Calculate weighted final score
-            final_score = (
-                self.config["keyword_weight"] * keyword_score +
-                self.config["semantic_weight"] * semantic_score +
-                self.config["priority_weight"] * priority_score
-            )
-            
+        # Query words are split once and shared by every candidate
+        query_words = query_text.lower().split()
+        count = len(candidates)
+        
+        # Per-candidate scores as parallel arrays, combined in one vectorized step
+        keyword_scores = np.fromiter(
+            (self._calculate_keyword_score(query_words, candidate) for candidate in candidates),
+            dtype=np.float64, count=count
+        )
+        # Semantic score defaults to 0 if not available
+        semantic_scores = np.fromiter(
+            (candidate.get("semantic_score", 0.0) for candidate in candidates),
+            dtype=np.float64, count=count
+        )
+        priority_scores = np.fromiter(
+            (self._calculate_priority_score(candidate.get("priority", "P2")) for candidate in candidates),
+            dtype=np.float64, count=count
+        )
+        
+        # Calculate weighted final scores
+        scores = (
+            self.config["keyword_weight"] * keyword_scores +
+            self.config["semantic_weight"] * semantic_scores +
+            self.config["priority_weight"] * priority_scores
+        )
+        
+        for candidate, final_score, keyword_score, priority_score in zip(
+            candidates, scores.tolist(), keyword_scores.tolist(), priority_scores.tolist()
+        ):
             candidate["score"] = final_score
             candidate["keyword_score"] = keyword_score
             candidate["priority_score"] = priority_score
         
-        # Sort by final score (descending)
-        ranked = sorted(candidates, key=lambda x: x["score"], reverse=True)
-        
-        # Filter by minimum similarity threshold
-        filtered = [candidate for candidate in ranked if candidate["score"] >= self.config["min_similarity_threshold"]]
+        # Filter by minimum similarity threshold, then sort the survivors by final score
+        # (descending; a stable sort keeps retrieval order for ties)
+        kept = np.flatnonzero(scores >= self.config["min_similarity_threshold"])
+        order = kept[np.argsort(-scores[kept], kind="stable")]
+        filtered = [candidates[i] for i in order.tolist()]
         
         # Log filtering results
-        filtered_count = len(ranked) - len(filtered)
+        filtered_count = count - len(filtered)
         if filtered_count > 0:
             threshold = self.config["min_similarity_threshold"]
             print(f"🔍 Similarity threshold filtering: {filtered_count} test cases excluded (score < {threshold})")
         
         return filtered
     
-    def _calculate_keyword_score(self, query_lower: str, candidate: Dict[str, Any]) -> float:
+    def _calculate_keyword_score(self, query_words: List[str], candidate: Dict[str, Any]) -> float:
         """Calculate keyword matching score."""
         score = 0.0
         
         # Title matches (highest weight)
-        title = candidate.get("title", "").lower()
-        if any(word in title for word in query_lower.split()):
+        title = _lowered(candidate, "title")
+        if any(map(title.__contains__, query_words)):
             score += 0.5
         
         # Text blob matches
-        text_blob = candidate.get("text_blob", "").lower()
-        matches = sum(1 for word in query_lower.split() if word in text_blob)
+        text_blob = _lowered(candidate, "text_blob")
+        # Substring tests mapped in C, one per query word (duplicates count, as before)
+        matches = sum(map(text_blob.__contains__, query_words))
         score += min(matches * 0.1, 0.3)  # Cap at 0.3
         
         # Tags and components matches
         tags = candidate.get("tags", [])
         components = candidate.get("components", [])
         all_tags = " ".join(tags + components).lower()
-        if any(word in all_tags for word in query_lower.split()):
+        if any(map(all_tags.__contains__, query_words)):
             score += 0.2
         
         return min(score, 1.0)  # Cap at 1.0
     
     def _calculate_priority_score(self, priority: str) -> float:
         """Calculate priority-based score."""
-        priority_scores = {
-            "P1": 1.0,  # Critical - highest priority
-            "P2": 0.8,  # High
-            "P3": 0.6,  # Medium
-            "P4": 0.4   # Low - lowest priority
-        }
-        
         # Extract just the priority prefix (e.g., "P2" from "P2 - High")
         priority_prefix = priority.split()[0].upper() if priority else "P3"
-        return priority_scores.get(priority_prefix, 0.6)
+        return _PRIORITY_SCORES.get(priority_prefix, 0.6)
     
     def _get_embedding(self, text: str) -> Optional[List[float]]:
         """Get embedding for text using sentence transformers."""
         self._load_embedding_model()  # This will raise an exception if embeddings are not available
         
         try:
-            embedding = self._embedding_model.encode([text])[0]
+            embedding = self._embedding_model.encode([text], **_ENCODE_OPTIONS)[0]
             return embedding.tolist()
         except Exception as e:
             raise RuntimeError(f"Failed to generate embedding: {e}") from e
     
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """Calculate cosine similarity between two vectors."""
-        try:
-            v1 = np.array(vec1)
-            v2 = np.array(vec2)
-            
-            dot_product = np.dot(v1, v2)
-            norm1 = np.linalg.norm(v1)
-            norm2 = np.linalg.norm(v2)
-            
-            if norm1 == 0 or norm2 == 0:
-                return 0.0
-            
-            return dot_product / (norm1 * norm2)
-        except Exception:
-            return 0.0
-    
     def _load_embedding_model(self):
         """Load the embedding model if not already loaded."""
-        if self._embedding_model is None:
-            try:
-                from sentence_transformers import SentenceTransformer
-                self._embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-            except ImportError as e:
-                raise ImportError("sentence-transformers is required for semantic ranking. Please install it with: pip install sentence-transformers") from e
+        # Held for the whole load, so callers racing a preload wait for its model
+        with self._model_lock:
+            if self._embedding_model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    if self.config.get("embedding_backend", "torch") == "onnx":
+                        # ONNX Runtime on CPU with int8 matmuls (needs sentence-transformers[onnx])
+                        model = SentenceTransformer(
+                            'all-MiniLM-L6-v2', backend="onnx",
+                            model_kwargs={"file_name": self.config.get("onnx_model_file", _DEFAULT_ONNX_MODEL_FILE)}
+                        )
+                    else:
+                        model = SentenceTransformer('all-MiniLM-L6-v2')
+                        # SentenceTransformer picks CUDA when available; half precision there
+                        # roughly halves encode time, CPUs stay on float32
+                        if self.config.get("use_fp16_gpu", True) and model.device.type == "cuda":
+                            model.half()
+                    self._embedding_model = model
+                except ImportError as e:
+                    raise ImportError("sentence-transformers is required for semantic ranking. Please install it with: pip install sentence-transformers") from e
+    
+    def preload_embedding_model(self) -> None:
+        """Start loading the embedding model in a background thread; query() waits for it."""
+        if self._embedding_model is None and self._model_thread is None:
+            self._model_thread = threading.Thread(
+                target=self._preload_embedding_model, name="embedding-model-preload", daemon=True
+            )
+            self._model_thread.start()
+    
+    def _preload_embedding_model(self) -> None:
+        """Background target of preload_embedding_model."""
+        try:
+            self._load_embedding_model()
+        except Exception as e:
+            print(f"⚠️  Semantic ranking disabled, failed to load embedding model: {e}")
+    
+    def _wait_for_embedding_model(self) -> None:
+        """Block until a preload started by preload_embedding_model has finished."""
+        if self._model_thread is not None:
+            self._model_thread.join()
     
     def generate_embeddings(self, batch_size: int = 100):
         """Generate embeddings for all test cases without vectors."""
@@ -287,11 +494,13 @@ class HybridRetriever(Retriever):
             texts = [tc["text_blob"] for tc in batch]
             
             try:
-                embeddings = self._embedding_model.encode(texts)
+                embeddings = self._embedding_model.encode(texts, **_ENCODE_OPTIONS)
                 
-                for tc, embedding in zip(batch, embeddings):
-                    self.store.update_vector(tc["id"], embedding.tolist())
+                self.store.update_vectors_bulk(
+                    (tc["id"], embedding) for tc, embedding in zip(batch, embeddings)
+                )
                 
+                self._semantic_index = None
                 print(f"✅ Generated embeddings for batch {i//batch_size + 1}")
                 
             except Exception as e:
@@ -304,8 +513,7 @@ class HybridRetriever(Retriever):
         
         # Save configuration
         config_path = cache_dir / "retriever_config.json"
-        with open(config_path, 'w') as f:
-            json.dump(self.config, f, indent=2)
+        config_path.write_bytes(dumps_bytes(self.config, indent=True))
         
         print(f"✅ Hybrid retriever state saved to {cache_dir}")
     
@@ -325,11 +533,8 @@ class HybridRetriever(Retriever):
             # Load configuration if available
             config_path = cache_dir / "retriever_config.json"
             if config_path.exists():
-                with open(config_path, 'r') as f:
-                    config_data = json.load(f)
-                    retriever.config = config_data
+                retriever.config = loads(config_path.read_bytes())
             
-            retriever._load_embedding_model()
             return retriever
             
         except Exception as e:
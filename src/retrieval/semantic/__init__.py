@@ -11,6 +11,12 @@ It's designed for future implementation with:
 - Intent-based query processing
 """
 
-from .semantic_retriever import SemanticRetriever
-
 __all__ = ["SemanticRetriever"]
+
+
+def __getattr__(name):
+    # The retriever is a placeholder, so it is only imported when first referenced
+    if name == "SemanticRetriever":
+        from .semantic_retriever import SemanticRetriever
+        return SemanticRetriever
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,47 @@
+"""JSON encode/decode helpers backed by orjson when it is installed."""
+
+from __future__ import annotations
+
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+    import json
+
+
+def _json_dumps(obj: Any, indent: bool) -> str:
+    """Standard-library encoding laid out like orjson's: raw UTF-8, no spaces when compact."""
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize ``obj`` to a JSON string.
+    
+    Args:
+        obj: JSON-compatible object
+        indent: Pretty-print with two-space indentation
+        
+    Returns:
+        JSON text
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+    return _json_dumps(obj, indent)
+
+
+def dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+    """Serialize ``obj`` straight to UTF-8 JSON bytes, ready for ``Path.write_bytes``."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return _json_dumps(obj, indent).encode("utf-8")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON from text or raw UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
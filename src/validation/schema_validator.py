@@ -1,34 +1,79 @@
 from __future__ import annotations
 
 import json
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
 from jsonschema import Draft7Validator
 
+try:
+    import fastjsonschema
+except ImportError:  # fastjsonschema is optional; every instance then goes through jsonschema
+    fastjsonschema = None
 
-def load_schema(schema_path: Path) -> Draft7Validator:
+
+@dataclass(frozen=True, eq=False)
+class SchemaValidator:
+    """A schema's Draft7Validator plus, when fastjsonschema is installed, a compiled check for it.
+    
+    The compiled check only answers "valid or not"; error messages always come from
+    the Draft7Validator so they read the same either way.
+    """
+    validator: Draft7Validator
+    fast_check: Optional[Callable[[Any], Any]] = None
+    
+    def iter_errors(self, instance: Any) -> Iterator[Any]:
+        """Yield jsonschema errors for an instance."""
+        return self.validator.iter_errors(instance)
+
+
+def load_schema(schema_path: Path) -> SchemaValidator:
     """Load and validate a JSON schema from file.
     
+    The validator is built once per schema file (and rebuilt if the file changes),
+    so repeated pipeline runs in one process share it.
+    
     Args:
         schema_path: Path to the JSON schema file
         
     Returns:
-        Draft7Validator instance for schema validation
+        SchemaValidator instance for schema validation
     """
-    schema = json.loads(schema_path.read_text(encoding="utf-8"))
-    return Draft7Validator(schema)
+    resolved = Path(schema_path).resolve()
+    return _build_validator(str(resolved), resolved.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=8)
+def _build_validator(schema_path: str, mtime_ns: int) -> SchemaValidator:
+    """Parse a schema file into a validator; cached per (path, modification time)."""
+    schema = json.loads(Path(schema_path).read_text(encoding="utf-8"))
+    fast_check = None
+    if fastjsonschema is not None:
+        # Match Draft7Validator's defaults: no format checks, and never fill defaults into the instance
+        fast_check = fastjsonschema.compile(schema, use_default=False, use_formats=False)
+    return SchemaValidator(Draft7Validator(schema), fast_check)
 
 
-def validate_instance(validator: Draft7Validator, instance: dict) -> list[str]:
+def validate_instance(validator: SchemaValidator, instance: dict, fail_fast: bool = False) -> list[str]:
     """Validate an instance against a JSON schema.
     
     Args:
-        validator: Draft7Validator instance
+        validator: SchemaValidator instance
         instance: Dictionary to validate
+        fail_fast: Stop at the first error instead of collecting all of them
         
     Returns:
         List of validation error messages (empty if valid)
     """
+    if validator.fast_check is not None:
+        try:
+            validator.fast_check(instance)
+            return []
+        except fastjsonschema.JsonSchemaException:
+            pass  # Invalid: collect the messages below
+    if fail_fast:
+        first_error = next(validator.iter_errors(instance), None)
+        return [first_error.message] if first_error is not None else []
     errors = [e.message for e in validator.iter_errors(instance)]
     return errors
-
-
@@ -0,0 +1,34 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.database.test_case_store import TestCaseStore
+from src.retrieval.hybrid import hybrid_retriever
+from src.retrieval.hybrid.hybrid_retriever import HybridRetriever
+
+
+class _FakeEncoder:
+    """Stands in for SentenceTransformer: one fixed unit vector per text."""
+
+    def encode(self, texts, **kwargs):
+        return np.array([[1.0, 0.0] if "login" in text.lower() else [0.0, 1.0] for text in texts],
+                        dtype=np.float32)
+
+
+def test_query_embeds_candidates_without_stored_vectors(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(hybrid_retriever, "_stop_words", lambda: frozenset())
+    store = TestCaseStore(tmp_path / "test_cases.db")
+    embedded = store.store_test_case({"title": "Login with valid credentials", "steps": ["Open login page"]})
+    store.update_vector(embedded, [1.0, 0.0])
+    fresh = store.store_test_case({"title": "Login after password reset", "steps": ["Reset password"]})
+
+    retriever = HybridRetriever(store)
+    retriever._embedding_model = _FakeEncoder()
+    results = retriever.query("login", top_k=5)
+
+    scores = {r["doc_id"]: r["semantic_score"] for r in results}
+    assert scores == {embedded: pytest.approx(1.0), fresh: pytest.approx(0.0)}
+    # The missing vector was encoded from the text blob during the query and written back
+    assert store.get_test_case(fresh)["vector"].tolist() == [0.0, 1.0]
+    store.close()
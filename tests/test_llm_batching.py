@@ -0,0 +1,247 @@
+import asyncio
+from pathlib import Path
+from types import MappingProxyType, SimpleNamespace
+
+import pytest
+
+from config.config_loader import Config
+from src.llm.client import LLMClient
+from src.llm.providers.gemini_provider import GeminiProvider
+from src.llm.response_cache import LLMResponseCache
+from src.parsers.change_request_parser import ChangeRequest
+from src.pipelines import bug_fix, feature_update
+from src.serialization import dumps
+from src.validation.schema_validator import load_schema
+
+_SCHEMA_PATH = Path(__file__).resolve().parents[1] / "schema" / "test_case.schema.json"
+_PRIORITY_CHANGES = [{"field": "priority", "before": "P2 - High", "after": "P1 - Critical"}]
+
+
+def _mock_client(tmp_path: Path = None) -> LLMClient:
+    """Client on the mock provider, registered under another name so the pipelines call it."""
+    config = Config(
+        default_provider="scripted",
+        providers=MappingProxyType({"scripted": MappingProxyType({"type": "mock"})}),
+        global_settings=MappingProxyType({}),
+        system=MappingProxyType({}),
+    )
+    cache = LLMResponseCache(tmp_path / "llm_cache.db") if tmp_path is not None else None
+    return LLMClient(config, "scripted", cache=cache)
+
+
+def _script(client: LLMClient, monkeypatch, answer) -> list[str]:
+    """Route the mock provider's completions through answer(prompt); returns the prompts seen."""
+    provider = client._get_provider()
+    original = provider.complete
+    seen = []
+
+    def complete(request):
+        seen.append(request.prompt)
+        response = original(request)
+        response.text = answer(request.prompt)
+        return response
+
+    monkeypatch.setattr(provider, "complete", complete)
+    return seen
+
+
+def _test_case(title: str) -> dict:
+    return {
+        "title": title,
+        "type": "functional",
+        "priority": "P2 - High",
+        "steps": [{"step_text": "Open the shifts screen", "step_expected": "Shifts are listed"}],
+    }
+
+
+def _update(title: str, test_case_id: str = None) -> dict:
+    entry = {
+        "updated_test_case": {**_test_case(title), "priority": "P1 - Critical"},
+        "change_summary": {"feature_impact": "Priority raised", "changes": _PRIORITY_CHANGES, "reasoning": title},
+    }
+    if test_case_id is not None:
+        entry["test_case_id"] = test_case_id
+    return entry
+
+
+def test_batch_parsers_map_results_by_test_case_id():
+    # Results may come back in any order; each is keyed by its test_case_id
+    response = "```json\n" + dumps({"results": [_update("Second case", "tc_2"), _update("First case", "tc_1")]}) + "\n```"
+    updates = feature_update._parse_batch_llm_update(response)
+    assert {tc_id: summary["reasoning"] for tc_id, (_, summary) in updates.items()} == {
+        "tc_1": "First case", "tc_2": "Second case"}
+    assert feature_update._parse_batch_llm_update("The model rambled instead of answering") is None
+
+    bug_fix_response = dumps({"results": [
+        {"test_case_id": "tc_2", "updated_test_case": _test_case("Second case"),
+         "analysis_summary": {"reasoning": "Second case"}},
+        {"test_case_id": "tc_1", "analysis_summary": {"reasoning": "No updated test case"}},
+    ]})
+    analyses = bug_fix._parse_batch_bug_fix_analysis(bug_fix_response)
+    assert analyses["tc_2"][0]["title"] == "Second case"
+    # Answered without an update, as opposed to not answered at all
+    assert analyses["tc_1"] == (None, None)
+    assert bug_fix._parse_batch_bug_fix_analysis("not json") is None
+
+
+def test_feature_update_retries_unparseable_batch_per_test_case(tmp_path: Path, monkeypatch):
+    titles = {"tc_1": "Worker books an open shift", "tc_2": "Worker cancels a booked shift"}
+    related = []
+    for tc_id, title in titles.items():
+        path = tmp_path / f"{tc_id}.json"
+        path.write_text(dumps(_test_case(title), indent=True), encoding="utf-8")
+        related.append({"doc_id": tc_id, "title": title, "metadata": {"original_file": str(path)}})
+
+    def answer(prompt):
+        present = [title for title in titles.values() if title in prompt]
+        if len(present) > 1:
+            return "Sorry, I cannot produce JSON for several test cases at once."
+        return dumps(_update(present[0]))
+
+    client = _mock_client()
+    prompts = _script(client, monkeypatch, answer)
+    change = ChangeRequest("feature_update", "Shift priority", "Raise shift test priority", [])
+    updated, log, llm_failed = feature_update._controlled_llm_updates(
+        change, related, tmp_path, load_schema(_SCHEMA_PATH), client, dry_run=True, batch_size=2)
+
+    # One batch request, then one retry per test case in that batch
+    assert len(prompts) == 3
+    assert updated == [tmp_path / "tc_1.json", tmp_path / "tc_2.json"]
+    assert {entry["test_case_id"]: entry["change_summary"]["reasoning"] for entry in log} == titles
+    assert not llm_failed
+
+
+def test_feature_update_run_with_llm_errors_is_not_replayed(tmp_path: Path, monkeypatch):
+    cases_dir = tmp_path / "cases"
+    cases_dir.mkdir()
+    title = "Worker books an open shift"
+    path = cases_dir / "tc_1.json"
+    path.write_text(dumps(_test_case(title), indent=True), encoding="utf-8")
+    related = [{"doc_id": "tc_1", "title": title, "metadata": {"original_file": str(path)}}]
+    retriever = SimpleNamespace(query=lambda text, top_k: related, config={})
+
+    failing = True
+
+    def answer(prompt):
+        if failing:
+            raise RuntimeError("503 Service Unavailable")
+        return dumps(_update(title))
+
+    client = _mock_client()
+    prompts = _script(client, monkeypatch, answer)
+    change = ChangeRequest("feature_update", "Shift priority", "Raise shift test priority", [])
+
+    def run():
+        return feature_update.run_feature_update_pipeline(
+            change, cases_dir, _SCHEMA_PATH, retriever, client, dry_run=True, run_cache_dir=tmp_path / "runs")
+
+    assert run().updated == []
+    failing = False
+    # The failed run was not cached, so the rerun asks the LLM again
+    second = run()
+    assert not second.replayed and second.updated == [path]
+    assert len(prompts) == 2
+    # A clean run is cached and replayed
+    assert run().replayed and len(prompts) == 2
+
+
+def test_bug_fix_retries_test_cases_missing_from_batch(tmp_path: Path, monkeypatch):
+    titles = {"tc_1": "Worker books an open shift", "tc_2": "Worker cancels a booked shift",
+              "tc_3": "Worker clocks in for a shift"}
+    related = []
+    for tc_id, title in titles.items():
+        path = tmp_path / f"{tc_id}.json"
+        path.write_text(dumps(_test_case(title), indent=True), encoding="utf-8")
+        related.append({"doc_id": tc_id, "title": title, "metadata": {"original_file": str(path)}})
+
+    def analysis(title: str, test_case_id: str = None, update: bool = True) -> dict:
+        entry = {"analysis_summary": {"changes": _PRIORITY_CHANGES, "reasoning": title}}
+        if update:
+            entry["updated_test_case"] = {**_test_case(title), "priority": "P1 - Critical"}
+        if test_case_id is not None:
+            entry["test_case_id"] = test_case_id
+        return entry
+
+    def answer(prompt):
+        present = [title for title in titles.values() if title in prompt]
+        if len(present) > 1:
+            # tc_2 needs no update; tc_3 comes back under a misspelled id
+            return dumps({"results": [analysis(titles["tc_1"], "tc_1"),
+                                      analysis(titles["tc_2"], "tc_2", update=False),
+                                      analysis(titles["tc_3"], "tc-3")]})
+        return dumps(analysis(present[0]))
+
+    client = _mock_client()
+    prompts = _script(client, monkeypatch, answer)
+    change = ChangeRequest("bug_fix", "Shift priority", "Raise shift test priority", [])
+    updated, log = bug_fix._controlled_bug_fix_analysis(
+        change, related, tmp_path, load_schema(_SCHEMA_PATH), client, dry_run=True, batch_size=3)
+
+    # One batch request, then one retry for the test case the batch answer did not cover
+    assert len(prompts) == 2
+    assert titles["tc_3"] in prompts[1] and titles["tc_1"] not in prompts[1]
+    assert updated == [tmp_path / "tc_1.json", tmp_path / "tc_3.json"]
+    assert [entry["test_case_id"] for entry in log] == ["tc_1", "tc_3"]
+
+
+def test_response_cache_serves_repeated_prompts(tmp_path: Path, monkeypatch):
+    client = _mock_client(tmp_path)
+    prompts = _script(client, monkeypatch, lambda prompt: f"answer to {prompt}")
+
+    first = client.complete_many(["alpha", "beta"])
+    assert (client.cache.hits, client.cache.misses) == (0, 2)
+    second = client.complete_many(["beta", "alpha", "gamma"])
+
+    assert [r.text for r in second] == ["answer to beta", "answer to alpha", "answer to gamma"]
+    assert [r.text for r in first] == ["answer to alpha", "answer to beta"]
+    assert (client.cache.hits, client.cache.misses) == (2, 3)
+    assert prompts == ["alpha", "beta", "gamma"]
+    client.close()
+
+
+def test_complete_batch_falls_back_to_complete_many(monkeypatch):
+    client = _mock_client()
+
+    def answer(prompt):
+        if prompt == "bad":
+            raise RuntimeError("provider error")
+        return prompt.upper()
+
+    _script(client, monkeypatch, answer)
+    assert not client._get_provider().supports_batch
+    results = client.complete_batch(["one", "bad", "two"])
+
+    assert [r.text for r in (results[0], results[2])] == ["ONE", "TWO"]
+    # Without a batch API, failed prompts still hold their exception in place
+    assert isinstance(results[1], RuntimeError)
+    with pytest.raises(RuntimeError):
+        client.complete_many(["bad"])
+
+
+def test_gemini_complete_many_survives_a_new_event_loop():
+    class _StubModel:
+        """GenerativeModel stand-in whose async client, like the SDK's, is bound to its first loop."""
+
+        def __init__(self):
+            self.loop = None
+
+        def generate_content(self, prompt, generation_config=None):
+            return SimpleNamespace(text=f"answer to {prompt}")
+
+        async def generate_content_async(self, prompt, generation_config=None):
+            loop = asyncio.get_running_loop()
+            if self.loop not in (None, loop):
+                raise RuntimeError("Event loop is closed")
+            self.loop = loop
+            return self.generate_content(prompt, generation_config)
+
+    config = SimpleNamespace(type="gemini", model="gemini-test", api_key_env=None, max_tokens=100,
+                             temperature=0.0, safety_settings=None)
+    provider = GeminiProvider(config)
+    provider._client = _StubModel()
+    client = _mock_client()
+    client._provider = provider
+
+    # complete_many runs each call on its own event loop
+    assert [r.text for r in client.complete_many(["one"])] == ["answer to one"]
+    assert [r.text for r in client.complete_many(["two"])] == ["answer to two"]
@@ -20,3 +20,8 @@ Change-Type: new_feature
     assert len(cr.acceptance_criteria) == 2
 
 
+def test_parse_change_request_from_raw_bytes(tmp_path: Path):
+    raw = b"# Fix login crash\n\nChange-Type: bug_fix\n"
+    cr = parse_change_request(tmp_path / "missing.md", raw=raw)
+    assert cr.change_type == "bug_fix"
+    assert cr.title == "Fix login crash"
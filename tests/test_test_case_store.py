@@ -0,0 +1,20 @@
+from pathlib import Path
+from src.database.test_case_store import TestCaseStore
+
+
+def test_store_and_search_test_case(tmp_path: Path):
+    store = TestCaseStore(tmp_path / "db" / "test_cases.db")
+    tc_id = store.store_test_case({
+        "title": "Login with valid credentials",
+        "priority": "P1 - Critical",
+        "tags": ["auth", "smoke"],
+        "steps": [{"step_text": "Open login page", "step_expected": "Form is shown"}],
+    })
+    store.update_vector(tc_id, [0.5, 0.25])
+
+    results = store.search_by_keywords(["login"])
+    assert [r["doc_id"] for r in results] == [tc_id]
+    assert results[0]["components"] == ["auth"]
+    assert store.get_test_case(tc_id)["vector"].tolist() == [0.5, 0.25]
+    assert store.get_stats()["with_vectors"] == 1
+    store.close()